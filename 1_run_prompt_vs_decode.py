@@ -13,7 +13,7 @@ if SRC_DIR not in sys.path:
 # --- local helpers ---
 from load_datasets import load_humaneval
 from decode_variants import DECODE_VARIANTS
-from experiments import generate_and_eval
+from experiments import generate_and_submit
 
 # -------------------------
 # Config
@@ -26,6 +26,11 @@ USE_CHAT = True
 PROMPT_VARIANTS = ["raw", "hardened_v1", "hardened_v2", "icl_v2"]
 DECODE_CHOICES  = DECODE_VARIANTS
 
+# Guided decoding of the <sol> format (needs a vLLM server with guided decoding enabled)
+GUIDED_PROMPTS = ["raw", "hardened_v1", "hardened_v2"]
+GUIDED_MODE    = os.getenv("GUIDED_MODE", "regex")   # "regex" | "grammar"
+RUN_GUIDED     = os.getenv("RUN_GUIDED", "1") == "1"
+
 USE_SAMPLE  = True
 TOTAL_ITEMS = 164
 SAMPLE_FRAC = 0.2
@@ -37,20 +42,21 @@ RUN_DIR = Path("he_runs"); RUN_DIR.mkdir(parents=True, exist_ok=True)
 def print_summary(rows, sweep_name: str):
     """Pretty print a summary table for a sweep."""
     print(f"\n=== Summary: {sweep_name} ===")
-    print("prompt_id      | decode        | pass@1 | compile | avg_len | median | gen_s | out")
-    print("---------------------------------------------------------------------------------")
+    print("prompt_id      | decode        | pass@1 | 95% CI        | compile | avg_len | median | gen_s | out")
+    print("-------------------------------------------------------------------------------------------------")
     for r in rows:
         out = Path(r['combined_path']).name
-        print(f"{r['prompt_id']:<14} | {r['decode']:<12} | {r['pass@1']:.3f} | {r['compile_rate']:.3f} | "
+        lo, hi = r.get("pass@1_ci") or (float("nan"), float("nan"))
+        print(f"{r['prompt_id']:<14} | {r['decode']:<12} | {r['pass@1']:.3f} | [{lo:.3f}, {hi:.3f}] | {r['compile_rate']:.3f} | "
               f"{r['avg_len']:<7} | {r['median_len']:<6} | {r['gen_time_s']:<5} | {out}")
 
 
 def sweep_prompts(ds, fixed_decode):
     """Sweep through various prompts on sample data to determine best prompt."""
-    rows = []
+    rows, pending = [], []
     print(f"\n=== Sweep 1: Fixed decode={fixed_decode['name']} | varying prompts ===")
     for prompt_id in PROMPT_VARIANTS:
-        stats = generate_and_eval(
+        pending.append(generate_and_submit(
             ds=ds,
             prompt_id=prompt_id,
             dec=fixed_decode,
@@ -60,7 +66,9 @@ def sweep_prompts(ds, fixed_decode):
             token=TOKEN,
             use_chat=USE_CHAT,
             n_workers=8,
-        )
+        ))
+    for fut in pending:                 # evaluations ran in the background while generating
+        stats = fut.result()
         print(json.dumps(stats, indent=2))
         rows.append(stats)
         sys.stdout.flush()
@@ -71,10 +79,10 @@ def sweep_prompts(ds, fixed_decode):
 
 def sweep_decodes(ds, fixed_prompt):
     """Sweep through various decoding params on sample data to determine best one."""
-    rows = []
+    rows, pending = [], []
     print(f"\n=== Sweep 2: Fixed prompt={fixed_prompt} | varying decodes ===")
     for dec in DECODE_CHOICES:
-        stats = generate_and_eval(
+        pending.append(generate_and_submit(
             ds=ds,
             prompt_id=fixed_prompt,
             dec=dec,
@@ -84,7 +92,9 @@ def sweep_decodes(ds, fixed_prompt):
             token=TOKEN,
             use_chat=USE_CHAT,
             n_workers=8,
-        )
+        ))
+    for fut in pending:                 # evaluations ran in the background while generating
+        stats = fut.result()
         print(json.dumps(stats, indent=2))
         rows.append(stats)
         sys.stdout.flush()
@@ -93,6 +103,39 @@ def sweep_decodes(ds, fixed_prompt):
     return rows
 
 
+def sweep_guided(ds, fixed_decode):
+    """Same prompts with and without guided decoding: effect on length, latency, compile rate."""
+    rows, pending = [], []
+    print(f"\n=== Sweep 3: Fixed decode={fixed_decode['name']} | guided={GUIDED_MODE} vs off ===")
+    for prompt_id in GUIDED_PROMPTS:
+        for guided in (None, GUIDED_MODE):
+            pending.append(generate_and_submit(
+                ds=ds,
+                prompt_id=prompt_id,
+                dec=fixed_decode,
+                run_dir=RUN_DIR,
+                api_base=API_BASE,
+                model_id=MODEL_ID,
+                token=TOKEN,
+                use_chat=USE_CHAT,
+                n_workers=8,
+                guided=guided,
+            ))
+    for fut in pending:
+        stats = fut.result()
+        print(json.dumps(stats, indent=2))
+        rows.append(stats)
+        sys.stdout.flush()
+
+    print(f"\n=== Summary: guided decoding ({GUIDED_MODE}) vs off ===")
+    print("prompt_id      | guided  | pass@1 | compile | avg_len | out_tok | latency_s")
+    print("-------------------------------------------------------------------------")
+    for r in rows:
+        print(f"{r['prompt_id']:<14} | {str(r['guided']):<7} | {r['pass@1']:.3f} | {r['compile_rate']:.3f}   | "
+              f"{r['avg_len']:<7} | {r['avg_out_tokens']:<7} | {r['avg_latency_s']}")
+    return rows
+
+
 def main():
     ds = load_humaneval(run_sample=USE_SAMPLE, n=N_ITEMS, shuffle=True, seed=42)
     print(f"[data] {len(ds)} tasks{' (~sample)' if USE_SAMPLE else ' (full)'}")
@@ -103,6 +146,10 @@ def main():
     # Sweep 2: fix prompt=hardened_v2, vary decodes
     sweep_decodes(ds, "hardened_v2")
 
+    # Sweep 3: guided decoding on/off for the <sol>-format headers
+    if RUN_GUIDED:
+        sweep_guided(ds, DECODE_CHOICES[0])
+
 
 if __name__ == "__main__":
     main()
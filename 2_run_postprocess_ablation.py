@@ -10,37 +10,101 @@ if SRC_DIR not in sys.path:
 
 
 # --- local imports ---
-from postprocessing import PostProcessor
-from eval_utils import dump_for_eval, eval_pass1
+from postprocessing import get_postprocessor
+from eval_utils import evaluate_records, pass_at_1, compile_and_length_stats, write_results
+from bulk_postprocess import bulk_rewrite_with_pp
 
 
-def rewrite_with_pp(src_path: Path, dst_path: Path, version: str):
-    """Re-process a combined jsonl file with a given PostProcessor version."""
-    PostProcessor.set_version(version)
+def rewrite_with_pp(src_path: Path, dst_path: Path, version: str, n_workers: int = 1):
+    """Re-process a combined jsonl file with a given PostProcessor version (n_workers > 1: bulk mode)."""
+    if n_workers > 1:
+        return bulk_rewrite_with_pp(src_path, dst_path, version, n_workers=n_workers)
+    pp = get_postprocessor(version)
     with src_path.open() as r, dst_path.open("w") as w:
         for line in r:
             rec = json.loads(line)
             raw = rec.get("raw_text", rec.get("completion", ""))
-            rec["completion"] = PostProcessor.normalize_body(raw)
+            rec["completion"] = pp(raw)
             w.write(json.dumps(rec) + "\n")
 
 
-def sweep_pp_versions(src: Path, run_dir: Path, versions):
+def load_combined(src_path: Path):
+    with src_path.open() as r:
+        return [json.loads(line) for line in r]
+
+
+def fan_out(records, versions):
+    """Apply every version to every record in one pass -> {version: [completion, ...]}."""
+    pps = {ver: get_postprocessor(ver) for ver in versions}
+    out = {ver: [] for ver in versions}
+    for rec in records:
+        raw = rec.get("raw_text", rec.get("completion", ""))
+        for ver, pp in pps.items():
+            out[ver].append(pp(raw))
+    return out
+
+
+def unique_for_eval(records, completions):
+    """
+    Group identical (task_id, completion) pairs across versions.
+
+    Returns:
+        (unique_records, index) where index[(task_id, completion)] is the position in unique_records
+    """
+    index, uniq = {}, []
+    for bodies in completions.values():
+        for rec, body in zip(records, bodies):
+            key = (rec["task_id"], body)
+            if key not in index:
+                index[key] = len(uniq)
+                uniq.append({**rec, "completion": body})
+    return uniq, index
+
+
+def sweep_pp_versions(src: Path, run_dir: Path, versions, write_combined: bool = False, use_cache: bool = True,
+                      write_eval_files: bool = False, timeout_mode: str = "wall", baseline: Path = None):
+    """
+    Single pass: parse src once, post-process with all versions, execute each
+    unique completion once (all versions share one in-memory evaluator run),
+    then score every version from the shared verdicts. With a baseline
+    results file, completions unchanged since that run reuse its verdicts;
+    this run's verdicts go to results_<tag>.jsonl for the next one.
+    """
+    records = load_combined(src)
+    completions = fan_out(records, versions)
+
+    tag = f"pp_{'_'.join(versions)}__{src.stem}"
+    uniq, index = unique_for_eval(records, completions)
+    total = len(records) * len(versions)
+    print(f"[pp] {len(records)} records x {len(versions)} versions -> "
+          f"{len(uniq)} unique completions ({total - len(uniq)} executions saved)")
+    ev = evaluate_records(uniq, n_workers=12, use_cache=use_cache, timeout_mode=timeout_mode, baseline=baseline,
+                          write_dir=run_dir if write_eval_files else None, tag=tag)
+    results_path = write_results(ev["rows"], uniq, run_dir / f"results_{tag}.jsonl")
+    print(f"[pp] verdicts -> {results_path}")
+    verdicts = [row["passed"] for row in ev["rows"]]
+
+    task_ids = [rec["task_id"] for rec in records]
+    prompts  = [rec["prompt"] for rec in records]
     rows = []
     for ver in versions:
-        dst = run_dir / f"pp_{ver}__{src.name}"
-        rewrite_with_pp(src, dst, ver)
-        tag = f"pp_{ver}__{src.stem}"
-        samples, probs, N, cr, avg_len, med = dump_for_eval(dst, run_dir, tag)
-        pass1 = eval_pass1(str(samples), str(probs), n_workers=12)
+        bodies = completions[ver]
+        path = src
+        if write_combined:
+            path = run_dir / f"pp_{ver}__{src.name}"
+            with path.open("w") as w:
+                for rec, body in zip(records, bodies):
+                    w.write(json.dumps({**rec, "completion": body}) + "\n")
+        passed = [verdicts[index[(tid, body)]] for tid, body in zip(task_ids, bodies)]
+        N, cr, avg_len, med = compile_and_length_stats(prompts, bodies)
         rows.append({
             "version": ver,
-            "pass@1": pass1,
+            "pass@1": pass_at_1(task_ids, passed),
             "compile_rate": cr,
             "N": N,
             "avg_len": avg_len,
             "median_len": med,
-            "path": str(dst)
+            "path": str(path)
         })
     return rows
 
@@ -50,12 +114,35 @@ def main():
     ap.add_argument("--src", required=True, help="combined_*.jsonl to re-process")
     ap.add_argument("--run-dir", default="he_runs")
     ap.add_argument("--versions", nargs="+", default=["v1", "v2", "v3"])
+    ap.add_argument("--write-combined", action="store_true",
+                    help="also write a post-processed combined_*.jsonl copy per version")
+    ap.add_argument("--no-cache", action="store_true", help="ignore the persistent execution result cache")
+    ap.add_argument("--timeout-mode", choices=["wall", "adaptive", "cpu"], default="wall",
+                    help="adaptive/cpu: per-task limits calibrated on canonical solutions")
+    ap.add_argument("--baseline", default=None,
+                    help="results_*.jsonl of an earlier run: execute only completions that changed since")
+    ap.add_argument("--write-eval-files", action="store_true",
+                    help="also write HumanEval samples_/probs_ files for the unique completions")
+    ap.add_argument("--rewrite-only", action="store_true",
+                    help="only write pp_<ver>__<src> copies (no evaluation)")
+    ap.add_argument("--pp-workers", type=int, default=os.cpu_count() or 1,
+                    help="processes for --rewrite-only (byte-range chunks of src)")
     args = ap.parse_args()
 
     src = Path(args.src)
     run_dir = Path(args.run_dir); run_dir.mkdir(parents=True, exist_ok=True)
 
-    rows = sweep_pp_versions(src, run_dir, args.versions)
+    if args.rewrite_only:
+        for ver in args.versions:
+            dst = run_dir / f"pp_{ver}__{src.name}"
+            res = bulk_rewrite_with_pp(src, dst, ver, n_workers=args.pp_workers)
+            print(f"[pp] {ver}: {res['records']} records in {res['seconds']}s "
+                  f"({res['records_per_s']} rec/s, {res['chunks']} chunks, {args.pp_workers} workers) -> {dst}")
+        return
+
+    rows = sweep_pp_versions(src, run_dir, args.versions, write_combined=args.write_combined,
+                             use_cache=not args.no_cache, write_eval_files=args.write_eval_files,
+                             timeout_mode=args.timeout_mode, baseline=args.baseline)
 
     print("\n=== Post-processing sweep (no inference) ===")
     print("version | pass@1 | compile |   N | avg_len | median | path")
@@ -21,8 +21,10 @@ if SRC_DIR not in sys.path:
 
 # --- local imports ---
 from load_datasets import load_humaneval
-from postprocessing import PostProcessor
-from eval_utils import dump_for_eval, eval_pass1
+from postprocessing import get_postprocessor
+from eval_utils import evaluate_records
+from metrics import compare, summarize
+from executor import SAFE_LIMITS
 from prompts import get_header
 
 # -------------------------
@@ -34,6 +36,10 @@ TOKEN    = os.getenv("VLLM_API_KEY", "<RANDOM_PASSWORD>")
 USE_CHAT = True
 
 RUN_DIR = Path("he_runs"); RUN_DIR.mkdir(parents=True, exist_ok=True)
+# "adaptive": per-task wall timeouts (10x canonical, 1 s .. 15 s), hanging samples stop early
+# "cpu": per-task CPU-time budgets calibrated on canonical solutions, so pass@1
+# doesn't move when eval_workers oversubscribes the cores
+EVAL_TIMEOUT_MODE = os.getenv("EVAL_TIMEOUT_MODE", "wall")
 
 BASELINE = dict(
     name="baseline",
@@ -51,6 +57,7 @@ OPTIMIZED = dict(
     max_tokens=320,
     stop=["</sol>"],
     eval_workers=32,
+    eval_limits=SAFE_LIMITS,   # per-sample rlimits keep 32 workers from starving the host
 )
 
 
@@ -108,9 +115,9 @@ def main():
 
     fixed_prompt = "hardened_v2"
     header_str = get_header(fixed_prompt)
-    PostProcessor.set_version("v3")
+    pp = get_postprocessor("v3")
 
-    rows = []
+    rows, eval_rows = [], {}
     for prof in (BASELINE, OPTIMIZED):
         print(f"\n=== Running profile: {prof['name']} | prompt={fixed_prompt} ===")
         t0 = time.time()
@@ -118,7 +125,7 @@ def main():
         records = []
         for ex in ds:
             rec = sync_infer_one(ex, header_str, prof)
-            body = PostProcessor.normalize_body(rec.get("raw_text", ""))
+            body = pp(rec.get("raw_text", ""))
             records.append({**rec, "completion": body})
 
         gen_s = time.time() - t0
@@ -129,15 +136,20 @@ def main():
             for r in records:
                 w.write(json.dumps(r) + "\n")
 
-        samples, probs, N, cr, avg, med = dump_for_eval(combined, RUN_DIR, tag)
         t1 = time.time()
-        pass1 = eval_pass1(str(samples), str(probs), n_workers=prof["eval_workers"])
+        ev = evaluate_records(records, n_workers=prof["eval_workers"], limits=prof.get("eval_limits"),
+                              timeout_mode=EVAL_TIMEOUT_MODE, tag=tag)
+        print(f"[eval] failures: {ev['failures']}")
         eval_s = time.time() - t1
+        N, cr, avg, med = ev["attempted"], ev["compile_rate"], ev["avg_len"], ev["median_len"]
+        metrics = summarize(ev["rows"], ks=(1,))
+        eval_rows[prof["name"]] = ev["rows"]
 
         rows.append(
             (
                 prof["name"],
-                pass1,
+                metrics.get("pass@1", 0.0),
+                metrics.get("pass@1_ci", [0.0, 0.0]),
                 cr,
                 N,
                 avg,
@@ -151,14 +163,20 @@ def main():
 
     # --- Final summary ---
     print(f"\n=== Baseline vs Optimized (prompt={fixed_prompt}) ===")
-    print("profile   | pass@1 | compile |   N | avg_len | median | gen_s | ex/s | eval_s | path")
-    print("----------------------------------------------------------------------------------------")
-    for name, p1, cr, N, avg, med, gs, exs, es, path in rows:
+    print("profile   | pass@1 | 95% CI        | compile |   N | avg_len | median | gen_s | ex/s | eval_s | path")
+    print("--------------------------------------------------------------------------------------------------------")
+    for name, p1, (lo, hi), cr, N, avg, med, gs, exs, es, path in rows:
         print(
-            f"{name:<9} | {p1:.3f} | {cr:.3f} | {N:>3} | {avg:>7} | {med:>6} | "
+            f"{name:<9} | {p1:.3f} | [{lo:.3f}, {hi:.3f}] | {cr:.3f} | {N:>3} | {avg:>7} | {med:>6} | "
             f"{gs:>5.2f} | {exs!s:>4} | {es:>6.2f} | {path}"
         )
 
+    # --- Paired significance: same tasks, resampled together ---
+    cmp = compare(eval_rows[BASELINE["name"]], eval_rows[OPTIMIZED["name"]], k=1)
+    print(f"\n{OPTIMIZED['name']} - {BASELINE['name']}: Δpass@1 = {cmp['diff']:+.3f} "
+          f"(95% CI [{cmp['ci'][0]:+.3f}, {cmp['ci'][1]:+.3f}], paired bootstrap p = {cmp['p_value']:.3f}, "
+          f"{cmp['tasks']} tasks)")
+
 
 if __name__ == "__main__":
     main()
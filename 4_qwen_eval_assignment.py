@@ -19,8 +19,8 @@ if SRC_DIR not in sys.path:
 # --- local imports ---
 from load_datasets import load_humaneval
 from prompts import get_header
-from postprocessing import PostProcessor
-from eval_utils import dump_for_eval, eval_pass1
+from postprocessing import get_postprocessor
+from eval_utils import evaluate_records
 from experiments import sync_infer_one   # already defined for sync inference
 from decode_variants import DECODE_VARIANTS
 
@@ -48,7 +48,7 @@ def main():
 
     # --- get header / pp ---
     header_str = get_header(PROMPT_ID)
-    PostProcessor.set_version(PP_VERSION)
+    pp = get_postprocessor(PP_VERSION)
 
     # --- run inference (sync) ---
     print(f"\n=== Inference: profile=baseline | prompt={PROMPT_ID} | decode={DECODE['name']} | pp={PP_VERSION} ===")
@@ -64,7 +64,7 @@ def main():
             token=TOKEN,
             use_chat=USE_CHAT,
         )
-        body = PostProcessor.normalize_body(rec["raw_text"])
+        body = pp(rec["raw_text"])
         records.append({**rec, "completion": body})
     gen_s = time.time() - t0
 
@@ -76,10 +76,11 @@ def main():
             w.write(json.dumps(r) + "\n")
 
     # --- evaluation ---
-    samples, probs, N, cr, avg, med = dump_for_eval(combined, RUN_DIR, tag)
     t1 = time.time()
-    pass1 = eval_pass1(str(samples), str(probs), n_workers=8)
+    ev = evaluate_records(records, n_workers=8, tag=tag)
     eval_s = time.time() - t1
+    pass1, N, cr = ev.get("pass@1", 0.0), ev["attempted"], ev["compile_rate"]
+    avg, med = ev["avg_len"], ev["median_len"]
 
     # --- results table ---
     print("\n=== Results ===")
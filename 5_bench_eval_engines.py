@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+5_bench_eval_engines.py
+=======================
+Per-sample execution latency of the evaluation engines (no inference):
+
+- human_eval   : upstream evaluate_functional_correctness (process + thread per sample)
+- native_cold  : src/executor.py pool, children fork from a cold worker
+- fork_server  : src/executor.py pool, workers pre-import modules + gc.freeze()
+- grouped      : fork_server + samples batched per task, test harness compiled once (default)
+- grouped_shm  : grouped, over the shared-memory transport (task table + results segments)
+- subinterp    : grouped, each sample in a fresh subinterpreter instead of a fork (Python 3.12+)
+
+Throughput is samples/s; peak_MB is the largest total RSS of the pool's
+process tree (workers + sample children), sampled every 20 ms (Linux).
+
+Samples are HumanEval canonical solutions, or the completions of --src combined_*.jsonl.
+"""
+
+import os, sys, json, time, argparse, threading, statistics as stats
+from pathlib import Path
+
+# --- repo import path ---
+REPO_ROOT = os.path.abspath(os.path.dirname(__file__))
+SRC_DIR   = os.path.join(REPO_ROOT, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# --- local imports ---
+from eval_utils import dump_for_eval, eval_pass1
+from executor import ExecutionPool, build_program
+import subinterp
+
+RUN_DIR = Path("he_runs"); RUN_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def load_records(src, repeat: int):
+    if src:
+        with open(src) as r:
+            records = [json.loads(line) for line in r]
+    else:
+        from load_datasets import load_humaneval
+        ds = load_humaneval(run_sample=False)
+        records = [{**ex, "completion": ex["canonical_solution"]} for ex in ds]
+    return records * repeat
+
+
+def _tree_rss(root: int) -> int:
+    """Total RSS in bytes of root's descendant processes (Linux /proc)."""
+    children, rss = {}, {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(pid))
+        rss[int(pid)] = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    total, todo = 0, list(children.get(root, []))
+    while todo:
+        pid = todo.pop()
+        total += rss.get(pid, 0)
+        todo.extend(children.get(pid, []))
+    return total
+
+
+class _PeakRSS(threading.Thread):
+    def __init__(self, interval: float = 0.02):
+        super().__init__(daemon=True)
+        self.interval, self.peak, self._done = interval, 0, threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, _tree_rss(os.getpid()))
+
+    def stop(self) -> float:
+        self._done.set()
+        self.join()
+        return self.peak / (1 << 20)
+
+
+def bench_native(records, n_workers: int, timeout: float, grouped: bool = False, **pool_kwargs):
+    programs = [build_program(r, r["completion"]) for r in records]
+    problems = {r["task_id"]: r for r in records}
+    t0 = time.time()
+    with ExecutionPool(n_workers=n_workers, timeout=timeout, **pool_kwargs) as pool:
+        startup = time.time() - t0
+        sampler = _PeakRSS() if os.path.isdir("/proc") else None
+        if sampler:
+            sampler.start()
+        t1 = time.time()
+        results = pool.run_tasks(problems, records) if grouped else pool.run(programs)
+        wall = time.time() - t1
+        peak_mb = sampler.stop() if sampler else None
+    runtimes = sorted(r.runtime_s * 1000 for r in results)
+    return {
+        "pass@1": sum(r.passed for r in results) / len(results),
+        "wall_s": wall,
+        "startup_s": startup,
+        "ms_per_sample": 1000 * wall / len(records),
+        "samples_per_s": len(records) / wall,
+        "peak_mb": peak_mb,
+        "p50_ms": stats.median(runtimes),
+        "p95_ms": runtimes[int(0.95 * (len(runtimes) - 1))],
+    }
+
+
+def bench_human_eval(records, n_workers: int, timeout: float):
+    combined = RUN_DIR / "combined_bench_engines.jsonl"
+    with combined.open("w") as w:
+        for r in records:
+            w.write(json.dumps(r) + "\n")
+    samples, probs, *_ = dump_for_eval(combined, RUN_DIR, "bench_engines")
+    t0 = time.time()
+    pass1 = eval_pass1(samples, probs, n_workers=n_workers, timeout=timeout, engine="human_eval")
+    wall = time.time() - t0
+    return {"pass@1": pass1, "wall_s": wall, "startup_s": None, "ms_per_sample": 1000 * wall / len(records),
+            "samples_per_s": len(records) / wall, "peak_mb": None, "p50_ms": None, "p95_ms": None}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src", help="combined_*.jsonl to execute (default: HumanEval canonical solutions)")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=1, help="1 = pure per-sample latency")
+    ap.add_argument("--timeout", type=float, default=15.0)
+    ap.add_argument("--skip-human-eval", action="store_true")
+    args = ap.parse_args()
+
+    records = load_records(args.src, args.repeat)
+    print(f"[data] {len(records)} samples | workers={args.workers}")
+
+    rows = []
+    if not args.skip_human_eval:
+        try:
+            rows.append(("human_eval", bench_human_eval(records, args.workers, args.timeout)))
+        except Exception as e:   # upstream package missing / not cloneable
+            print(f"[skip] human_eval: {e}")
+    rows.append(("native_cold", bench_native(records, args.workers, args.timeout, preload=())))
+    rows.append(("fork_server", bench_native(records, args.workers, args.timeout)))
+    rows.append(("grouped", bench_native(records, args.workers, args.timeout, grouped=True)))
+    rows.append(("grouped_shm", bench_native(records, args.workers, args.timeout, grouped=True,
+                                             transport="shm")))
+    if subinterp.available():
+        rows.append(("subinterp", bench_native(records, args.workers, args.timeout, grouped=True,
+                                               backend="subinterp")))
+    else:
+        print(f"[skip] subinterp: needs Python 3.12+ (running {sys.version.split()[0]})")
+
+    fmt = lambda v: f"{v:>7.2f}" if v is not None else f"{'-':>7}"
+    print("\n=== Evaluation engine latency ===")
+    print("engine       | pass@1 |  wall_s | startup | ms/sample | samples/s | peak_MB | p50_ms  | p95_ms")
+    print("------------------------------------------------------------------------------------------------")
+    for name, r in rows:
+        print(f"{name:<12} | {r['pass@1']:.3f} | {r['wall_s']:>7.2f} | {fmt(r['startup_s'])} | "
+              f"{r['ms_per_sample']:>9.2f} | {r['samples_per_s']:>9.1f} | {fmt(r['peak_mb'])} | "
+              f"{fmt(r['p50_ms'])} | {fmt(r['p95_ms'])}")
+
+
+if __name__ == "__main__":
+    main()
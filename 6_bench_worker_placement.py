@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+6_bench_worker_placement.py
+===========================
+Execution throughput vs worker count under each CPU placement policy
+(src/cpu_placement.py; no inference):
+
+- none   : workers unpinned (outside the reserved cores)
+- core   : one core per worker, NUMA node 0 first
+- spread : one core per worker, alternating NUMA nodes
+- node   : each worker on all cores of one NUMA node, round-robin
+
+For every policy and worker count the same samples run through a grouped
+ExecutionPool. Reported: samples/s, speedup over 1 worker of the same policy,
+and the mean busy % of the worker cores and of the reserved cores.
+
+    python 6_bench_worker_placement.py --workers 1,8,16,32 --reserve 2
+
+Samples are HumanEval canonical solutions, or the completions of --src combined_*.jsonl.
+"""
+
+import os, sys, json, time, argparse
+
+# --- repo import path ---
+REPO_ROOT = os.path.abspath(os.path.dirname(__file__))
+SRC_DIR   = os.path.join(REPO_ROOT, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# --- local imports ---
+import cpu_placement
+from executor import ExecutionPool
+
+
+def load_records(src, repeat: int):
+    if src:
+        with open(src) as r:
+            records = [json.loads(line) for line in r]
+    else:
+        from load_datasets import load_humaneval
+        ds = load_humaneval(run_sample=False)
+        records = [{**ex, "completion": ex["canonical_solution"]} for ex in ds]
+    return records * repeat
+
+
+def bench(records, n_workers: int, policy: str, reserve: int, timeout: float):
+    problems = {r["task_id"]: r for r in records}
+    with ExecutionPool(n_workers=n_workers, timeout=timeout, placement=policy, reserve_cpus=reserve) as pool:
+        pool.run_tasks(problems, records[:n_workers])          # workers up and warm
+        ticks = cpu_placement.cpu_times()
+        t0 = time.time()
+        results = pool.run_tasks(problems, records)
+        wall = time.time() - t0
+        usage = cpu_placement.utilisation(ticks, cpu_placement.cpu_times())
+        reserved = set(pool.reserved_cpus)
+    mean = lambda xs: sum(xs) / len(xs) if xs else None
+    return {
+        "pass@1": sum(r.passed for r in results) / len(results),
+        "samples_per_s": len(records) / wall,
+        "worker_busy": mean([u for c, u in usage.items() if c not in reserved]),
+        "reserved_busy": mean([u for c, u in usage.items() if c in reserved]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src", help="combined_*.jsonl to execute (default: HumanEval canonical solutions)")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--workers", default=None, help="comma-separated worker counts (default: 1, 2, 4, ... cores)")
+    ap.add_argument("--policies", default=",".join(cpu_placement.POLICIES))
+    ap.add_argument("--reserve", type=int, default=0, help="cores kept free for the client")
+    ap.add_argument("--timeout", type=float, default=15.0)
+    args = ap.parse_args()
+
+    cpus = cpu_placement.allowed_cpus()
+    if args.workers:
+        counts = [int(n) for n in args.workers.split(",")]
+    else:
+        counts, n = [], 1
+        while n < len(cpus):
+            counts.append(n)
+            n *= 2
+        counts.append(len(cpus))
+    records = load_records(args.src, args.repeat)
+    nodes = cpu_placement.numa_nodes(cpus)
+    print(f"[data] {len(records)} samples | {len(cpus)} cores on {len(nodes)} NUMA node(s) | reserve={args.reserve}")
+
+    rows = []
+    for policy in args.policies.split(","):
+        base = None
+        for n in counts:
+            r = bench(records, n, policy, args.reserve, args.timeout)
+            base = base or r["samples_per_s"]
+            rows.append((policy, n, r, r["samples_per_s"] / base))
+            print(f"[bench] {policy:<6} workers={n:<3} {r['samples_per_s']:.1f} samples/s")
+
+    fmt = lambda v: f"{v:>8.0f}" if v is not None else f"{'-':>8}"
+    print("\n=== Throughput scaling by worker placement ===")
+    print("policy | workers | pass@1 | samples/s | speedup | worker_busy% | reserved_busy%")
+    print("-------------------------------------------------------------------------------")
+    for policy, n, r, speedup in rows:
+        print(f"{policy:<6} | {n:>7} | {r['pass@1']:.3f} | {r['samples_per_s']:>9.1f} | {speedup:>6.2f}x | "
+              f"{fmt(r['worker_busy']):>12} | {fmt(r['reserved_busy']):>14}")
+
+
+if __name__ == "__main__":
+    main()
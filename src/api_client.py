@@ -1,12 +1,15 @@
 import requests, json, time
 from typing import Dict, Optional, Any, List
+from guided_decoding import guided_fields
 
 class OpenAICompatClient:
-    def __init__(self, api_base: str, api_key: str, use_chat: bool = True, model: str = ""):
+    def __init__(self, api_base: str, api_key: str, use_chat: bool = True, model: str = "",
+                 guided: Optional[str] = None):
         self.api_base = api_base.rstrip("/")
         self.api_key = api_key
         self.use_chat = use_chat
         self.model = model
+        self.guided = guided  # None | "regex" | "grammar" (vLLM guided decoding)
         self.headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
     def health(self) -> Dict[str, Any]:
@@ -15,18 +18,47 @@ class OpenAICompatClient:
 
     def chat_complete(self, messages: List[Dict[str, str]], **gen):
         url = f"{self.api_base}/chat/completions"
-        payload = {"model": self.model, "messages": messages, **gen}
+        payload = {"model": self.model, "messages": messages, **gen,
+                   **guided_fields(self.guided, gen.get("stop"))}
         r = requests.post(url, headers=self.headers, json=payload, timeout=gen.get("timeout", 180))
         r.raise_for_status()
         return r.json()
 
     def text_complete(self, prompt: str, **gen):
         url = f"{self.api_base}/completions"
-        payload = {"model": self.model, "prompt": prompt, **gen}
+        payload = {"model": self.model, "prompt": prompt, **gen,
+                   **guided_fields(self.guided, gen.get("stop"))}
         r = requests.post(url, headers=self.headers, json=payload, timeout=gen.get("timeout", 180))
         r.raise_for_status()
         return r.json()
 
+    def stream_complete(self, user_content: str, system: str = None, **gen):
+        """
+        Yield text deltas of a streamed (SSE) completion.
+        Closing the generator closes the connection, which aborts decoding server-side.
+        """
+        if self.use_chat:
+            msgs = [{"role": "system", "content": system}] if system else []
+            msgs.append({"role": "user", "content": user_content})
+            url, payload = f"{self.api_base}/chat/completions", {"messages": msgs}
+        else:
+            url, payload = f"{self.api_base}/completions", {"prompt": user_content}
+        payload = {"model": self.model, **payload, **gen, "stream": True,
+                   **guided_fields(self.guided, gen.get("stop"))}
+        with requests.post(url, headers=self.headers, json=payload, stream=True,
+                           timeout=gen.get("timeout", 180)) as r:
+            r.raise_for_status()
+            for line in r.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                ch = json.loads(data)["choices"][0]
+                delta = (ch.get("delta") or {}).get("content") or ch.get("text") or ""
+                if delta:
+                    yield delta
+
     def complete(self, user_content: str, system: str = None, **gen):
         if self.use_chat:
             msgs = []
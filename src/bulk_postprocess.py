@@ -0,0 +1,87 @@
+# Parallel bulk post-processing of large combined_*.jsonl files.
+#
+# The input is split into newline-aligned byte ranges; each range is read,
+# post-processed and serialized by a pool worker, and the parts are written
+# back in the original order (output is byte-identical to a serial rewrite).
+
+import json, os, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+from postprocessing import get_postprocessor
+
+DEFAULT_CHUNK_BYTES = 16 << 20   # 16 MiB per job
+
+
+def chunk_ranges(path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """Split a file into [start, end) byte ranges that begin and end on line boundaries."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        pos = chunk_bytes
+        while pos < size:
+            f.seek(pos)
+            f.readline()                 # finish the line we landed in
+            start = f.tell()
+            if start >= size:
+                break
+            if start > bounds[-1]:
+                bounds.append(start)
+            pos = start + chunk_bytes
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _process_range(args) -> Tuple[bytes, int]:
+    path, start, end, version = args
+    pp = get_postprocessor(version)
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    out, n = [], 0
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        rec = json.loads(line)
+        raw = rec.get("raw_text", rec.get("completion", ""))
+        rec["completion"] = pp(raw)
+        out.append(json.dumps(rec) + "\n")
+        n += 1
+    return "".join(out).encode(), n
+
+
+def bulk_rewrite_with_pp(
+    src_path: Path,
+    dst_path: Path,
+    version: str,
+    n_workers: int = os.cpu_count() or 1,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> dict:
+    """
+    Re-process a combined jsonl file with a PostProcessor version using a process pool.
+
+    Returns:
+        {"records", "chunks", "seconds", "records_per_s"}
+    """
+    t0 = time.time()
+    ranges = chunk_ranges(src_path, chunk_bytes)
+    jobs = [(str(src_path), start, end, version) for start, end in ranges]
+    records = 0
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 and len(jobs) > 1 else None
+    try:
+        parts = pool.map(_process_range, jobs) if pool else map(_process_range, jobs)
+        with open(dst_path, "wb") as w:
+            for data, n in parts:          # map() yields in input order
+                w.write(data)
+                records += n
+    finally:
+        if pool:
+            pool.shutdown()
+    secs = time.time() - t0
+    return {
+        "records": records,
+        "chunks": len(jobs),
+        "seconds": round(secs, 3),
+        "records_per_s": round(records / secs, 1) if secs > 0 else None,
+    }
@@ -0,0 +1,133 @@
+# src/calibration.py
+# Per-task timing baselines from HumanEval canonical solutions.
+#
+# Each task's canonical_solution is executed against its own test a few times
+# in the execution pool; the slowest run is the task's baseline. Baselines turn
+# into per-task budgets (factor x baseline, clamped to [floor, ceiling]): CPU-
+# time budgets that give the same verdicts however loaded the host is, or
+# adaptive wall-clock timeouts so a hanging sample costs ~1 s instead of 15.
+#
+# Baselines are cached on disk (JSON, keyed by a hash of the task content), so
+# calibration runs once per task, not once per evaluation.
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from executor import ExecutionPool
+
+DEFAULT_REPEATS = 3
+DEFAULT_CALIBRATION_PATH = Path(os.getenv(
+    "HE_CALIBRATION_CACHE", Path.home() / ".cache" / "qwen_humaneval" / "calibration.json"))
+CPU_FACTOR = 20.0    # budget = CPU_FACTOR x canonical CPU time ...
+CPU_FLOOR = 1.0      # ... but never below CPU_FLOOR CPU seconds
+WALL_FACTOR = 10.0   # adaptive timeout = WALL_FACTOR x canonical wall time,
+WALL_FLOOR = 1.0     # clamped to [WALL_FLOOR, ceiling] (ceiling: the flat timeout)
+
+
+def calibrate(
+    problems: Dict[str, dict],
+    repeats: int = DEFAULT_REPEATS,
+    timeout: float = 30.0,
+    n_workers: int = 8,
+    pool: Optional[ExecutionPool] = None,
+) -> Dict[str, dict]:
+    """
+    Time every task's canonical_solution.
+
+    Returns:
+        {task_id: {"wall_s", "cpu_s", "passed"}}; times are the max over repeats,
+        passed is False if any run failed (broken canonical solutions get no
+        tight budget, see budgets())
+    """
+    samples = [
+        {"task_id": tid, "completion": prob["canonical_solution"]}
+        for tid, prob in problems.items()
+        for _ in range(repeats)
+    ]
+    if pool is None:
+        with ExecutionPool(n_workers=min(n_workers, len(samples)), timeout=timeout) as own:
+            results = own.run_tasks(problems, samples)
+    else:
+        results = pool.run_tasks(problems, samples, [timeout] * len(samples))
+
+    baselines: Dict[str, dict] = {}
+    for s, r in zip(samples, results):
+        b = baselines.setdefault(s["task_id"], {"wall_s": 0.0, "cpu_s": 0.0, "passed": True})
+        b["wall_s"] = max(b["wall_s"], r.runtime_s)
+        b["cpu_s"] = max(b["cpu_s"], r.cpu_s)
+        b["passed"] = b["passed"] and r.passed
+    return baselines
+
+
+def task_key(problem: dict) -> str:
+    """Content hash of everything that determines the canonical run."""
+    blob = "\0".join(problem[f] for f in ("prompt", "canonical_solution", "test", "entry_point"))
+    return hashlib.sha256(blob.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def load_baselines(
+    problems: Dict[str, dict],
+    path: Optional[Path] = DEFAULT_CALIBRATION_PATH,
+    refresh: bool = False,
+    **calibrate_kwargs,
+) -> Dict[str, dict]:
+    """
+    Baselines for every task: cached ones from `path`, the rest calibrated now
+    and added to the cache. path=None disables the cache; refresh=True re-times all.
+    """
+    cache = {}
+    if path is not None and not refresh and Path(path).exists():
+        with open(path) as r:
+            cache = json.load(r)
+    keys = {tid: task_key(prob) for tid, prob in problems.items()}
+    missing = {tid: problems[tid] for tid, key in keys.items() if key not in cache}
+    if missing:
+        print(f"[calibrate] timing {len(missing)} canonical solutions ({len(problems) - len(missing)} cached)")
+        for tid, b in calibrate(missing, **calibrate_kwargs).items():
+            cache[keys[tid]] = b
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            tmp = Path(f"{path}.tmp{os.getpid()}.{threading.get_ident()}")
+            with open(tmp, "w") as w:
+                json.dump(cache, w)
+            os.replace(tmp, path)       # atomic: concurrent evaluations never see half a file
+    return {tid: cache[key] for tid, key in keys.items()}
+
+
+def budgets(
+    baselines: Dict[str, dict],
+    key: str = "cpu_s",
+    factor: float = CPU_FACTOR,
+    floor: float = CPU_FLOOR,
+    ceiling: Optional[float] = None,
+) -> Dict[str, float]:
+    """
+    {task_id: min(ceiling, max(floor, factor * baseline[key]))}.
+    Tasks whose canonical solution failed get the ceiling (or are left out
+    without one, so the caller's flat timeout applies).
+    """
+    out = {}
+    for tid, b in baselines.items():
+        if not b["passed"]:
+            if ceiling is not None:
+                out[tid] = ceiling
+            continue
+        value = max(floor, factor * b[key])
+        out[tid] = min(ceiling, value) if ceiling is not None else value
+    return out
+
+
+def cpu_budgets(problems: Dict[str, dict], factor: float = CPU_FACTOR, floor: float = CPU_FLOOR,
+                ceiling: Optional[float] = None, **calibrate_kwargs) -> Dict[str, float]:
+    """Per-task CPU-time budgets from (cached) canonical baselines."""
+    return budgets(load_baselines(problems, **calibrate_kwargs), "cpu_s", factor, floor, ceiling)
+
+
+def wall_timeouts(problems: Dict[str, dict], ceiling: float, factor: float = WALL_FACTOR,
+                  floor: float = WALL_FLOOR, **calibrate_kwargs) -> Dict[str, float]:
+    """Per-task wall-clock timeouts from (cached) canonical baselines, never above ceiling."""
+    return budgets(load_baselines(problems, **calibrate_kwargs), "wall_s", factor, floor, ceiling)
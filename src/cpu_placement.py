@@ -0,0 +1,137 @@
+# src/cpu_placement.py
+# CPU placement of ExecutionPool workers (Linux; elsewhere workers stay unpinned).
+#
+#     ExecutionPool(placement="spread", reserve_cpus=2)   # or HE_EXEC_PLACEMENT / HE_EXEC_RESERVE_CPUS
+#
+# reserve_cpus keeps the first N usable cores free of workers, for the process
+# driving the pool (generation client, event loop). Policies over the other cores:
+#   none    no pinning (with reserved cores: any non-reserved core)
+#   core    worker i on one core, filling NUMA node 0 first
+#   spread  worker i on one core, alternating between NUMA nodes
+#   node    worker i on every core of NUMA node i % n_nodes
+# More workers than cores wrap around. Sample children inherit their worker's
+# affinity, so with the kernel's default first-touch policy their memory is
+# allocated on the worker's node as well.
+#
+# cpu_times()/utilisation() read per-core busy time from /proc/stat for the
+# run summary (host-wide: other processes count too).
+
+import glob
+import os
+import re
+from contextlib import suppress
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+POLICIES = ("none", "core", "spread", "node")
+
+
+def parse_cpulist(text: str) -> List[int]:
+    """'0-3,8,10-11' -> [0, 1, 2, 3, 8, 10, 11]"""
+    cpus = []
+    for part in text.strip().split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def allowed_cpus() -> List[int]:
+    """Cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def numa_nodes(cpus: Sequence[int]) -> List[List[int]]:
+    """cpus grouped by NUMA node (sysfs); a single group when the topology is unknown."""
+    wanted, groups, seen = set(cpus), [], set()
+    paths = glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")
+    for path in sorted(paths, key=lambda p: int(re.search(r"node(\d+)/", p).group(1))):
+        try:
+            with open(path) as f:
+                node = [c for c in parse_cpulist(f.read()) if c in wanted]
+        except (OSError, ValueError):
+            continue
+        if node:
+            groups.append(node)
+            seen.update(node)
+    rest = [c for c in cpus if c not in seen]
+    if rest:
+        groups.append(rest)
+    return groups
+
+
+def plan(n_workers: int, policy: str = "none",
+         reserve: int = 0) -> Tuple[List[Optional[FrozenSet[int]]], List[int]]:
+    """
+    Per-worker core sets (None = unpinned) for `policy`, and the reserved cores.
+    At least one core is always left for the workers.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown placement: {policy}. Choices: {list(POLICIES)}")
+    cpus = allowed_cpus()
+    if reserve >= len(cpus):
+        print(f"[exec] only {len(cpus)} cores available; reserving {len(cpus) - 1} for the client")
+        reserve = len(cpus) - 1
+    reserved, cpus = cpus[:max(0, reserve)], cpus[max(0, reserve):]
+    nodes = numa_nodes(cpus)
+    if policy == "none":
+        sets = [frozenset(cpus) if reserved else None] * n_workers
+    elif policy == "node":
+        sets = [frozenset(nodes[i % len(nodes)]) for i in range(n_workers)]
+    else:
+        if policy == "core":
+            order = [c for node in nodes for c in node]
+        else:                                        # spread: node 0, node 1, ..., node 0, ...
+            order = [node[j] for j in range(max(map(len, nodes))) for node in nodes if j < len(node)]
+        sets = [frozenset([order[i % len(order)]]) for i in range(n_workers)]
+    return sets, reserved
+
+
+def pin(pid: int, cpus: Optional[FrozenSet[int]]):
+    """Restrict a process to cpus (no-op for None, or where unsupported)."""
+    if cpus is not None and hasattr(os, "sched_setaffinity"):
+        with suppress(OSError):                      # already gone
+            os.sched_setaffinity(pid, cpus)
+
+
+# ------------------------------------------------------------
+# Per-core utilisation
+# ------------------------------------------------------------
+def cpu_times() -> Dict[int, Tuple[int, int]]:
+    """{core: (busy ticks, total ticks)} from /proc/stat ({} if unavailable)."""
+    out = {}
+    try:
+        with open("/proc/stat") as f:
+            for line in f:
+                if line.startswith("cpu") and line[3].isdigit():
+                    name, *ticks = line.split()
+                    ticks = [int(t) for t in ticks]
+                    idle = ticks[3] + (ticks[4] if len(ticks) > 4 else 0)   # idle + iowait
+                    out[int(name[3:])] = (sum(ticks[:8]) - idle, sum(ticks[:8]))
+    except (OSError, ValueError, IndexError):
+        return {}
+    return out
+
+
+def utilisation(before: Dict[int, Tuple[int, int]], after: Dict[int, Tuple[int, int]]) -> Dict[int, float]:
+    """{core: busy %} between two cpu_times() snapshots."""
+    out = {}
+    for cpu, (busy, total) in after.items():
+        if cpu in before and total > before[cpu][1]:
+            out[cpu] = 100.0 * (busy - before[cpu][0]) / (total - before[cpu][1])
+    return out
+
+
+def usage_lines(usage: Dict[int, float], reserved: Sequence[int] = ()) -> List[str]:
+    """Run-summary lines: busy % per core, one line per NUMA node; * marks reserved cores."""
+    lines, reserved = [], set(reserved)
+    nodes = numa_nodes(sorted(usage))
+    for n, node in enumerate(nodes):
+        mean = sum(usage[c] for c in node) / len(node)
+        label = f"node{n} " if len(nodes) > 1 else ""
+        cores = " ".join(f"{c}:{usage[c]:.0f}{'*' if c in reserved else ''}" for c in node)
+        lines.append(f"{label}busy% (mean {mean:.0f}): {cores}")
+    return lines
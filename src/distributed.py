@@ -0,0 +1,406 @@
+# src/distributed.py
+# Coordinator / worker mode for the native executor.
+#
+# The coordinator listens on TCP (host:port) or a Unix socket and exposes the
+# same run_tasks()/run() interface as executor.ExecutionPool, so it can be
+# passed as `pool=` anywhere (check_samples, evaluate_records, calibration).
+# Workers (`python src/distributed.py worker --connect HOST:PORT`) run a local
+# ExecutionPool, pull task-grouped batches, and stream results back.
+#
+#   - pull scheduling: each worker keeps up to `slots` batches in flight, so
+#     faster machines simply take more;
+#   - work stealing: an idle worker with nothing left to pull re-runs the
+#     oldest batch still in flight elsewhere; the first result wins;
+#   - retries: batches held by a worker that disconnects go back to the front
+#     of the queue, up to max_attempts, then fail as "infra".
+#
+# Messages are pickled over multiprocessing.connection, authenticated with a
+# shared key (HE_DIST_AUTHKEY); only run it on networks you trust.
+
+import argparse
+import contextlib
+import itertools
+import os
+import queue
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from multiprocessing.connection import Client, Listener
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from executor import PRELOAD_MODULES, SAFE_LIMITS, ExecResult, ExecutionPool, NO_LIMITS, build_tail
+
+DEFAULT_PORT = 7461
+STEAL_AFTER = 2.0     # seconds a batch must have been in flight before an idle worker duplicates it
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(spec: str) -> Address:
+    """"host:port" -> (host, port); "unix:/path" or "/path" -> Unix socket path."""
+    if spec.startswith("unix:"):
+        return spec[len("unix:"):]
+    if spec.startswith("/"):
+        return spec
+    host, _, port = spec.rpartition(":")
+    return (host or "0.0.0.0", int(port or DEFAULT_PORT))
+
+
+def _authkey(key: Optional[Union[str, bytes]]) -> bytes:
+    key = key or os.getenv("HE_DIST_AUTHKEY")
+    if not key:
+        raise ValueError("no authkey: pass authkey= or set HE_DIST_AUTHKEY (same value on coordinator and workers)")
+    return key.encode() if isinstance(key, str) else key
+
+
+# ------------------------------------------------------------
+# Coordinator
+# ------------------------------------------------------------
+class _Run:
+    """Results of one run_tasks()/run() call."""
+    __slots__ = ("results", "remaining", "done")
+
+    def __init__(self, n: int, n_jobs: int):
+        self.results: List[Optional[ExecResult]] = [None] * n
+        self.remaining = n_jobs
+        self.done = threading.Event()
+        if n_jobs == 0:
+            self.done.set()
+
+
+class _Job:
+    """One batch: items are (index, completion, timeout) into its run's results."""
+    __slots__ = ("id", "run", "prefix", "tail", "items", "cpu_time", "attempts", "holders", "sent_at", "finished")
+
+    def __init__(self, job_id: int, run: _Run, prefix: str, tail: str, items: list, cpu_time: bool):
+        self.id, self.run, self.prefix, self.tail, self.items, self.cpu_time = job_id, run, prefix, tail, items, cpu_time
+        self.attempts = 0
+        self.holders = set()      # names of workers currently running it
+        self.sent_at = 0.0
+        self.finished = False
+
+    def message(self):
+        return self.id, self.prefix, self.tail, [(c, t) for _, c, t in self.items], self.cpu_time
+
+
+class Coordinator:
+    """
+    Hands batches of samples to remote execution workers.
+
+        with Coordinator("0.0.0.0:7461", authkey="...") as coord:
+            coord.start_local_workers(2)      # optional, e.g. for testing
+            results = coord.run_tasks(problems, samples)
+
+    Drop-in for ExecutionPool (`pool=coord`); per-sample limits are whatever
+    each worker was started with.
+    """
+
+    def __init__(self, address: Union[str, Address] = f"127.0.0.1:{DEFAULT_PORT}",
+                 authkey: Optional[Union[str, bytes]] = None, timeout: float = 15.0,
+                 batch_size: int = 16, max_attempts: int = 3, steal_after: float = STEAL_AFTER):
+        if authkey is None and not os.getenv("HE_DIST_AUTHKEY"):
+            authkey = secrets.token_hex(16)       # local-only use; remote workers need the key set explicitly
+        self._key = _authkey(authkey)
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.steal_after = steal_after
+        self.stats = defaultdict(int)             # batches sent / stolen / retried / failed
+        self.workers: Dict[str, int] = {}         # connected worker name -> slots
+        self._listener = Listener(parse_address(address) if isinstance(address, str) else address,
+                                  authkey=self._key)
+        self.address = self._listener.address
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._inflight: Dict[int, _Job] = {}
+        self._ids = itertools.count()
+        self._local: List[subprocess.Popen] = []
+        self._closed = False
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    # -- public API (same as ExecutionPool) ---------------------------------
+    def run(self, programs: Sequence[str], timeouts: Optional[Sequence[float]] = None,
+            cpu_time: bool = False) -> List[ExecResult]:
+        timeouts = timeouts if timeouts is not None else [self.timeout] * len(programs)
+        return self._submit([("", "", [(i, p, t)]) for i, (p, t) in enumerate(zip(programs, timeouts))],
+                            len(programs), cpu_time)
+
+    def run_tasks(self, problems: Dict[str, dict], samples: Sequence[dict],
+                  timeouts: Optional[Sequence[float]] = None, cpu_time: bool = False,
+                  slow: Optional[Sequence[bool]] = None) -> List[ExecResult]:
+        """slow: per-sample flags; flagged samples are sent one per batch so they hold up nothing else."""
+        timeouts = timeouts if timeouts is not None else [self.timeout] * len(samples)
+        slow = slow if slow is not None else [False] * len(samples)
+        groups: Dict[tuple, list] = defaultdict(list)
+        for i, (s, t, sl) in enumerate(zip(samples, timeouts, slow)):
+            groups[s["task_id"], bool(sl)].append((i, s["completion"], t))
+        batches = []
+        for (task_id, sl), items in groups.items():
+            problem = problems[task_id]
+            prefix, tail = problem["prompt"], build_tail(problem)
+            size = 1 if sl else self.batch_size
+            for j in range(0, len(items), size):
+                batches.append((prefix, tail, items[j:j + size]))
+        return self._submit(batches, len(samples), cpu_time)
+
+    def wait_for_workers(self, n: int = 1, timeout: Optional[float] = None) -> bool:
+        """Block until at least n workers are connected; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self.workers) >= n, timeout)
+
+    def start_local_workers(self, n: int = 1, n_workers: int = 2, safe_limits: bool = False) -> List[subprocess.Popen]:
+        """Start n worker processes on this machine (each with its own n_workers-process pool)."""
+        host, port = self.address if isinstance(self.address, tuple) else (None, None)
+        target = f"unix:{self.address}" if port is None else f"{'127.0.0.1' if host in ('0.0.0.0', '') else host}:{port}"
+        cmd = [sys.executable, os.path.abspath(__file__), "worker", "--connect", target,
+               "--workers", str(n_workers)] + (["--safe-limits"] if safe_limits else [])
+        env = {**os.environ, "HE_DIST_AUTHKEY": self._key.decode()}
+        procs = [subprocess.Popen(cmd + ["--name", f"local-{len(self._local) + i}"], env=env) for i in range(n)]
+        self._local.extend(procs)
+        return procs
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        with contextlib.suppress(Exception):
+            self._listener.close()
+        for proc in self._local:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- scheduling ---------------------------------------------------------
+    def _submit(self, batches: List[tuple], n: int, cpu_time: bool) -> List[ExecResult]:
+        run = _Run(n, len(batches))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Coordinator is closed")
+            self._pending.extend(_Job(next(self._ids), run, *b, cpu_time) for b in batches)
+            self._cond.notify_all()
+            if batches and not self.workers:
+                print(f"[dist] {len(batches)} batches queued, waiting for workers on {self.address}")
+        run.done.wait()
+        return run.results
+
+    def _take(self, name: str, want: int, idle: bool) -> List[_Job]:
+        """Up to `want` jobs for worker `name` (called with the lock held)."""
+        jobs = []
+        while self._pending and len(jobs) < want:
+            job = self._pending.popleft()
+            if not job.finished:
+                jobs.append(job)
+        if not jobs and idle:
+            now = time.monotonic()
+            stale = [j for j in self._inflight.values()
+                     if len(j.holders) == 1 and name not in j.holders and now - j.sent_at >= self.steal_after]
+            if stale:
+                jobs.append(min(stale, key=lambda j: j.sent_at))
+                self.stats["stolen"] += 1
+        for job in jobs:
+            job.holders.add(name)
+            job.attempts += 1
+            job.sent_at = job.sent_at or time.monotonic()
+            self._inflight[job.id] = job
+        self.stats["sent"] += len(jobs)
+        return jobs
+
+    def _finish(self, job: _Job, results: Optional[List[ExecResult]]):
+        """Record a job's results (None = fail it); duplicates from stolen copies are ignored."""
+        if job.finished:
+            return
+        job.finished = True
+        self._inflight.pop(job.id, None)
+        for k, (idx, _, _) in enumerate(job.items):
+            job.run.results[idx] = results[k] if results is not None else ExecResult(
+                False, "failed: execution worker lost", 0.0, "infra")
+        job.run.remaining -= 1
+        if job.run.remaining == 0:
+            job.run.done.set()
+
+    def _lost(self, job: _Job, name: str) -> bool:
+        """Worker `name` dropped the job: re-queue it (True) unless finished or still running elsewhere."""
+        job.holders.discard(name)
+        if job.finished or job.holders:
+            return False                             # done, or a stolen copy is still running
+        self._inflight.pop(job.id, None)
+        if job.attempts >= self.max_attempts:
+            self.stats["failed"] += 1
+            self._finish(job, None)
+            return False
+        self.stats["retried"] += 1
+        job.sent_at = 0.0
+        self._pending.appendleft(job)
+        return True
+
+    # -- connections --------------------------------------------------------
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                continue                              # failed handshake (wrong key, port scan, ...)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            _, name, slots = conn.recv()              # ("hello", name, slots)
+        except Exception:
+            conn.close()
+            return
+        with self._cond:
+            while name in self.workers:
+                name += "'"
+            self.workers[name] = slots
+            self._cond.notify_all()
+        print(f"[dist] worker {name} connected ({slots} slots)")
+        mine: Dict[int, _Job] = {}
+        try:
+            while True:
+                with self._cond:
+                    while True:
+                        new = self._take(name, slots - len(mine), idle=not mine)
+                        if new or mine or self._closed:
+                            break
+                        self._cond.wait(0.5)          # re-check for stealable work
+                if not new and not mine:              # closed and nothing in flight
+                    conn.send(None)
+                    break
+                for job in new:
+                    mine[job.id] = job
+                    conn.send(job.message())
+                job_id, results = conn.recv()
+                with self._cond:
+                    job = mine.pop(job_id)
+                    job.holders.discard(name)
+                    self._finish(job, results)
+                    self._cond.notify_all()
+        except (EOFError, OSError):
+            with self._cond:
+                requeued = sum(self._lost(job, name) for job in mine.values())
+                self._cond.notify_all()
+            print(f"[dist] worker {name} lost with {len(mine)} batches in flight, {requeued} re-queued")
+        finally:
+            with self._cond:
+                self.workers.pop(name, None)
+            conn.close()
+
+
+_DEFAULT: Optional[Coordinator] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_coordinator() -> Optional[Coordinator]:
+    """
+    Process-wide coordinator listening on HE_EXEC_COORDINATOR (host:port or
+    unix:/path), or None when unset; HE_DIST_LOCAL_WORKERS=N also starts N
+    workers on this machine.
+    """
+    global _DEFAULT
+    spec = os.getenv("HE_EXEC_COORDINATOR")
+    if not spec:
+        return None
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = Coordinator(spec)
+            n_local = int(os.getenv("HE_DIST_LOCAL_WORKERS", "0"))
+            if n_local:
+                _DEFAULT.start_local_workers(n_local, n_workers=os.cpu_count() or 1)
+    return _DEFAULT
+
+
+# ------------------------------------------------------------
+# Worker
+# ------------------------------------------------------------
+def serve(address: Union[str, Address], authkey: Optional[Union[str, bytes]] = None,
+          n_workers: int = 8, name: Optional[str] = None, limits=NO_LIMITS,
+          preload: Sequence[str] = PRELOAD_MODULES, retry_s: float = 30.0):
+    """
+    Connect to a coordinator and execute its batches until it says stop.
+    Each batch goes to the local pool as soon as it arrives and its results
+    are sent back as soon as it finishes, so a straggler holds up nothing else.
+    """
+    address = parse_address(address) if isinstance(address, str) else address
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    pool = ExecutionPool(n_workers=n_workers, limits=limits, preload=preload)   # before connecting: pool
+    deadline = time.monotonic() + retry_s                                        # processes mustn't inherit the socket
+    while True:
+        try:
+            conn = Client(address, authkey=_authkey(authkey))
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.monotonic() > deadline:
+                pool.close()
+                raise
+            time.sleep(0.5)
+    events: "queue.Queue" = queue.Queue()        # ("job", msg) | ("done", job_id, future) | ("stop", graceful)
+
+    def _read():                                  # always drain the socket, so sends never deadlock
+        try:
+            while True:
+                msg = conn.recv()
+                if msg is None:
+                    break
+                events.put(("job", msg))
+            events.put(("stop", True))
+        except (EOFError, OSError):
+            events.put(("stop", False))
+
+    with pool, conn:
+        conn.send(("hello", name, pool.n_workers))
+        threading.Thread(target=_read, daemon=True).start()
+        done, running, stop = 0, 0, False
+        while running or not stop:
+            event = events.get()
+            if event[0] == "job":
+                job_id, prefix, tail, items, cpu_time = event[1]
+                future = pool.submit_batch(prefix, tail, items, cpu_time)
+                future.add_done_callback(lambda f, job_id=job_id: events.put(("done", job_id, f)))
+                running += 1
+            elif event[0] == "done":
+                _, job_id, future = event
+                running -= 1
+                if future.exception() is not None:
+                    continue                      # pool closing: the coordinator re-queues it
+                try:
+                    conn.send((job_id, future.result()))
+                except OSError:
+                    break
+                done += len(future.result())
+            elif not event[1]:                    # coordinator gone: nobody to send results to
+                break
+            else:
+                stop = True
+    print(f"[dist] worker {name}: {done} samples executed")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Distributed HumanEval execution worker")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    w = sub.add_parser("worker", help="connect to a coordinator and execute its batches")
+    w.add_argument("--connect", required=True, help="coordinator host:port or unix:/path")
+    w.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="local execution processes")
+    w.add_argument("--name", default=None)
+    w.add_argument("--safe-limits", action="store_true", help="apply executor.SAFE_LIMITS to every sample")
+    args = ap.parse_args()
+    serve(args.connect, n_workers=args.workers, name=args.name,
+          limits=SAFE_LIMITS if args.safe_limits else NO_LIMITS)
+
+
+if __name__ == "__main__":
+    main()
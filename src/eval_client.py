@@ -0,0 +1,169 @@
+# src/eval_client.py
+# Thin client for src/eval_daemon.py (stdlib only, so importing it is instant).
+#
+#     client = EvalClient()                         # HE_EVAL_DAEMON or the default socket
+#     ev = client.evaluate_records(records)         # same dict as eval_utils.evaluate_records
+#     fut = client.submit_records(records)          # concurrent.futures.Future of that dict
+#     p1 = eval_pass1(samples_path, probs_path)     # drop-in for eval_utils.eval_pass1
+#
+# Addresses: "unix:/path/evald.sock", "/path/evald.sock", "http://127.0.0.1:8765" or "127.0.0.1:8765".
+# HTTP daemons require a token: HE_EVAL_TOKEN, else the one the daemon wrote to TOKEN_FILE.
+
+import dataclasses
+import http.client
+import json
+import os
+import socket
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional, Sequence
+
+DEFAULT_SOCKET = Path(os.getenv("HE_EVAL_SOCKET", Path.home() / ".cache" / "qwen_humaneval" / "evald.sock"))
+TOKEN_FILE = DEFAULT_SOCKET.parent / "evald.token"
+POLL_S = 30.0   # long-poll interval for background jobs
+# what evaluate_records reads from a record; generation metadata (raw_text, usage, ...) stays home
+RECORD_FIELDS = ("task_id", "prompt", "entry_point", "canonical_solution", "test", "completion")
+
+
+class DaemonError(RuntimeError):
+    """The daemon answered with an error (bad options, failed evaluation)."""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def read_token() -> Optional[str]:
+    """HE_EVAL_TOKEN, else the token an HTTP daemon on this machine wrote to TOKEN_FILE."""
+    token = os.getenv("HE_EVAL_TOKEN")
+    if token:
+        return token
+    try:
+        return TOKEN_FILE.read_text().strip() or None
+    except OSError:
+        return None
+
+
+class EvalClient:
+    """HTTP client of one evaluation daemon."""
+
+    def __init__(self, address: Optional[str] = None, timeout: Optional[float] = None,
+                 token: Optional[str] = None):
+        address = address or os.getenv("HE_EVAL_DAEMON") or f"unix:{DEFAULT_SOCKET}"
+        self.timeout = timeout
+        self._headers = {"Content-Type": "application/json"}
+        if address.startswith("unix:") or address.startswith("/"):
+            self._unix, self._host = address[len("unix:"):] if address.startswith("unix:") else address, None
+        else:
+            host = address.split("://", 1)[-1].rstrip("/")
+            self._unix, self._host = None, host
+            token = token or read_token()
+            if token:
+                self._headers["Authorization"] = f"Bearer {token}"
+        self.address = address
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None, timeout: Optional[float] = None):
+        conn = (_UnixHTTPConnection(self._unix, timeout or self.timeout) if self._unix
+                else http.client.HTTPConnection(self._host, timeout=timeout or self.timeout))
+        try:
+            body = json.dumps(payload).encode() if payload is not None else None
+            conn.request(method, path, body=body, headers=self._headers)
+            resp = conn.getresponse()
+            data = json.loads(resp.read() or b"{}")
+        finally:
+            conn.close()
+        if resp.status >= 400:
+            raise DaemonError(data.get("error", f"HTTP {resp.status}"))
+        return data
+
+    @staticmethod
+    def _payload(records: Sequence[dict], options: dict) -> dict:
+        limits = options.get("limits")
+        if limits is not None and dataclasses.is_dataclass(limits):
+            options = {**options, "limits": dataclasses.asdict(limits)}
+        for opt in ("write_dir", "baseline"):                 # the daemon has its own cwd
+            if options.get(opt) is not None:
+                options = {**options, opt: str(Path(options[opt]).resolve())}
+        return {"records": [{f: rec[f] for f in RECORD_FIELDS if f in rec} for rec in records], **options}
+
+    def available(self) -> bool:
+        try:
+            self._request("GET", "/health", timeout=2.0)
+            return True
+        except (OSError, DaemonError, ValueError):
+            return False
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def evaluate_records(self, records: Sequence[dict], **options) -> dict:
+        """Blocking evaluation on the daemon; options as for eval_utils.evaluate_records."""
+        return self._request("POST", "/evaluate", self._payload(records, options))
+
+    def submit(self, records: Sequence[dict], **options) -> str:
+        """Queue an evaluation; returns its job id (see result())."""
+        return self._request("POST", "/jobs", self._payload(records, options))["job_id"]
+
+    def result(self, job_id: str, wait: float = 0.0) -> Optional[dict]:
+        """The job's evaluate_records dict, or None if it is still running after `wait` seconds."""
+        job = self._request("GET", f"/jobs/{job_id}?wait={wait}", timeout=wait + self.timeout if self.timeout else None)
+        if job["status"] == "error":
+            raise DaemonError(job["error"])
+        return job.get("result")
+
+    def submit_records(self, records: Sequence[dict], **options) -> Future:
+        """Non-blocking evaluate_records(); a background thread long-polls for the result."""
+        fut: Future = Future()
+        job_id = self.submit(records, **options)
+
+        def _wait():
+            try:
+                res = None
+                while res is None:
+                    res = self.result(job_id, wait=POLL_S)
+                fut.set_result(res)
+            except Exception as e:
+                fut.set_exception(e)
+
+        threading.Thread(target=_wait, daemon=True).start()
+        return fut
+
+    def shutdown(self):
+        self._request("POST", "/shutdown")
+
+
+def _read_jsonl(path) -> list:
+    with open(path) as r:
+        return [json.loads(line) for line in r if line.strip()]
+
+
+def eval_pass1(
+    samples_path: Path,
+    probs_path: Path,
+    n_workers: int = 8,
+    timeout: int = 15,
+    engine: str = "native",
+    use_cache: bool = True,
+    client: Optional[EvalClient] = None,
+) -> float:
+    """
+    Drop-in for eval_utils.eval_pass1: evaluates on the daemon when one is
+    reachable, otherwise falls back to the local evaluator.
+    """
+    client = client or EvalClient()
+    if engine != "native" or not client.available():
+        from eval_utils import eval_pass1 as local_eval_pass1
+        return local_eval_pass1(samples_path, probs_path, n_workers, timeout, engine, use_cache)
+    problems = {p["task_id"]: p for p in _read_jsonl(probs_path)}
+    records = [{**problems[s["task_id"]], "completion": s["completion"]} for s in _read_jsonl(samples_path)]
+    ev = client.evaluate_records(records, n_workers=n_workers, timeout=timeout, use_cache=use_cache)
+    return float(ev.get("pass@1", 0.0))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Local evaluation daemon: keeps warm execution pools and the result cache
+alive between runs, so notebooks and scripts skip evaluator start-up.
+
+    python src/eval_daemon.py                        # Unix socket at DEFAULT_SOCKET
+    python src/eval_daemon.py --port 8765            # or localhost HTTP, token-protected
+    export HE_EVAL_DAEMON=unix:$HOME/.cache/qwen_humaneval/evald.sock   # route evaluate_records there
+
+Endpoints (JSON):
+    GET  /health            pools, cache stats, jobs in flight
+    POST /evaluate          {"records": [...], **options} -> evaluate_records result
+    POST /jobs              same body -> {"job_id"}; evaluation runs in the background
+    GET  /jobs/<id>?wait=S  {"status": "running" | "done" | "error", "result" | "error"}
+    POST /shutdown
+
+options are evaluate_records keyword arguments (n_workers, timeout, k,
+use_cache, timeout_mode, task_timeouts, prefilter, lanes, units, spread,
+baseline, write_dir, tag) plus "limits" as a dict of executor.Limits fields. See
+src/eval_client.py for the client.
+
+Requests run arbitrary code as the daemon's user. The Unix socket is created
+0600, so only that user can connect. Over HTTP any local user can connect,
+so every request must carry `Authorization: Bearer <token>`. The token is
+HE_EVAL_TOKEN, else a random one written to eval_client.TOKEN_FILE (0600),
+where EvalClient picks it up.
+"""
+import argparse, hmac, json, os, secrets, socketserver, threading, time, uuid
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import executor
+from eval_client import DEFAULT_SOCKET, TOKEN_FILE
+from eval_utils import evaluate_records, submit_records
+from result_cache import default_cache
+
+JOB_TTL_S = 3600.0    # finished jobs are kept this long for late /jobs/<id> polls
+OPTIONS = {"n_workers", "timeout", "k", "use_cache", "timeout_mode", "task_timeouts", "prefilter",
+           "lanes", "units", "spread", "baseline", "write_dir", "tag", "limits"}
+
+
+def _eval_kwargs(payload: dict) -> dict:
+    unknown = set(payload) - OPTIONS - {"records"}
+    if unknown:
+        raise ValueError(f"unknown options: {sorted(unknown)}")
+    kwargs = {k: v for k, v in payload.items() if k != "records"}
+    if kwargs.get("limits") is not None:
+        kwargs["limits"] = executor.Limits(**kwargs["limits"])
+    return kwargs
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "HEEvalDaemon/0.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def address_string(self):                 # Unix-socket peers have no (host, port)
+        return "local"
+
+    def _send(self, code: int, obj: dict):
+        data = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        token = getattr(self.server, "token", None)
+        if token is None:                      # Unix socket: file permissions decide
+            return True
+        if hmac.compare_digest(self.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()):
+            return True
+        self._send(401, {"error": "missing or wrong token (HE_EVAL_TOKEN)"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send(200, self.server.evald.health())
+        if url.path.startswith("/jobs/"):
+            wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+            job = self.server.evald.poll(url.path[len("/jobs/"):], wait)
+            return self._send(200 if job else 404, job or {"error": "unknown job"})
+        self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        n = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(n) or b"{}")
+            if self.path == "/evaluate":
+                return self._send(200, self.server.evald.evaluate(payload))
+            if self.path == "/jobs":
+                return self._send(202, {"job_id": self.server.evald.submit(payload)})
+        except (ValueError, TypeError, KeyError) as e:
+            return self._send(400, {"error": f"{type(e).__name__}: {e}"})
+        except Exception as e:
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        if self.path == "/shutdown":
+            self._send(200, {"status": "stopping"})
+            return threading.Thread(target=self.server.shutdown, daemon=True).start()
+        self._send(404, {"error": f"unknown path {self.path}"})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class EvalDaemon:
+    """Serves evaluate_records over HTTP; pools and cache live as long as the process."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.jobs = {}                         # job_id -> {"future", "finished"}
+        self.evaluations = 0
+        self._lock = threading.Lock()
+
+    def evaluate(self, payload: dict) -> dict:
+        kwargs = _eval_kwargs(payload)
+        self.evaluations += 1
+        return evaluate_records(payload["records"], **kwargs)
+
+    def submit(self, payload: dict) -> str:
+        kwargs = _eval_kwargs(payload)
+        job_id = uuid.uuid4().hex
+        fut = submit_records(payload["records"], **kwargs)
+        with self._lock:
+            self._purge()
+            self.jobs[job_id] = {"future": fut, "finished": None}
+        self.evaluations += 1
+        fut.add_done_callback(lambda _: self._mark(job_id))
+        return job_id
+
+    def poll(self, job_id: str, wait: float = 0.0):
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        fut = job["future"]
+        try:
+            result = fut.result(timeout=wait)
+        except FutureTimeout:
+            return {"status": "running"}
+        except Exception as e:
+            return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        return {"status": "done", "result": result}
+
+    def _mark(self, job_id: str):
+        with self._lock:
+            if job_id in self.jobs:
+                self.jobs[job_id]["finished"] = time.time()
+
+    def _purge(self):
+        now = time.time()
+        for job_id in [j for j, job in self.jobs.items() if job["finished"] and now - job["finished"] > JOB_TTL_S]:
+            del self.jobs[job_id]
+
+    def health(self) -> dict:
+        with self._lock:
+            running = sum(not job["future"].done() for job in self.jobs.values())
+        pools = [{"n_workers": n, "limits": str(limits)} for n, limits in executor.shared_pools()]
+        return {"status": "ok", "pid": os.getpid(), "uptime_s": round(time.time() - self.started, 1),
+                "evaluations": self.evaluations, "jobs_running": running,
+                "pools": pools, "cache": default_cache().stats()}
+
+
+def make_server(socket_path=None, host: str = "127.0.0.1", port=None, token=None):
+    """
+    HTTP server on a Unix socket (default) or host:port, with an EvalDaemon attached.
+    host:port requires `token` (default HE_EVAL_TOKEN, else a new one saved to TOKEN_FILE).
+    """
+    if port is not None:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.token = token or os.getenv("HE_EVAL_TOKEN")
+        if not server.token:
+            server.token = secrets.token_hex(16)
+            TOKEN_FILE.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(server.token)
+    else:
+        path = Path(socket_path or DEFAULT_SOCKET)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            path.unlink()                      # stale socket from a previous daemon
+        server = _UnixHTTPServer(str(path), _Handler)
+        os.chmod(path, 0o600)                  # requests run code as this user: only this user may connect
+    server.evald = EvalDaemon()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local HumanEval evaluation daemon")
+    ap.add_argument("--socket", default=None, help=f"Unix socket path (default {DEFAULT_SOCKET})")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=None, help="serve localhost HTTP instead of a Unix socket")
+    ap.add_argument("--token", default=None, help="bearer token for --port (default HE_EVAL_TOKEN, else generated)")
+    ap.add_argument("--warm", type=int, nargs="*", default=[8],
+                    help="n_workers of the pools to start up front")
+    args = ap.parse_args()
+
+    os.environ.pop("HE_EVAL_DAEMON", None)     # the daemon evaluates locally, never via itself
+    server = make_server(args.socket, args.host, args.port, args.token)
+    for n in args.warm:
+        executor.shared_pool(n)
+    default_cache()
+    where = f"http://{args.host}:{server.server_address[1]}" if args.port is not None else f"unix:{server.server_address}"
+    print(f"[evald] serving on {where}")
+    if args.port is not None and not (args.token or os.getenv("HE_EVAL_TOKEN")):
+        print(f"[evald] token written to {TOKEN_FILE}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.port is None:
+            Path(server.server_address).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
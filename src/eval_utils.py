@@ -65,9 +65,14 @@ def run_humaneval(samples_path: str, problems_path: str, n_workers: int = 8, tim
 import os
 import json
 import inspect
+import dataclasses
+import tempfile
 import statistics as stats
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 # -- lazy import of HumanEval evaluator (and auto-clone if missing)
 def _ensure_humaneval_repo() -> Path:
@@ -88,57 +93,146 @@ def _import_evaluator():
     from human_eval.evaluation import evaluate_functional_correctness
     return evaluate_functional_correctness
 
+@lru_cache(maxsize=4096)
+def _compiles(prompt: str, body: str) -> bool:
+    """Compile gate against the original prompt + body (cached per unique pair)."""
+    try:
+        compile(prompt + body, "<chk>", "exec")
+        return True
+    except Exception:
+        return False
+
+
+def _dump_range(args) -> Tuple[bytes, bytes, Counter, int]:
+    """One newline-aligned byte range of a combined file -> (samples, probs, length histogram, compile ok)."""
+    path, start, end = args
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    sw, pw, lengths, comp_ok = [], [], Counter(), 0
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        obj = json.loads(line)
+        body = obj.get("completion", "")
+        lengths[len(body.strip())] += 1
+        comp_ok += _compiles(obj["prompt"], body)
+
+        # HumanEval expected inputs
+        sw.append(json.dumps({"task_id": obj["task_id"], "completion": body}) + "\n")
+        pw.append(json.dumps({
+            "task_id": obj["task_id"],
+            "prompt": obj["prompt"],
+            "entry_point": obj["entry_point"],
+            "canonical_solution": obj["canonical_solution"],
+            "test": obj["test"],
+        }) + "\n")
+    return "".join(sw).encode(), "".join(pw).encode(), lengths, comp_ok
+
+
+def _histogram_mean_median(hist: Counter) -> Tuple[float, int]:
+    """(round(mean, 1), int(median)) of the values a {value: count} histogram stands for, as statistics gives them."""
+    n = sum(hist.values())
+    if not n:
+        return 0.0, 0
+    mean = round(sum(v * c for v, c in hist.items()) / n, 1)
+    mid, seen, lo = (n - 1) // 2, 0, None
+    for v in sorted(hist):
+        seen += hist[v]
+        if lo is None and seen > mid:
+            lo = v
+        if seen > n // 2:
+            return mean, int((lo + v) / 2) if n % 2 == 0 else v
+    raise AssertionError("unreachable")
+
+
 def dump_for_eval(
     combined_path: Path,
     run_dir: Path,
     tag: str,
+    n_workers: Optional[int] = None,
+    chunk_bytes: Optional[int] = None,
 ) -> Tuple[Path, Path, int, float, float, int]:
     """
     Prepare HumanEval-compatible files (samples + problems) from a combined predictions JSONL.
 
+    The input is streamed in newline-aligned chunks (bulk_postprocess.chunk_ranges)
+    that a process pool converts and compile-checks; parts are written back in
+    order, so the files match a serial pass.
+
     Args:
         combined_path: Path to combined_*.jsonl with fields (task_id, prompt, completion, etc.)
         run_dir: output directory
         tag: string tag for filenames
+        n_workers: processes for the compile gate (1 = in this process; default one per
+                   chunk, up to the CPU count, so a single-chunk file never starts a pool)
+        chunk_bytes: input bytes per job (default bulk_postprocess.DEFAULT_CHUNK_BYTES)
 
     Returns:
         (samples_path, probs_path, attempted, compile_rate, avg_len, med_len)
     """
+    from bulk_postprocess import DEFAULT_CHUNK_BYTES, chunk_ranges
+
     run_dir.mkdir(parents=True, exist_ok=True)
     samples = run_dir / f"samples_{tag}.jsonl"
     probs   = run_dir / f"probs_{tag}.jsonl"
 
-    attempted, lengths, comp_ok = 0, [], 0
+    ranges = chunk_ranges(Path(combined_path), chunk_bytes or DEFAULT_CHUNK_BYTES)
+    jobs = [(str(combined_path), start, end) for start, end in ranges]
+    lengths, comp_ok = Counter(), 0                  # body length -> count: O(distinct lengths), not O(records)
+    n_workers = min(n_workers or os.cpu_count() or 1, len(jobs))
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    try:
+        parts = pool.map(_dump_range, jobs) if pool else map(_dump_range, jobs)
+        with samples.open("wb") as sw, probs.open("wb") as pw:
+            for sample_bytes, prob_bytes, hist, ok in parts:   # map() yields in input order
+                sw.write(sample_bytes)
+                pw.write(prob_bytes)
+                lengths.update(hist)
+                comp_ok += ok
+    finally:
+        if pool:
+            pool.shutdown()
 
-    with open(combined_path) as r, samples.open("w") as sw, probs.open("w") as pw:
-        for line in r:
-            obj = json.loads(line)
-            attempted += 1
+    attempted = sum(lengths.values())
+    avg_len, med_len = _histogram_mean_median(lengths)
 
-            body = obj.get("completion", "")
-            lengths.append(len(body.strip()))
+    return samples, probs, attempted, (comp_ok / attempted if attempted else 0.0), avg_len, med_len
 
-            # compile gate against the original prompt + body
-            try:
-                compile(obj["prompt"] + body, "<chk>", "exec")
-                comp_ok += 1
-            except Exception:
-                pass
 
-            # HumanEval expected inputs
-            sw.write(json.dumps({"task_id": obj["task_id"], "completion": body}) + "\n")
-            pw.write(json.dumps({
-                "task_id": obj["task_id"],
-                "prompt": obj["prompt"],
-                "entry_point": obj["entry_point"],
-                "canonical_solution": obj["canonical_solution"],
-                "test": obj["test"],
-            }) + "\n")
+def _run_evaluator(samples_path, probs_path, n_workers: int, timeout: int,
+                   engine: str = "native", use_cache: bool = True) -> dict:
+    if engine == "native":
+        import executor
+        from result_cache import default_cache
+        return executor.evaluate_functional_correctness(
+            str(samples_path), k=[1], n_workers=n_workers, timeout=timeout, problem_file=str(probs_path),
+            cache=default_cache() if use_cache else None,
+        )
+    if engine != "human_eval":
+        raise ValueError(f"Unknown evaluation engine: {engine}. Choices: ['native', 'human_eval']")
 
-    avg_len = round(stats.mean(lengths), 1) if lengths else 0.0
-    med_len = int(stats.median(lengths)) if lengths else 0
+    evaluate_functional_correctness = _import_evaluator()
 
-    return samples, probs, attempted, (comp_ok / attempted if attempted else 0.0), avg_len, med_len
+    # Prefer using a faster temp filesystem if available to reduce FS overhead
+    os.environ.setdefault("TMPDIR", "/dev/shm" if Path("/dev/shm").exists() else "/tmp")
+
+    sig = inspect.signature(evaluate_functional_correctness)
+    kwargs = {}
+
+    # Handle arg name differences across versions
+    if "k" in sig.parameters:
+        kwargs["k"] = [1]
+    if "n_workers" in sig.parameters:
+        kwargs["n_workers"] = n_workers
+    elif "n_processes" in sig.parameters:
+        kwargs["n_processes"] = n_workers
+    if "timeout" in sig.parameters:
+        kwargs["timeout"] = timeout
+    if "problem_file" in sig.parameters:
+        kwargs["problem_file"] = str(probs_path)
+
+    return evaluate_functional_correctness(str(samples_path), **kwargs)
 
 
 def eval_pass1(
@@ -146,6 +240,8 @@ def eval_pass1(
     probs_path: Path,
     n_workers: int = 8,
     timeout: int = 15,
+    engine: str = "native",
+    use_cache: bool = True,
 ) -> float:
     """
     Run HumanEval functional correctness on prepared files and return pass@1 as float.
@@ -155,29 +251,307 @@ def eval_pass1(
         probs_path:   Path to probs_*.jsonl generated by dump_for_eval
         n_workers:    Parallel workers/processes for the evaluator
         timeout:      Seconds per task
+        engine:       "native" (src/executor.py, pre-forked pool) or "human_eval" (upstream package)
+        use_cache:    reuse verdicts from the persistent result cache (native engine only)
 
     Returns:
         pass@1 as float (0.0 - 1.0)
     """
-    evaluate_functional_correctness = _import_evaluator()
+    results = _run_evaluator(samples_path, probs_path, n_workers, timeout, engine, use_cache)
+    return float(results.get("pass@1") or results.get("pass@1,exact") or 0.0)
 
-    # Prefer using a faster temp filesystem if available to reduce FS overhead
-    os.environ.setdefault("TMPDIR", "/dev/shm" if Path("/dev/shm").exists() else "/tmp")
 
-    sig = inspect.signature(evaluate_functional_correctness)
-    kwargs = {}
+def eval_per_sample(
+    samples_path: Path,
+    probs_path: Path,
+    n_workers: int = 8,
+    timeout: int = 15,
+    engine: str = "native",
+    use_cache: bool = True,
+) -> List[dict]:
+    """
+    Like eval_pass1, but return the evaluator's per-sample rows
+    ({task_id, completion, passed, result}) in the order of samples_path.
+    """
+    _run_evaluator(samples_path, probs_path, n_workers, timeout, engine, use_cache)
+    with open(f"{samples_path}_results.jsonl") as r:
+        return [json.loads(line) for line in r]
 
-    # Handle arg name differences across versions
-    if "k" in sig.parameters:
-        kwargs["k"] = [1]
-    if "n_workers" in sig.parameters:
-        kwargs["n_workers"] = n_workers
-    elif "n_processes" in sig.parameters:
-        kwargs["n_processes"] = n_workers
-    if "timeout" in sig.parameters:
-        kwargs["timeout"] = timeout
-    if "problem_file" in sig.parameters:
-        kwargs["problem_file"] = str(probs_path)
 
-    results = evaluate_functional_correctness(str(samples_path), **kwargs)
-    return float(results.get("pass@1") or results.get("pass@1,exact") or 0.0)
+def pass_at_1(task_ids: Sequence[str], passed: Sequence[bool]) -> float:
+    """pass@1 as the HumanEval evaluator computes it: mean over tasks of (correct / samples)."""
+    per_task = defaultdict(lambda: [0, 0])
+    for tid, ok in zip(task_ids, passed):
+        per_task[tid][0] += 1
+        per_task[tid][1] += bool(ok)
+    return sum(c / n for n, c in per_task.values()) / len(per_task) if per_task else 0.0
+
+
+def compile_and_length_stats(prompts: Sequence[str], bodies: Sequence[str]) -> Tuple[int, float, float, int]:
+    """
+    Same numbers as dump_for_eval, computed in memory with the same helpers
+    (_compiles once per unique (prompt, body), length histogram).
+
+    Returns:
+        (attempted, compile_rate, avg_len, med_len)
+    """
+    lengths, comp_ok = Counter(), 0
+    for prompt, body in zip(prompts, bodies):
+        lengths[len(body.strip())] += 1
+        comp_ok += _compiles(prompt, body)
+
+    attempted = sum(lengths.values())
+    avg_len, med_len = _histogram_mean_median(lengths)
+    return attempted, (comp_ok / attempted if attempted else 0.0), avg_len, med_len
+
+
+# ------------------------------------------------------------
+# In-memory evaluation (no samples/probs round trip)
+# ------------------------------------------------------------
+def write_eval_files(records: Sequence[dict], run_dir: Path, tag: str) -> Tuple[Path, Path]:
+    """
+    Write HumanEval samples/problems files for in-memory records (compatibility
+    only; one problems line per task).
+
+    Returns:
+        (samples_path, probs_path)
+    """
+    run_dir.mkdir(parents=True, exist_ok=True)
+    samples = run_dir / f"samples_{tag}.jsonl"
+    probs   = run_dir / f"probs_{tag}.jsonl"
+    problems = {}
+    with samples.open("w") as sw:
+        for rec in records:
+            sw.write(json.dumps({"task_id": rec["task_id"], "completion": rec.get("completion", "")}) + "\n")
+            problems.setdefault(rec["task_id"], rec)
+    with probs.open("w") as pw:
+        for rec in problems.values():
+            pw.write(json.dumps({
+                "task_id": rec["task_id"],
+                "prompt": rec["prompt"],
+                "entry_point": rec["entry_point"],
+                "canonical_solution": rec["canonical_solution"],
+                "test": rec["test"],
+            }) + "\n")
+    return samples, probs
+
+
+RESULT_FIELDS = ("task_id", "task_key", "completion", "passed", "result", "failure", "runtime_s", "cpu_s",
+                 "timeout", "timeout_mode", "cpu_time", "limits")
+
+
+def write_results(rows: Sequence[dict], records: Sequence[dict], path: Path) -> Path:
+    """
+    Write evaluate_records rows (native engine) as a per-sample results file,
+    which a later evaluate_records(..., baseline=path) can reuse verdicts from.
+    task_key identifies the task's prompt + test, so a changed harness never matches.
+    """
+    from slow_lane import task_key
+    keys = {}
+    for rec in records:
+        if rec["task_id"] not in keys:
+            keys[rec["task_id"]] = task_key(rec)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as w:
+        for row in rows:
+            row = {**row, "task_key": keys[row["task_id"]]}
+            w.write(json.dumps({f: row.get(f) for f in RESULT_FIELDS}) + "\n")
+    return path
+
+
+def load_baseline(path: Path) -> Dict[tuple, dict]:
+    """{(task_key, completion): row} from a write_results file."""
+    with open(path) as r:
+        rows = [json.loads(line) for line in r if line.strip()]
+    return {(row["task_key"], row["completion"]): row for row in rows if row.get("task_key")}
+
+
+_DAEMON_UP: Dict[str, bool] = {}   # HE_EVAL_DAEMON address -> reachable (checked once per process)
+
+
+def _daemon_available() -> bool:
+    """Whether the HE_EVAL_DAEMON daemon answers; if not, say so once and evaluate locally."""
+    address = os.getenv("HE_EVAL_DAEMON")
+    if address not in _DAEMON_UP:
+        from eval_client import EvalClient
+        _DAEMON_UP[address] = EvalClient(address).available()
+        if not _DAEMON_UP[address]:
+            print(f"[eval] HE_EVAL_DAEMON={address} is not reachable; evaluating locally")
+    return _DAEMON_UP[address]
+
+
+def evaluate_records(
+    records: Sequence[dict],
+    n_workers: int = 8,
+    timeout: int = 15,
+    k: Sequence[int] = (1,),
+    engine: str = "native",
+    use_cache: bool = True,
+    pool=None,
+    limits=None,
+    timeout_mode: str = "wall",
+    task_timeouts: Optional[dict] = None,
+    prefilter: bool = False,
+    lanes: bool = True,
+    units: bool = False,
+    spread: int = 1,
+    baseline: Optional[Path] = None,
+    write_dir: Optional[Path] = None,
+    tag: str = "eval",
+) -> dict:
+    """
+    Evaluate combined records (task_id, prompt, entry_point, test, completion)
+    straight from memory. With the native engine nothing is written unless
+    write_dir is given; the human_eval engine needs files and uses a temp dir
+    when write_dir is None.
+
+    Args:
+        records:   combined records, e.g. the list generate_and_eval builds
+        k:         pass@k values to report (k only if every task has >= k samples)
+        pool:      optional executor.ExecutionPool (or distributed.Coordinator) to use (native engine);
+                   defaults to the HE_EXEC_COORDINATOR coordinator when that is set, else to the
+                   process-wide executor.shared_pool(n_workers, limits). With HE_EVAL_DAEMON set
+                   (and no pool), the evaluation runs on that daemon (src/eval_daemon.py)
+        limits:    executor.Limits for each sample (native engine, e.g. executor.SAFE_LIMITS)
+        timeout_mode: "wall" (flat `timeout` seconds), "adaptive" (per-task wall-clock timeouts,
+                   10x the canonical solution, clamped to [1 s, timeout]) or "cpu" (per-task
+                   CPU-time budgets; load-independent verdicts). The last two calibrate on
+                   canonical solutions (cached on disk) and need the native engine
+        task_timeouts: explicit {task_id: seconds}, overrides `timeout` / calibration
+        prefilter: decide certain verdicts statically (syntax errors, return-None stubs,
+                   undefined names, canonical copies) without executing them (native engine)
+        lanes:     run samples predicted to be slow (src/slow_lane.py) in the pool's slow lane,
+                   so they cannot starve the rest (native engine)
+        units:     run check() as separate assertion units (src/test_units.py): early exit on
+                   the first failing one and per-unit times in each row's "cases" (native engine)
+        spread:    with units, split the units of tasks that ran slow before over up to this
+                   many parallel executions per sample
+        baseline:  results file of an earlier run (write_results); samples whose task and
+                   completion match it, evaluated with the same timeout, timeout mode and
+                   limits, reuse its verdict instead of executing, unless that verdict was about
+                   the host (executor.lasting_verdict) (native engine)
+        write_dir: also write samples_{tag}/probs_{tag} files here
+
+    Returns:
+        {"rows", "pass@k"..., "failures", "attempted", "compile_rate", "avg_len", "median_len",
+         "latency", "samples_path", "probs_path"}  (paths are None when nothing was written;
+        failures counts rows per failure category; latency is executor.latency_summary per lane;
+        native rows also carry timeout, timeout_mode, cpu_time, limits and baseline)
+    """
+    import executor
+
+    if os.getenv("HE_EVAL_DAEMON") and engine == "native" and pool is None and _daemon_available():
+        from eval_client import EvalClient                # warm pools + cache in src/eval_daemon.py
+        return EvalClient().evaluate_records(
+            records, n_workers=n_workers, timeout=timeout, k=list(k), use_cache=use_cache, limits=limits,
+            timeout_mode=timeout_mode, task_timeouts=task_timeouts, prefilter=prefilter,
+            lanes=lanes, units=units, spread=spread, baseline=baseline, write_dir=write_dir, tag=tag)
+
+    samples_path = probs_path = None
+    if write_dir is not None:
+        samples_path, probs_path = write_eval_files(records, Path(write_dir), tag)
+
+    if timeout_mode not in ("wall", "adaptive", "cpu"):
+        raise ValueError(f"Unknown timeout_mode: {timeout_mode}. Choices: ['wall', 'adaptive', 'cpu']")
+    if timeout_mode != "wall" and engine != "native":
+        raise ValueError(f"timeout_mode='{timeout_mode}' needs the native engine")
+    if baseline is not None and engine != "native":
+        raise ValueError("baseline needs the native engine")
+    if engine == "native":
+        from result_cache import default_cache
+        if pool is None:
+            from distributed import default_coordinator
+            pool = default_coordinator()          # HE_EXEC_COORDINATOR: execute on remote workers
+        if pool is None:
+            pool = executor.shared_pool(n_workers, limits or executor.NO_LIMITS)
+        problems = {}
+        for rec in records:
+            problems.setdefault(rec["task_id"], rec)
+        if timeout_mode == "cpu" and task_timeouts is None:
+            from calibration import cpu_budgets
+            task_timeouts = cpu_budgets(problems, n_workers=n_workers, pool=pool)
+        elif timeout_mode == "adaptive" and task_timeouts is None:
+            from calibration import wall_timeouts
+            task_timeouts = wall_timeouts(problems, ceiling=timeout, n_workers=n_workers, pool=pool)
+        samples = [{"task_id": rec["task_id"], "completion": rec.get("completion", "")} for rec in records]
+        timeouts = [task_timeouts.get(s["task_id"], timeout) if task_timeouts else timeout for s in samples]
+        cpu_time, limit_fields = timeout_mode == "cpu", dataclasses.asdict(limits or executor.NO_LIMITS)
+        reused = {}
+        if baseline is not None:
+            from slow_lane import task_key
+            prior = load_baseline(baseline)
+            keys = {tid: task_key(p) for tid, p in problems.items()}
+            for i, (s, t) in enumerate(zip(samples, timeouts)):
+                row = prior.get((keys[s["task_id"]], s["completion"]))
+                if (row is not None and row.get("timeout") == t and row.get("timeout_mode") == timeout_mode
+                        and row.get("cpu_time") == cpu_time and row.get("limits") == limit_fields
+                        and executor.lasting_verdict(executor.ExecResult(
+                            row["passed"], row["result"], 0.0, row.get("failure") or ""))):
+                    reused[i] = row
+        todo = [i for i in range(len(samples)) if i not in reused]
+        fresh = iter(executor.check_samples(problems, [samples[i] for i in todo], n_workers=n_workers,
+                                            timeout=timeout, pool=pool,
+                                            cache=default_cache() if use_cache else None,
+                                            limits=limits or executor.NO_LIMITS,
+                                            task_timeouts=task_timeouts, cpu_time=cpu_time,
+                                            prefilter=prefilter, lanes=lanes,
+                                            units=units, spread=spread) if todo else [])
+        rows = []
+        for i, (s, t) in enumerate(zip(samples, timeouts)):
+            if i in reused:
+                b = reused[i]
+                row = {**s, "passed": b["passed"], "result": b["result"], "failure": b.get("failure") or "",
+                       "runtime_s": b.get("runtime_s") or 0.0, "cpu_s": b.get("cpu_s") or 0.0,
+                       "cached": False, "static": False, "lane": "", "latency_s": 0.0, "cases": None}
+            else:
+                row = next(fresh)
+            rows.append({**row, "timeout": t, "timeout_mode": timeout_mode, "cpu_time": cpu_time,
+                         "limits": limit_fields, "baseline": i in reused})
+        if baseline is not None:
+            print(f"[baseline] {len(reused)}/{len(samples)} samples unchanged vs {Path(baseline).name}: "
+                  f"{len(reused)} executions skipped, {len(todo)} evaluated")
+    elif samples_path is not None:
+        rows = eval_per_sample(samples_path, probs_path, n_workers, timeout, engine, use_cache)
+    else:
+        with tempfile.TemporaryDirectory(prefix="he_eval_") as tmp:
+            sp, pp = write_eval_files(records, Path(tmp), tag)
+            rows = eval_per_sample(sp, pp, n_workers, timeout, engine, use_cache)
+
+    attempted, compile_rate, avg_len, med_len = compile_and_length_stats(
+        [rec["prompt"] for rec in records], [rec.get("completion", "") for rec in records])
+    return {
+        "rows": rows,
+        **executor.pass_at_k(rows, k),
+        "failures": dict(Counter(row.get("failure") or ("timeout" if row["result"] == "timed out" else "failed")
+                                 for row in rows if not row["passed"])),
+        "attempted": attempted,
+        "compile_rate": compile_rate,
+        "avg_len": avg_len,
+        "median_len": med_len,
+        "latency": executor.latency_summary(rows),
+        "samples_path": str(samples_path) if samples_path else None,
+        "probs_path": str(probs_path) if probs_path else None,
+    }
+
+
+_EVAL_THREADS: Optional[ThreadPoolExecutor] = None
+EVAL_CONCURRENCY = 4   # evaluations in flight at once; their executions share one pool queue
+
+
+def submit_eval(fn, *args, **kwargs) -> Future:
+    """
+    Run an evaluation (e.g. evaluate_records) in the background. The executions
+    of all in-flight evaluations go into the same shared pool queue, so the
+    cores stay busy across configuration boundaries while the caller moves on
+    (e.g. to generating the next configuration).
+    """
+    global _EVAL_THREADS
+    if _EVAL_THREADS is None:
+        _EVAL_THREADS = ThreadPoolExecutor(EVAL_CONCURRENCY, thread_name_prefix="eval")
+    return _EVAL_THREADS.submit(fn, *args, **kwargs)
+
+
+def submit_records(records: Sequence[dict], **kwargs) -> Future:
+    """Non-blocking evaluate_records(); Future of the same dict."""
+    return submit_eval(evaluate_records, records, **kwargs)
@@ -47,7 +47,14 @@ def write_samples_and_probs(combined_path: Path, out_dir: Path, tag: str):
         "median_len": int(stats.median(lengths)) if lengths else 0,
     }
 
-def run_humaneval(samples_path: str, problems_path: str, n_workers: int = 8, timeout: int = 15):
+def run_humaneval(samples_path: str, problems_path: str, n_workers: int = 8, timeout: int = 15,
+                  engine: str = "native"):
+    if engine == "native":
+        import executor
+        res = executor.evaluate_functional_correctness(
+            samples_path, k=[1], n_workers=n_workers, timeout=timeout, problem_file=problems_path,
+        )
+        return res.get("pass@1", 0.0)
     evaluate_functional_correctness = _ensure_repo()
     sig = inspect.signature(evaluate_functional_correctness)
     kwargs = {}
@@ -0,0 +1,1131 @@
+# src/executor.py
+# Native HumanEval execution engine.
+#
+# A persistent pool of pre-forked worker processes. Each worker runs many
+# samples one after another, every sample in a fresh os.fork() child of the
+# worker (own session, temp dir, reliability guard, SIGALRM timeout), so a
+# hanging or crashing sample only ever takes down its own child.
+# Pass/fail and pass@k match human_eval.evaluation.evaluate_functional_correctness.
+#
+# Fork-server mode (default): before serving, each worker imports the modules
+# HumanEval programs commonly use and calls gc.freeze(), so every child starts
+# from a warm, copy-on-write interpreter instead of paying for imports itself.
+#
+# Resource limits (opt-in, Limits): per-sample rlimits on address space, CPU
+# time, output size, open files and forking, applied in each child; workers
+# can be recycled after N samples or above an RSS threshold. Every kind of
+# termination gets its own failure category.
+#
+# CPU-time timeouts (cpu_time=True): the timeout counts the sample's own CPU
+# seconds (ITIMER_PROF) instead of wall-clock time, so verdicts don't change
+# with machine load; a generous wall-clock cap still ends samples that sleep.
+#
+# Task grouping: samples are shipped to workers in batches of one task's
+# completions. The worker compiles that task's test harness (`test` source +
+# `check(entry_point)`) once and keeps the code object, so each child only
+# compiles prompt + completion and then runs the prepared harness.
+
+import atexit
+import contextlib
+import errno
+import gc
+import gzip
+import importlib
+import io
+import json
+import math
+import multiprocessing as mp
+import os
+import resource
+import select
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import cpu_placement
+
+# Modules prompts commonly import, plus those the reliability guard imports.
+PRELOAD_MODULES = (
+    "math", "typing", "itertools", "collections", "re", "hashlib",
+    "string", "functools", "heapq", "bisect", "operator", "copy", "random",
+    "statistics", "fractions", "decimal",
+    "subprocess", "faulthandler",
+)
+TAIL_CACHE_SIZE = 256   # compiled test harnesses kept per worker
+CPU_WALL_FACTOR = 10.0  # cpu_time mode: wall-clock cap = timeout * factor + 1 s
+SLOW_LANE_SHARE = 0.25  # default slow-lane budget: this share of the workers (at least 1)
+
+
+@dataclass
+class ExecResult:
+    passed: bool
+    result: str          # "passed" | "timed out" | "failed: <reason>" (human_eval wording)
+    runtime_s: float
+    failure: str = ""    # "" if passed, else "timeout" | "crash" | "infra" | a LIMIT_FAILURES entry
+                         # | exception class name
+    cpu_s: float = 0.0   # user + system CPU time of the sample process
+    latency_s: float = 0.0  # submission -> result in the pool, queueing included (not cached)
+    cases: Optional[List[float]] = None  # seconds per assertion unit, when run as units (test_units.py)
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Per-sample caps applied in every child. None everywhere = human_eval behaviour."""
+    memory_bytes: Optional[int] = None   # RLIMIT_AS; includes the interpreter itself (~100 MB)
+    cpu_s: Optional[float] = None        # RLIMIT_CPU (CPU seconds, rounded up)
+    output_bytes: Optional[int] = None   # captured stdout/stderr and RLIMIT_FSIZE for files
+    open_files: Optional[int] = None     # RLIMIT_NOFILE
+    no_fork: bool = False                # RLIMIT_NPROC = 0 (not enforced for root)
+
+
+NO_LIMITS = Limits()
+# Guard rails for high eval_workers counts: nothing a HumanEval solution needs comes close.
+SAFE_LIMITS = Limits(memory_bytes=2 << 30, output_bytes=16 << 20, open_files=64, no_fork=True)
+# Limit terminations say more about the limits than the program: never cached.
+LIMIT_FAILURES = frozenset({"memory_limit", "cpu_limit", "output_limit", "fd_limit", "proc_limit"})
+# Signals a program brings on itself. Any other crash (e.g. SIGKILL from the host's
+# OOM killer) may not happen again, so like infra and limit failures it says
+# nothing lasting about the program.
+PROGRAM_CRASH_SIGNALS = ("SIGSEGV", "SIGABRT", "SIGBUS", "SIGFPE", "SIGILL")
+
+
+def lasting_verdict(res: "ExecResult") -> bool:
+    """Whether a result is about the program rather than the host, i.e. safe to cache or reuse."""
+    if res.failure == "infra" or res.failure in LIMIT_FAILURES:
+        return False
+    if res.failure == "crash":
+        return any(f"killed by {sig})" in res.result for sig in PROGRAM_CRASH_SIGNALS)
+    return True
+
+
+def build_tail(problem: dict) -> str:
+    """Everything human_eval appends after the completion: test source + check call."""
+    return "\n" + problem["test"] + "\n" + f"check({problem['entry_point']})"
+
+
+def build_program(problem: dict, completion: str) -> str:
+    """The exact program human_eval executes for one sample."""
+    return problem["prompt"] + completion + build_tail(problem)
+
+
+# ------------------------------------------------------------
+# Inside the forked child
+# ------------------------------------------------------------
+class TimeoutException(Exception):
+    pass
+
+
+class _WriteOnlyStringIO(io.StringIO):
+    def read(self, *args, **kwargs):
+        raise IOError
+
+    def readline(self, *args, **kwargs):
+        raise IOError
+
+    def readlines(self, *args, **kwargs):
+        raise IOError
+
+    def readable(self, *args, **kwargs):
+        return False
+
+
+class OutputLimitExceeded(BaseException):
+    """BaseException so a bare `except Exception` in the sample cannot swallow it."""
+
+
+class _CappedStringIO(_WriteOnlyStringIO):
+    """Counts instead of storing; raises once the sample has written more than limit chars."""
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit, self.written = limit, 0
+
+    def write(self, s):
+        self.written += len(s)
+        if self.written > self.limit:
+            raise OutputLimitExceeded(f"output limit exceeded ({self.limit} bytes)")
+        return len(s)
+
+
+class _redirect_stdin(contextlib._RedirectStream):
+    _stream = "stdin"
+
+
+def _apply_limits(limits: Limits):
+    def _set(which, value):
+        with contextlib.suppress(ValueError, OSError):    # can't raise past the hard limit
+            resource.setrlimit(which, (value, value))
+
+    if limits.memory_bytes is not None:
+        _set(resource.RLIMIT_AS, limits.memory_bytes)
+        _set(resource.RLIMIT_DATA, limits.memory_bytes)
+    if limits.cpu_s is not None:
+        soft = max(1, math.ceil(limits.cpu_s))
+        with contextlib.suppress(ValueError, OSError):
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))   # SIGXCPU, then SIGKILL
+    if limits.output_bytes is not None:
+        _set(resource.RLIMIT_FSIZE, limits.output_bytes)
+    if limits.open_files is not None:
+        _set(resource.RLIMIT_NOFILE, limits.open_files)
+    if limits.no_fork:
+        _set(resource.RLIMIT_NPROC, 0)
+
+
+def _failure_kind(e: BaseException, limits: Limits) -> str:
+    """Failure category for an exception raised by the sample."""
+    if isinstance(e, OutputLimitExceeded):
+        return "output_limit"
+    if isinstance(e, MemoryError) and limits.memory_bytes is not None:
+        return "memory_limit"
+    if isinstance(e, OSError):
+        if e.errno == errno.EFBIG and limits.output_bytes is not None:
+            return "output_limit"
+        if e.errno in (errno.EMFILE, errno.ENFILE) and limits.open_files is not None:
+            return "fd_limit"
+        if e.errno == errno.EAGAIN and limits.no_fork:
+            return "proc_limit"
+    return type(e).__name__
+
+
+GUARDED_OS_NAMES = (
+    "kill", "system", "putenv", "remove", "removedirs", "rmdir", "fchdir", "setuid",
+    "fork", "forkpty", "killpg", "rename", "renames", "truncate", "replace", "unlink",
+    "fchmod", "fchown", "chmod", "chown", "chroot", "lchflags", "lchmod", "lchown",
+    "getcwd", "chdir",
+)
+
+
+def _reliability_guard():
+    """Same destructive-function blocklist as human_eval.execution.reliability_guard."""
+    import builtins, faulthandler, shutil as _shutil, subprocess, sys
+
+    faulthandler.disable()
+    builtins.exit = None
+    builtins.quit = None
+    os.environ["OMP_NUM_THREADS"] = "1"
+    for name in GUARDED_OS_NAMES:
+        setattr(os, name, None)
+    _shutil.rmtree = None
+    _shutil.move = None
+    _shutil.chown = None
+    subprocess.Popen = None
+    builtins.help = None
+    for mod in ("ipdb", "joblib", "resource", "psutil", "tkinter"):
+        sys.modules[mod] = None
+
+
+def _exec_sample(head: str, tail: str, tail_code, globs: dict):
+    """
+    exec(head + tail) in globs with the tail already compiled. If head does not
+    compile on its own (e.g. an unterminated string the tail would close), run
+    the joint program instead so the outcome is exactly human_eval's.
+    """
+    if tail_code is not None:
+        try:
+            head_code = compile(head, "<string>", "exec")
+        except (SyntaxError, ValueError):
+            head_code = None
+        if head_code is not None:
+            exec(head_code, globs)
+            exec(tail_code, globs)      # same globals, same order: the test's check() wins
+            return
+    exec(head + tail, globs)
+
+
+def _child_run(head: str, tail: str, tail_code, timeout: float, limits: Limits = NO_LIMITS,
+               cpu_time: bool = False):
+    """Returns (result, failure, cases); cases as recorded by a test_units harness, else None."""
+    def _on_alarm(signum, frame):
+        raise TimeoutException("Timed out!")
+
+    timer = signal.ITIMER_PROF if cpu_time else signal.ITIMER_REAL
+    _apply_limits(limits)
+    _reliability_guard()
+    stream = _WriteOnlyStringIO() if limits.output_bytes is None else _CappedStringIO(limits.output_bytes)
+    globs = {}
+    try:
+        with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream), _redirect_stdin(stream):
+            signal.signal(signal.SIGPROF if cpu_time else signal.SIGALRM, _on_alarm)
+            signal.setitimer(timer, timeout)
+            try:
+                _exec_sample(head, tail, tail_code, globs)
+            finally:
+                signal.setitimer(timer, 0)
+        result, failure = "passed", ""
+    except TimeoutException:
+        result, failure = "timed out", "timeout"
+    except BaseException as e:
+        result, failure = f"failed: {e}", _failure_kind(e, limits)
+    try:
+        cases = globs.get("__he_case_s__")
+        cases = [round(float(x), 6) for x in cases] if type(cases) is list else None
+    except BaseException:
+        cases = None
+    return result, failure, cases
+
+
+def _child_main(head: str, tail: str, tail_code, timeout: float, limits: Limits, cpu_time: bool,
+                workdir: str, wfd: int):
+    """Entry point of the forked child; never returns."""
+    _write, _exit, _getpid = os.write, os._exit, os.getpid   # the guard removes much of `os`
+    me = _getpid()
+    status = 1
+    try:
+        os.setsid()                          # own process group: the worker can kill all of it
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):                 # raw fd writes must not reach the terminal either
+            os.dup2(devnull, fd)
+        os.closerange(3, wfd)                # drop inherited fds (e.g. the worker's pool pipe)
+        os.closerange(wfd + 1, os.sysconf("SC_OPEN_MAX"))
+        os.chdir(workdir)
+        result, failure, cases = _child_run(head, tail, tail_code, timeout, limits, cpu_time)
+        if _getpid() != me:                  # a process the sample forked: only the child reports
+            _exit(0)
+        data = memoryview(json.dumps([result, failure, cases]).encode())
+        while data:
+            data = data[_write(wfd, data):]
+        status = 0
+    finally:
+        _exit(status)
+
+
+# ------------------------------------------------------------
+# Inside a pool worker
+# ------------------------------------------------------------
+def _read_until_eof(fd: int, deadline: float):
+    """Read the child's result; returns (bytes, timed_out)."""
+    chunks = []
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return b"".join(chunks), True
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            continue
+        data = os.read(fd, 1 << 16)
+        if not data:
+            return b"".join(chunks), False
+        chunks.append(data)
+
+
+def _describe_exit(wstatus: int) -> str:
+    if os.WIFSIGNALED(wstatus):
+        sig = os.WTERMSIG(wstatus)
+        try:
+            return f"killed by {signal.Signals(sig).name}"
+        except ValueError:
+            return f"killed by signal {sig}"
+    return f"exit status {os.WEXITSTATUS(wstatus)}"
+
+
+def _crash_kind(wstatus: int, cpu_s: float, limits: Limits) -> str:
+    """Failure category for a child that died without reporting a result."""
+    if os.WIFSIGNALED(wstatus) and limits.cpu_s is not None:
+        sig = os.WTERMSIG(wstatus)
+        if sig == signal.SIGXCPU or (sig == signal.SIGKILL and cpu_s >= max(1, math.ceil(limits.cpu_s))):
+            return "cpu_limit"
+    return "crash"
+
+
+def execute_sample(head: str, tail: str, tail_code, timeout: float, limits: Limits = NO_LIMITS,
+                   cpu_time: bool = False) -> ExecResult:
+    """
+    Run head + tail (tail pre-compiled, or None) in a fresh fork of the calling process.
+    cpu_time: timeout is CPU seconds of the sample (wall-clock cap timeout * CPU_WALL_FACTOR + 1).
+    """
+    workdir = tempfile.mkdtemp(prefix="he_exec_")
+    rfd, wfd = os.pipe()
+    t0 = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        os.close(rfd)
+        _child_main(head, tail, tail_code, timeout, limits, cpu_time, workdir, wfd)
+    os.close(wfd)
+    try:
+        out, timed_out = _read_until_eof(rfd, t0 + timeout * (CPU_WALL_FACTOR if cpu_time else 1) + 1)
+    finally:
+        os.close(rfd)
+    if timed_out:
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(pid, signal.SIGKILL)
+    _, wstatus, usage = os.wait4(pid, 0)
+    runtime = time.monotonic() - t0
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    cases = None
+    if timed_out:
+        result, failure = "timed out", "timeout"
+    elif out:
+        try:
+            result, failure, cases = json.loads(out)
+        except ValueError:
+            result, failure = "failed: sample process wrote a malformed result", "crash"
+    else:
+        result = f"failed: sample process died ({_describe_exit(wstatus)})"
+        failure = _crash_kind(wstatus, usage.ru_utime + usage.ru_stime, limits)
+    cpu_s = usage.ru_utime + usage.ru_stime
+    return ExecResult(result == "passed", result, round(runtime, 6), failure, round(cpu_s, 6), cases=cases)
+
+
+def execute_program(program: str, timeout: float, limits: Limits = NO_LIMITS) -> ExecResult:
+    """Run one complete program in a fresh fork of the calling process."""
+    return execute_sample(program, "", None, timeout, limits)
+
+
+def _compile_tail(tail: str):
+    """Code object for a task's test harness, or None if it only parses joined to the head."""
+    if not tail:
+        return None
+    try:
+        return compile(tail, "<string>", "exec")
+    except (SyntaxError, ValueError):
+        return None
+
+
+def warm_up(modules: Sequence[str] = PRELOAD_MODULES):
+    """Pre-import modules and freeze the heap so forked children share it copy-on-write."""
+    for name in modules:
+        with contextlib.suppress(ImportError):
+            importlib.import_module(name)
+    gc.collect()
+    gc.freeze()   # frozen objects are never scanned by the GC, so children don't dirty their pages
+
+
+def _recv_job(conn, parent: int):
+    """
+    Next message from the pool, or None once the pool process is gone: forked
+    siblings hold copies of its pipe ends, so its death doesn't always mean EOF.
+    """
+    while not conn.poll(1.0):
+        if os.getppid() != parent:
+            return None
+    return conn.recv()
+
+
+def _worker_main(conn, preload: Sequence[str] = (), limits: Limits = NO_LIMITS,
+                 results_shm: Optional[str] = None):
+    """
+    Pool worker: receive (prefix, tail, [(completion, timeout), ...], cpu_time, isolated),
+    reply [ExecResult, ...]. Every sample here runs in a forked child, isolated or not.
+    With results_shm (transport="shm", see shm_transport.py) jobs are
+    (task ref, [(completion bytes, timeout), ...], cpu_time, isolated) and results are
+    packed into that segment; the reply is their size then.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl-C is handled by the parent
+    parent = os.getppid()                          # the pool process
+    if preload:
+        warm_up(preload)
+    reader = out = None
+    if results_shm is not None:
+        import shm_transport
+        reader, out = shm_transport.TaskReader(), shm_transport.attach(results_shm)
+    tails = OrderedDict()                          # tail source -> code object (LRU)
+    while True:
+        try:
+            msg = _recv_job(conn, parent)
+        except EOFError:
+            break
+        if msg is None:
+            break
+        if reader is not None:
+            ref, items, cpu_time, _ = msg
+            prefix, tail = reader.get(ref)
+            items = [(c.decode("utf-8", "surrogatepass"), t) for c, t in items]
+        else:
+            prefix, tail, items, cpu_time, _ = msg
+        if tail in tails:
+            tails.move_to_end(tail)
+        else:
+            tails[tail] = _compile_tail(tail)
+            if len(tails) > TAIL_CACHE_SIZE:
+                tails.popitem(last=False)
+        tail_code = tails[tail]
+        results = [execute_sample(prefix + completion, tail, tail_code, timeout, limits, cpu_time)
+                   for completion, timeout in items]
+        n_bytes = shm_transport.pack_results(out.buf, results) if out is not None else None
+        conn.send(results if n_bytes is None else n_bytes)
+
+
+# ------------------------------------------------------------
+# Parent side
+# ------------------------------------------------------------
+def _rss_bytes(pid: int) -> int:
+    """Current resident set size of a process (0 if unknown); its sample children not included."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _Worker:
+    __slots__ = ("proc", "conn", "job", "done", "out", "cpus")
+
+    def __init__(self, proc, conn, out=None, cpus=None):
+        self.proc, self.conn, self.job, self.done = proc, conn, None, 0
+        self.out = out                               # results segment (transport="shm")
+        self.cpus = cpus                             # cores it is pinned to (None = unpinned)
+
+    def release(self):
+        if self.out is not None:
+            self.out.close()
+            with contextlib.suppress(FileNotFoundError):
+                self.out.unlink()
+            self.out = None
+
+
+class _Run:
+    """One submission's results; its future resolves once every sample has a result."""
+    __slots__ = ("results", "remaining", "future", "t0")
+
+    def __init__(self, n: int):
+        self.results: List[Optional[ExecResult]] = [None] * n
+        self.remaining = n
+        self.future: Future = Future()
+        self.t0 = time.monotonic()
+        if n == 0:
+            self.future.set_result(self.results)
+
+    def put(self, idx: int, res: ExecResult):
+        res.latency_s = time.monotonic() - self.t0
+        self.results[idx] = res
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.future.set_result(self.results)
+
+    def fail(self, exc: BaseException):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+class _Batch:
+    """
+    Up to batch_size completions of one task; items are (index, completion, timeout) into run.results.
+    Slow-lane batches hold a single sample. Retried batches run isolated: in forked
+    children whatever the pool's backend.
+    """
+    __slots__ = ("prefix", "tail", "items", "cpu_time", "retried", "run", "slow", "ref")
+
+    def __init__(self, prefix: str, tail: str, items: list, cpu_time: bool = False, retried: bool = False,
+                 run: Optional[_Run] = None, slow: bool = False):
+        self.prefix, self.tail, self.items, self.cpu_time, self.retried = prefix, tail, items, cpu_time, retried
+        self.run, self.slow = run, slow
+        self.ref = None                              # task table reference while sent (transport="shm")
+
+
+class ExecutionPool:
+    """
+    Persistent pool of pre-forked execution workers.
+
+        with ExecutionPool(n_workers=8, timeout=15) as pool:
+            results = pool.run_tasks(problems, samples)   # grouped by task_id
+            results = pool.run(programs)                   # arbitrary programs
+            # List[ExecResult], same order as the input
+            future = pool.submit_tasks(problems, samples)  # non-blocking, Future of the same list
+
+    preload=() disables the fork-server warm-up (cold children).
+    batch_size caps how many completions of one task a worker takes at once.
+    limits are applied to every sample (see Limits / SAFE_LIMITS). A worker is
+    replaced once it has run max_tasks_per_worker samples (checked between
+    batches) or its own RSS exceeds max_worker_rss bytes (None = never). With
+    the fork backend samples run (and free their memory) in short-lived
+    children, so only the worker's caches count; the threshold is meant for
+    backend="subinterp", where samples run inside the worker.
+
+    The pool is thread-safe: batches from every submission go into one FIFO
+    queue that a dispatcher thread feeds to idle workers, so several
+    evaluations can share the pool without draining it between them.
+
+    Two lanes: samples submitted as slow (see slow_lane.py) run one per batch
+    from their own queue, on at most slow_workers workers at a time while fast
+    batches are waiting, so hanging completions cannot occupy every worker
+    (None = SLOW_LANE_SHARE of them, 0 = no cap). Idle workers still take slow
+    batches when there is no fast work.
+
+    backend="subinterp" (Python 3.12+, see subinterp.py) runs samples in fresh
+    subinterpreters inside the workers instead of forked children, re-running
+    any that time out or crash in a forked child. None = HE_EXEC_BACKEND, else "fork".
+
+    transport="shm" (fork backend, see shm_transport.py) keeps task harnesses in a
+    shared-memory table the workers map once and returns results through a
+    per-worker shared segment, so a job's pipe message is only a task reference
+    and the completions. None = HE_EXEC_TRANSPORT, else "pipe".
+
+    placement pins workers (and their sample children) to cores or NUMA nodes, and
+    reserve_cpus keeps that many cores free for the calling process; see
+    cpu_placement.py. None = HE_EXEC_PLACEMENT ("none") / HE_EXEC_RESERVE_CPUS (0).
+    """
+
+    def __init__(self, n_workers: int = 8, timeout: float = 15.0,
+                 preload: Sequence[str] = PRELOAD_MODULES, batch_size: int = 16,
+                 limits: Limits = NO_LIMITS, max_tasks_per_worker: Optional[int] = None,
+                 max_worker_rss: Optional[int] = None, slow_workers: Optional[int] = None,
+                 backend: Optional[str] = None, transport: Optional[str] = None,
+                 placement: Optional[str] = None, reserve_cpus: Optional[int] = None):
+        self.n_workers = max(1, n_workers)
+        backend = backend or os.getenv("HE_EXEC_BACKEND", "fork")
+        if backend not in ("fork", "subinterp"):
+            raise ValueError(f"Unknown backend: {backend}. Choices: ['fork', 'subinterp']")
+        if backend == "subinterp":
+            import subinterp
+            if not subinterp.available():
+                print("[exec] subinterpreters need Python 3.12+; using the fork backend")
+                backend = "fork"
+            elif limits != NO_LIMITS:
+                print("[exec] Limits are per process; using the fork backend")
+                backend = "fork"
+            elif max_tasks_per_worker is None:
+                max_tasks_per_worker = subinterp.RECYCLE_AFTER
+        self.backend = backend
+        transport = transport or os.getenv("HE_EXEC_TRANSPORT", "pipe")
+        if transport not in ("pipe", "shm"):
+            raise ValueError(f"Unknown transport: {transport}. Choices: ['pipe', 'shm']")
+        if transport == "shm" and backend != "fork":
+            print("[exec] the shm transport needs the fork backend; using pipes")
+            transport = "pipe"
+        self.transport = transport
+        self._table = None
+        if transport == "shm":
+            import shm_transport
+            self._table = shm_transport.TaskTable()
+        self.placement = placement or os.getenv("HE_EXEC_PLACEMENT", "none")
+        if reserve_cpus is None:
+            reserve_cpus = int(os.getenv("HE_EXEC_RESERVE_CPUS", "0"))
+        placements, self.reserved_cpus = cpu_placement.plan(self.n_workers, self.placement, reserve_cpus)
+        if slow_workers is None:
+            slow_workers = max(1, int(self.n_workers * SLOW_LANE_SHARE))
+        self.slow_workers = min(max(0, slow_workers), self.n_workers)
+        self.timeout = timeout
+        self.preload = tuple(preload)
+        self.batch_size = max(1, batch_size)
+        self.limits = limits
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_rss = max_worker_rss
+        self.recycled = 0
+        self._ctx = mp.get_context("fork")
+        self._workers: List[_Worker] = [self._spawn(cpus) for cpus in placements]
+        self._queue: deque = deque()                 # _Batch of every submission, FIFO
+        self._slow_queue: deque = deque()            # slow-lane batches
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()       # tells the dispatcher about new batches / close
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closing = False
+
+    def _spawn(self, cpus=None) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        if self.backend == "subinterp":
+            from subinterp import _worker_main as target
+        else:
+            target = _worker_main
+        args, out = (child_conn, self.preload, self.limits), None
+        if self._table is not None:
+            from shm_transport import RESULT_BYTES, SharedMemory
+            out = SharedMemory(create=True, size=RESULT_BYTES)
+            args += (out.name,)
+        proc = self._ctx.Process(target=target, args=args, daemon=True)
+        proc.start()
+        cpu_placement.pin(proc.pid, cpus)
+        child_conn.close()
+        return _Worker(proc, parent_conn, out, cpus)
+
+    # -- submission ----------------------------------------------------------
+    def submit(self, programs: Sequence[str], timeouts: Optional[Sequence[float]] = None,
+               cpu_time: bool = False) -> Future:
+        """Queue complete programs; Future of their results in input order."""
+        timeouts = timeouts if timeouts is not None else [self.timeout] * len(programs)
+        batches = [_Batch("", "", [(i, p, t)], cpu_time) for i, (p, t) in enumerate(zip(programs, timeouts))]
+        return self._submit(batches, len(programs))
+
+    def submit_tasks(self, problems: Dict[str, dict], samples: Sequence[dict],
+                     timeouts: Optional[Sequence[float]] = None, cpu_time: bool = False,
+                     slow: Optional[Sequence[bool]] = None) -> Future:
+        """
+        Queue samples ({task_id, completion}) grouped by task, so each worker
+        compiles a task's test harness once per batch instead of once per sample.
+        cpu_time: timeouts are CPU seconds (load-independent) instead of wall-clock.
+        slow: per-sample flags; flagged samples go to the slow lane.
+        """
+        timeouts = timeouts if timeouts is not None else [self.timeout] * len(samples)
+        slow = slow if slow is not None else [False] * len(samples)
+        groups: Dict[str, list] = defaultdict(list)
+        for i, (s, t, sl) in enumerate(zip(samples, timeouts, slow)):
+            groups[s["task_id"], bool(sl)].append((i, s["completion"], t))
+        batches = []
+        for (task_id, sl), items in groups.items():
+            problem = problems[task_id]
+            prefix, tail = problem["prompt"], build_tail(problem)
+            size = 1 if sl else self.batch_size
+            for j in range(0, len(items), size):
+                batches.append(_Batch(prefix, tail, items[j:j + size], cpu_time, slow=sl))
+        return self._submit(batches, len(samples))
+
+    def run(self, programs: Sequence[str], timeouts: Optional[Sequence[float]] = None,
+            cpu_time: bool = False) -> List[ExecResult]:
+        """Execute complete programs across the pool; results come back in input order."""
+        return self.submit(programs, timeouts, cpu_time).result()
+
+    def run_tasks(self, problems: Dict[str, dict], samples: Sequence[dict],
+                  timeouts: Optional[Sequence[float]] = None, cpu_time: bool = False,
+                  slow: Optional[Sequence[bool]] = None) -> List[ExecResult]:
+        """Blocking submit_tasks()."""
+        return self.submit_tasks(problems, samples, timeouts, cpu_time, slow).result()
+
+    def submit_batch(self, prefix: str, tail: str, items: Sequence[tuple], cpu_time: bool = False) -> Future:
+        """
+        Queue one pre-grouped batch, [(completion, timeout), ...] of one task (e.g. as
+        received from a distributed coordinator); Future of its results in item order.
+        """
+        return self._submit([_Batch(prefix, tail, [(j, c, t) for j, (c, t) in enumerate(items)], cpu_time)],
+                            len(items))
+
+    def _submit(self, batches: List[_Batch], n: int) -> Future:
+        run = _Run(n)
+        for b in batches:
+            b.run = run
+        with self._lock:
+            if self._workers is None or self._closing:
+                raise RuntimeError("ExecutionPool is closed")
+            for b in batches:
+                (self._slow_queue if b.slow else self._queue).append(b)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="exec-dispatch", daemon=True)
+                self._dispatcher.start()
+        os.write(self._wake_w, b"\0")
+        return run.future
+
+    # -- dispatcher thread ---------------------------------------------------
+    def _dispatch_loop(self):
+        busy: Dict[object, _Worker] = {}
+        try:
+            while True:
+                with self._lock:
+                    if self._closing:
+                        return
+                    self._assign()
+                for w in self._workers:
+                    if w.job is not None and w.conn not in busy:
+                        self._send(w, busy)
+                for conn in wait(list(busy) + [self._wake_r]):
+                    if conn == self._wake_r:
+                        os.read(self._wake_r, 4096)
+                    else:
+                        self._collect(busy.pop(conn))
+        except BaseException as e:                   # never leave a caller waiting forever
+            for b in list(self._queue) + list(self._slow_queue) + [w.job for w in self._workers if w.job is not None]:
+                b.run.fail(e)
+            raise
+
+    def _assign(self):
+        """
+        Hand queued batches to idle workers. Slow batches go first while the slow
+        lane has room; beyond that they only take workers no fast batch is waiting for.
+        """
+        slow_running = sum(w.job is not None and w.job.slow for w in self._workers)
+        for w in self._workers:
+            if w.job is not None:
+                continue
+            if self._slow_queue and (not self.slow_workers or slow_running < self.slow_workers or not self._queue):
+                w.job = self._slow_queue.popleft()
+                slow_running += 1
+            elif self._queue:
+                w.job = self._queue.popleft()
+            else:
+                break
+
+    def _send(self, w: _Worker, busy: dict):
+        b = w.job
+        try:
+            if self._table is not None:
+                b.ref = self._table.ref(b.prefix, b.tail)
+                w.conn.send((b.ref, [(c.encode("utf-8", "surrogatepass"), t) for _, c, t in b.items],
+                             b.cpu_time, b.retried))
+            else:
+                w.conn.send((b.prefix, b.tail, [(c, t) for _, c, t in b.items], b.cpu_time, b.retried))
+            busy[w.conn] = w
+        except OSError:                              # died while idle: retry on a fresh worker
+            w.job = None
+            self._release(b)
+            self._requeue([b])
+            self._replace(w)
+
+    def _release(self, b: _Batch):
+        """Drop b's task table reference (transport="shm")."""
+        if b.ref is not None:
+            self._table.release(b.ref)
+            b.ref = None
+
+    def _collect(self, w: _Worker):
+        b = w.job
+        w.job = None
+        try:
+            rerun = []
+            reply = w.conn.recv()
+            if isinstance(reply, int):               # transport="shm": packed into the results segment
+                from shm_transport import unpack_results
+                reply = unpack_results(w.out.buf, reply)
+            for item, res in zip(b.items, reply):
+                if res is None:                      # subinterp backend: not finished cleanly
+                    rerun.append(item)
+                else:
+                    b.run.put(item[0], res)
+            w.done += len(b.items)
+            if rerun:                                # that worker exits; re-run in forked children
+                self._replace(w)
+                self._requeue([_Batch(b.prefix, b.tail, [it], b.cpu_time, True, b.run, b.slow) for it in rerun])
+            elif self._worn_out(w):
+                self._retire(w)
+        except (EOFError, OSError):
+            # the worker itself died (e.g. OOM-killed): replace it, retry the
+            # batch's samples one by one, fail a sample that kills a worker twice
+            self._replace(w)
+            if b.retried:
+                b.run.put(b.items[0][0], ExecResult(False, "failed: execution worker died", 0.0, "infra"))
+            else:
+                self._requeue([_Batch(b.prefix, b.tail, [it], b.cpu_time, True, b.run, b.slow) for it in b.items])
+        finally:
+            self._release(b)
+
+    def _requeue(self, batches: List[_Batch]):
+        with self._lock:
+            for b in reversed(batches):
+                (self._slow_queue if b.slow else self._queue).appendleft(b)
+
+    def _worn_out(self, w: _Worker) -> bool:
+        if self.max_tasks_per_worker is not None and w.done >= self.max_tasks_per_worker:
+            return True
+        return self.max_worker_rss is not None and _rss_bytes(w.proc.pid) > self.max_worker_rss
+
+    def _retire(self, w: _Worker):
+        """Gracefully stop an idle worker and start a fresh one in its place."""
+        with contextlib.suppress(Exception):
+            w.conn.send(None)
+        w.proc.join(timeout=5)
+        if w.proc.is_alive():
+            w.proc.kill()
+        self._replace(w)
+        self.recycled += 1
+
+    def _replace(self, dead: _Worker):
+        with contextlib.suppress(Exception):
+            dead.conn.close()
+        dead.proc.join(timeout=1)
+        if dead.proc.is_alive():
+            dead.proc.kill()
+            dead.proc.join(timeout=1)
+        dead.release()
+        fresh = self._spawn(dead.cpus)
+        with self._lock:
+            self._workers.remove(dead)
+            self._workers.append(fresh)
+
+    def close(self):
+        with self._lock:
+            if self._workers is None or self._closing:
+                return
+            self._closing = True
+        os.write(self._wake_w, b"\0")
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        closed = RuntimeError("ExecutionPool closed")
+        for b in list(self._queue) + list(self._slow_queue) + [w.job for w in self._workers if w.job is not None]:
+            b.run.fail(closed)
+        for w in self._workers:
+            with contextlib.suppress(Exception):
+                w.conn.send(None)
+        for w in self._workers:
+            w.proc.join(timeout=5)
+            if w.proc.is_alive():
+                w.proc.kill()
+            w.conn.close()
+            w.release()
+        if self._table is not None:
+            self._table.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        self._workers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_SHARED: Dict[tuple, ExecutionPool] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_pool(n_workers: int = 8, limits: Limits = NO_LIMITS) -> ExecutionPool:
+    """
+    Process-wide pool for (n_workers, limits), started on first use and closed
+    at exit, so a script pays worker start-up once for all its evaluations.
+    """
+    with _SHARED_LOCK:
+        pool = _SHARED.get((n_workers, limits))
+        if pool is None:
+            t0 = time.time()
+            pool = _SHARED[(n_workers, limits)] = ExecutionPool(n_workers=n_workers, limits=limits)
+            print(f"[exec] shared pool: {pool.n_workers} workers started in {time.time() - t0:.2f}s")
+            if len(_SHARED) == 1:
+                atexit.register(_close_shared)
+    return pool
+
+
+def shared_pools() -> List[tuple]:
+    """(n_workers, limits) of the shared pools started so far."""
+    with _SHARED_LOCK:
+        return list(_SHARED)
+
+
+def _close_shared():
+    with _SHARED_LOCK:
+        for pool in _SHARED.values():
+            pool.close()
+        _SHARED.clear()
+
+
+# ------------------------------------------------------------
+# HumanEval evaluation on top of the pool
+# ------------------------------------------------------------
+def estimate_pass_at_k(num_samples: Sequence[int], num_correct: Sequence[int], k: int) -> List[float]:
+    """Unbiased per-task pass@k (same estimator as human_eval)."""
+    def _one(n: int, c: int) -> float:
+        if n - c < k:
+            return 1.0
+        return 1.0 - math.prod(1.0 - k / i for i in range(n - c + 1, n + 1))
+    return [_one(int(n), int(c)) for n, c in zip(num_samples, num_correct)]
+
+
+def pass_at_k(rows: Iterable[dict], ks: Sequence[int] = (1,)) -> Dict[str, float]:
+    """{"pass@k": mean over tasks} from per-sample rows with task_id/passed (k only if every task has >= k samples)."""
+    per_task = defaultdict(lambda: [0, 0])
+    for row in rows:
+        per_task[row["task_id"]][0] += 1
+        per_task[row["task_id"]][1] += bool(row["passed"])
+    total = [n for n, _ in per_task.values()]
+    correct = [c for _, c in per_task.values()]
+    out = {}
+    for k in ks:
+        if total and all(n >= k for n in total):
+            vals = estimate_pass_at_k(total, correct, k)
+            out[f"pass@{k}"] = sum(vals) / len(vals)
+    return out
+
+
+def check_samples(
+    problems: Dict[str, dict],
+    samples: Sequence[dict],
+    n_workers: int = 8,
+    timeout: float = 15.0,
+    pool: Optional[ExecutionPool] = None,
+    cache=None,
+    limits: Limits = NO_LIMITS,
+    task_timeouts: Optional[Dict[str, float]] = None,
+    cpu_time: bool = False,
+    prefilter: bool = False,
+    lanes: bool = False,
+    units: bool = False,
+    spread: int = 1,
+    verbose: Optional[bool] = None,
+) -> List[dict]:
+    """
+    Execute samples ({task_id, completion}) against their problems.
+    With a result_cache.ResultCache, cached verdicts are reused and only
+    unseen programs run (identical programs in the batch run once).
+    limits only apply to the pool created here; a passed-in pool keeps its own
+    (for a pool without a `limits` attribute, e.g. a Coordinator, pass what its
+    workers enforce). Cached verdicts are kept per timeout mode and limits.
+    task_timeouts overrides `timeout` per task_id (e.g. calibration.cpu_budgets);
+    cpu_time makes every timeout a CPU-time budget.
+    prefilter decides certain verdicts statically (static_filter.analyze) instead of executing.
+    lanes sends samples predicted to be slow (slow_lane.predict, using the cache's
+    per-task history) to the pool's slow lane and prints per-lane latencies.
+    units runs check() one assertion unit at a time (test_units.py), stopping at
+    the first failure and timing each; spread > 1 also splits the units of tasks
+    whose past samples averaged test_units.SPREAD_MIN_S or more over up to
+    `spread` executions, which the pool runs in parallel (test_units.shardable()
+    checks only). Their merged verdicts are cached apart from whole-program ones.
+    verbose also prints per-lane latency percentiles ([lanes]) and per-core busy %
+    of the run ([cpu]); None = HE_EXEC_VERBOSE.
+
+    Returns:
+        per-sample rows {task_id, completion, passed, result, failure, runtime_s, cpu_s, cached, static,
+        lane ("fast" | "slow", "" if not executed), latency_s, cases (seconds per unit, or None)},
+        in input order
+    """
+    if verbose is None:
+        verbose = os.getenv("HE_EXEC_VERBOSE", "") not in ("", "0")
+    programs = [build_program(problems[s["task_id"]], s["completion"]) for s in samples]
+    timeouts = [task_timeouts.get(s["task_id"], timeout) if task_timeouts else timeout for s in samples]
+    results: List[Optional[ExecResult]] = [None] * len(programs)
+    cached = [False] * len(programs)
+    static = [False] * len(programs)
+    lane = [""] * len(programs)
+
+    # verdicts hold for the limits the executing pool enforces (a passed-in pool keeps its own)
+    namespace = cache.namespace(cpu_time, getattr(pool, "limits", limits)) if cache is not None else ""
+    spread_namespace = namespace + "+spread"         # verdicts merged from test_units shards
+    keys = [cache.key(p, namespace) for p in programs] if cache is not None else list(range(len(programs)))
+    if cache is not None:
+        hits = cache.get_many(keys, timeouts, cpu_time=cpu_time)
+        for i, key in enumerate(keys):
+            if key in hits:
+                results[i], cached[i] = hits[key], True
+        if units and spread > 1:
+            missing = [i for i, r in enumerate(results) if r is None]
+            spread_keys = [cache.key(programs[i], spread_namespace) for i in missing]
+            hits = cache.get_many(spread_keys, [timeouts[i] for i in missing], cpu_time=cpu_time)
+            for i, key in zip(missing, spread_keys):
+                if key in hits:
+                    results[i], cached[i] = hits[key], True
+
+    first = {}                                   # key -> first index to execute
+    for i, key in enumerate(keys):
+        if results[i] is None:
+            first.setdefault(key, i)
+    if prefilter:
+        from static_filter import analyze
+        decided = {}
+        for key, i in first.items():
+            verdict = analyze(problems[samples[i]["task_id"]], samples[i]["completion"])
+            if verdict is not None:
+                decided[key] = verdict
+        for i, key in enumerate(keys):
+            if key in decided:
+                results[i], static[i] = decided[key], True
+        first = {key: i for key, i in first.items() if key not in decided}
+    todo = list(first.values())
+    if todo:
+        from slow_lane import predict, task_key
+        todo_samples = [samples[i] for i in todo]
+        todo_timeouts = [timeouts[i] for i in todo]
+        tasks = [task_key(problems[s["task_id"]]) for s in todo_samples] if cache is not None else []
+        history = cache.task_history(tasks) if cache is not None and (lanes or spread > 1) else None
+        slow = reasons = None
+        if lanes:
+            reasons = predict(problems, todo_samples, history)
+            slow = [bool(r) for r in reasons]
+        run_problems, run_samples, run_timeouts, run_slow = problems, todo_samples, todo_timeouts, slow
+        if units:
+            from test_units import SPREAD_MIN_S, expand, shardable
+            shards = {}
+            if spread > 1 and history:
+                for s, task in zip(todo_samples, tasks):
+                    runs, _, runtime_s = history.get(task, (0, 0, 0.0))
+                    if runs and runtime_s / runs >= SPREAD_MIN_S and shardable(problems[s["task_id"]]["test"]):
+                        shards[s["task_id"]] = spread
+            run_problems, run_samples, run_timeouts, owner = expand(problems, todo_samples, todo_timeouts, shards)
+            run_slow = [slow[j] for j in owner] if slow is not None else None
+            if shards:
+                print(f"[units] {len(shards)} slow tasks spread over {spread} executions per sample")
+        run_pool, ticks = pool, cpu_placement.cpu_times() if verbose else {}
+        if pool is None:
+            with ExecutionPool(n_workers=min(n_workers, len(run_samples)), timeout=timeout, limits=limits) as own:
+                run_pool = own
+                fresh = own.run_tasks(run_problems, run_samples, run_timeouts, cpu_time, run_slow)
+        else:
+            fresh = pool.run_tasks(run_problems, run_samples, run_timeouts, cpu_time, run_slow)
+        usage = cpu_placement.utilisation(ticks, cpu_placement.cpu_times()) if verbose else {}
+        sharded = set()
+        if units:
+            from test_units import merge
+            sharded = {j for j, n in Counter(owner).items() if n > 1}
+            fresh = merge(fresh, owner, len(todo), todo_timeouts, cpu_time)
+        by_key = {keys[i]: (r, "slow" if slow and slow[j] else "fast") for j, (i, r) in enumerate(zip(todo, fresh))}
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                results[i], lane[i] = by_key[key]
+        if cache is not None:
+            cache.put_many([(cache.key(programs[i], spread_namespace) if j in sharded else keys[i], timeouts[i], r)
+                            for j, (i, r) in enumerate(zip(todo, fresh))])
+            cache.record_tasks(list(zip(tasks, fresh)))
+    if cache is not None:
+        print(f"[exec] {len(programs)} samples: {sum(cached)} cached, {len(todo)} executed")
+    if prefilter and decided:
+        kinds = defaultdict(int)
+        for r in decided.values():
+            kinds["passed" if r.passed else r.failure] += 1
+        # an avoided execution would have cost about as much as a typical executed one
+        per_exec = sorted(r.runtime_s for r in fresh)[len(fresh) // 2] if todo else None
+        saved = f", ~{per_exec * len(decided):.1f}s of execution saved" if per_exec is not None else ""
+        print(f"[prefilter] {sum(static)} samples ({len(decided)} unique) decided statically "
+              f"{dict(kinds)}{saved}")
+    # remote workers: local usage says nothing
+    if verbose and todo and usage and isinstance(run_pool, ExecutionPool):
+        for line in cpu_placement.usage_lines(usage, run_pool.reserved_cpus):
+            print(f"[cpu] {line}")
+    if verbose and lanes and todo:
+        why = dict(Counter(r for r in reasons if r))
+        for name, st in latency_summary([{"lane": "slow" if sl else "fast", "latency_s": r.latency_s}
+                                         for sl, r in zip(slow, fresh)]).items():
+            print(f"[lanes] {name:<4}: n={st['n']:<5} p50={st['p50']:.2f}s p90={st['p90']:.2f}s "
+                  f"p99={st['p99']:.2f}s max={st['max']:.2f}s" + (f"  {why}" if name == "slow" else ""))
+
+    return [
+        {**s, "passed": r.passed, "result": r.result, "failure": r.failure,
+         "runtime_s": r.runtime_s, "cpu_s": r.cpu_s, "cached": c, "static": st,
+         "lane": ln, "latency_s": round(r.latency_s, 4) if ln else 0.0, "cases": r.cases}
+        for s, r, c, st, ln in zip(samples, results, cached, static, lane)
+    ]
+
+
+def latency_summary(rows: Iterable[dict]) -> Dict[str, dict]:
+    """{lane: {n, p50, p90, p99, max}} of latency_s over executed rows (lane != "")."""
+    per_lane = defaultdict(list)
+    for row in rows:
+        if row.get("lane"):
+            per_lane[row["lane"]].append(row["latency_s"])
+    out = {}
+    for name in sorted(per_lane):
+        xs = sorted(per_lane[name])
+        q = lambda f: xs[min(len(xs) - 1, int(f * len(xs)))]
+        out[name] = {"n": len(xs), "p50": q(0.5), "p90": q(0.9), "p99": q(0.99), "max": xs[-1]}
+    return out
+
+
+def _read_jsonl(path: str) -> List[dict]:
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt") as r:
+        return [json.loads(line) for line in r if line.strip()]
+
+
+def _default_problem_file() -> str:
+    """Upstream's default problem_file: human_eval.data.HUMAN_EVAL, else the checkout eval_utils clones."""
+    try:
+        from human_eval.data import HUMAN_EVAL
+        return HUMAN_EVAL
+    except ImportError:
+        from eval_utils import _ensure_humaneval_repo
+        return str(_ensure_humaneval_repo() / "data" / "HumanEval.jsonl.gz")
+
+
+def evaluate_functional_correctness(
+    sample_file: str,
+    k: Sequence[int] = (1, 10, 100),
+    n_workers: int = 4,
+    timeout: float = 3.0,
+    problem_file: Optional[str] = None,
+    pool: Optional[ExecutionPool] = None,
+    cache=None,
+    limits: Limits = NO_LIMITS,
+) -> Dict[str, float]:
+    """
+    Drop-in for human_eval.evaluation.evaluate_functional_correctness:
+    same inputs (problem_file=None = the bundled HumanEval problems), same
+    pass@k dict, same `<sample_file>_results.jsonl` (each sample plus result
+    and passed). check_samples() returns the richer per-sample rows.
+    """
+    problems = {p["task_id"]: p for p in _read_jsonl(problem_file or _default_problem_file())}
+    samples = _read_jsonl(sample_file)
+    rows = check_samples(problems, samples, n_workers=n_workers, timeout=timeout, pool=pool, cache=cache,
+                         limits=limits)
+    with open(f"{sample_file}_results.jsonl", "w") as w:
+        for s, row in zip(samples, rows):
+            w.write(json.dumps({**s, "result": row["result"], "passed": row["passed"]}) + "\n")
+    return pass_at_k(rows, k)
@@ -1,11 +1,16 @@
 # src/experiments.py
 #!/usr/bin/env python3
 import time, json, requests
+import statistics as stats
 from pathlib import Path
+from concurrent.futures import Future
+from typing import Optional
 
 from postprocessing import PostProcessor, extract_def_from_prompt
 from prompts import get_header
-from eval_utils import dump_for_eval, eval_pass1
+from eval_utils import evaluate_records, submit_eval, write_results
+from metrics import summarize
+from guided_decoding import guided_fields
 
 
 def _make_instr(def_src: str, header_str: str) -> str:
@@ -25,6 +30,7 @@ def sync_infer_one(
 ):
     """
     Synchronous single-sample inference against an OpenAI-compatible endpoint.
+    `dec["guided"]` ("regex" | "grammar") turns on vLLM guided decoding of the <sol> format.
     """
     url = f"{api_base}/chat/completions" if use_chat else f"{api_base}/completions"
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
@@ -41,6 +47,7 @@ def sync_infer_one(
     }
     if dec.get("stop"):
         payload["stop"] = dec["stop"]
+    payload.update(guided_fields(dec.get("guided"), dec.get("stop")))
 
     if use_chat:
         payload["messages"] = [
@@ -50,9 +57,11 @@ def sync_infer_one(
     else:
         payload["prompt"] = _make_instr(def_src, get_header(header_str) if not isinstance(header_str, str) else header_str)
 
+    t0 = time.time()
     r = requests.post(url, headers=headers, json=payload, timeout=180)
     r.raise_for_status()
     data = r.json()
+    latency = time.time() - t0
     ch   = data["choices"][0]
     text = (ch.get("message") or {}).get("content") or ch.get("text") or ""
 
@@ -63,10 +72,12 @@ def sync_infer_one(
         "canonical_solution": ex["canonical_solution"],
         "test": ex["test"],
         "raw_text": text,
+        "usage": data.get("usage", {}),
+        "latency_s": round(latency, 3),
     }
 
 
-def generate_and_eval(
+def generate_and_submit(
     ds,
     prompt_id: str,
     dec: dict,
@@ -77,18 +88,33 @@ def generate_and_eval(
     token: str,
     use_chat: bool = True,
     n_workers: int = 8,
-):
+    guided: Optional[str] = None,
+    write_eval_files: bool = False,
+    timeout_mode: str = "wall",
+    baseline: Optional[Path] = None,
+) -> Future:
     """
     Mini-experiment:
       - build header from prompts.get_header(prompt_id)
-      - loop sync inference
+      - loop sync inference (optionally with guided decoding, overrides dec["guided"])
       - postprocess with PostProcessor.normalize_body
       - write combined jsonl
-      - dump evaluator files and compute pass@1
+      - queue the in-memory evaluation on the shared execution pool and return
+        (write_eval_files: also write samples_/probs_ files;
+        timeout_mode="cpu": calibrated CPU-time budgets instead of a wall-clock timeout;
+        baseline: results_*.jsonl of an earlier run, whose verdicts are reused for
+        unchanged completions instead of executing them)
+      - write per-sample verdicts to results_{tag}.jsonl (a baseline for later runs)
+    The returned Future resolves to the stats dict (pass@1 with a 95%
+    task-bootstrap confidence interval, see metrics.summarize), so a sweep can
+    generate the next configuration while this one is executing.
     """
     header_str = get_header(prompt_id)  # prompt_id like "raw", "hardened_v2", "icl_v2"
-    tag = f"{prompt_id}__{dec['name']}"
+    guided = guided or dec.get("guided")
+    dec = {**dec, "guided": guided}
+    tag = f"{prompt_id}__{dec['name']}" + (f"__guided_{guided}" if guided else "")
     combined_path = run_dir / f"combined_{tag}.jsonl"
+    results_path = run_dir / f"results_{tag}.jsonl"
 
     t0 = time.time()
     records = []
@@ -105,20 +131,41 @@ def generate_and_eval(
             w.write(json.dumps(r) + "\n")
 
     gen_secs = time.time() - t0
-    samples_path, probs_path, attempted, compile_rate, avg_len, med_len = dump_for_eval(combined_path, run_dir, tag)
-    pass1 = eval_pass1(str(samples_path), str(probs_path), n_workers=n_workers)
 
-    return {
-        "tag": tag,
-        "prompt_id": prompt_id,
-        "decode": dec["name"],
-        "attempted": attempted,
-        "pass@1": pass1,
-        "compile_rate": compile_rate,
-        "avg_len": round(avg_len, 1),
-        "median_len": med_len,
-        "gen_time_s": round(gen_secs, 2),
-        "combined_path": str(combined_path),
-        "samples_path": str(samples_path),
-        "probs_path": str(probs_path),
-    }
+    def _evaluate():
+        ev = evaluate_records(records, n_workers=n_workers, timeout_mode=timeout_mode, baseline=baseline,
+                              write_dir=run_dir if write_eval_files else None, tag=tag)
+        write_results(ev["rows"], records, results_path)
+        metrics = summarize(ev["rows"], ks=(1,))
+
+        out_tokens = [r["usage"].get("completion_tokens", 0) for r in records]
+        latencies  = [r["latency_s"] for r in records]
+
+        return {
+            "tag": tag,
+            "prompt_id": prompt_id,
+            "decode": dec["name"],
+            "guided": guided,
+            "attempted": ev["attempted"],
+            "pass@1": metrics.get("pass@1", 0.0),
+            "pass@1_ci": metrics.get("pass@1_ci"),
+            "failures": ev["failures"],
+            "compile_rate": ev["compile_rate"],
+            "avg_len": round(ev["avg_len"], 1),
+            "median_len": ev["median_len"],
+            "avg_out_tokens": round(stats.mean(out_tokens), 1) if out_tokens else 0.0,
+            "avg_latency_s": round(stats.mean(latencies), 3) if latencies else 0.0,
+            "gen_time_s": round(gen_secs, 2),
+            "reused": sum(row.get("baseline", False) for row in ev["rows"]),
+            "combined_path": str(combined_path),
+            "results_path": str(results_path),
+            "samples_path": ev["samples_path"],
+            "probs_path": ev["probs_path"],
+        }
+
+    return submit_eval(_evaluate)
+
+
+def generate_and_eval(ds, prompt_id: str, dec: dict, **kwargs) -> dict:
+    """generate_and_submit() and wait for the evaluation; returns the stats dict."""
+    return generate_and_submit(ds, prompt_id, dec, **kwargs).result()
@@ -0,0 +1,53 @@
+# Guided (structured) decoding for the <sol> ... </sol> output format.
+#
+# vLLM's OpenAI-compatible server accepts `guided_regex` / `guided_grammar` as
+# extra request fields. The patterns below avoid lookarounds: the guided backends
+# (xgrammar / outlines) only accept plain regular languages.
+
+from typing import Any, Dict, Optional
+
+SOL_OPEN, SOL_CLOSE = "<sol>", "</sol>"
+
+# Any text that does not contain "</sol>": a "<" may only be followed by a
+# partial "</sol" that is then broken by a different character.
+_PARTIAL  = r"<(?:/(?:s(?:ol?)?)?)?"
+_MISMATCH = r"(?:[^/<]|/(?:[^s<]|s(?:[^o<]|o(?:[^l<]|l[^><]))))"
+SOL_BODY_REGEX = rf"(?:[^<]|(?:{_PARTIAL})*<{_MISMATCH})*(?:{_PARTIAL})*"
+
+SOL_REGEX = r"<sol>\n" + SOL_BODY_REGEX + r"\n</sol>"
+
+# Same language as SOL_REGEX, as a GBNF grammar (xgrammar, vLLM's default backend).
+SOL_GRAMMAR = r"""
+root     ::= "<sol>\n" body "\n</sol>"
+body     ::= ([^<] | partial* "<" mismatch)* partial*
+partial  ::= "<" ("/" ("s" ("o" "l"?)?)?)?
+mismatch ::= [^/<] | "/" ([^s<] | "s" ([^o<] | "o" ([^l<] | "l" [^><])))
+""".strip() + "\n"
+
+GUIDED_MODES = (None, "regex", "grammar")
+
+
+def guided_fields(mode: Optional[str], stop=None) -> Dict[str, Any]:
+    """
+    Extra request fields that constrain the completion to `<sol>\\n...\\n</sol>`.
+
+    Args:
+        mode: None (off), "regex" or "grammar"
+        stop: the stop list that will be sent with the request, if any
+
+    Returns:
+        dict to merge into the request payload (empty when mode is None)
+    """
+    if mode is None:
+        return {}
+    if mode == "regex":
+        fields = {"guided_regex": SOL_REGEX}
+    elif mode == "grammar":
+        fields = {"guided_grammar": SOL_GRAMMAR}
+    else:
+        raise ValueError(f"Unknown guided mode: {mode}. Choices: {list(GUIDED_MODES)}")
+    # A "</sol>" stop would cut the closing tag the constraint just forced;
+    # keep it in the output so between_tags() can still find the body.
+    if stop and SOL_CLOSE in stop:
+        fields["include_stop_str_in_output"] = True
+    return fields
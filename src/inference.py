@@ -1,7 +1,8 @@
 import asyncio, json, time
 from typing import Dict, Any, List, Optional
-from postprocessing import PostProcessor
+from postprocessing import PostProcessor, StreamingPostProcessor
 from api_client import OpenAICompatClient
+from guided_decoding import guided_fields
 
 SYSTEM = "You are a precise Python coding assistant. Reply with code only."
 
@@ -14,6 +15,7 @@ def build_payload(client: OpenAICompatClient, instr: str, stop=None, **gen):
     else:
         payload = dict(prompt=instr, **gen)
     if stop: payload["stop"] = stop
+    payload.update(guided_fields(client.guided, stop))
     return payload
 
 def extract_text(client: OpenAICompatClient, data: Dict[str, Any]) -> str:
@@ -23,7 +25,9 @@ def extract_text(client: OpenAICompatClient, data: Dict[str, Any]) -> str:
 def generate_one(client: OpenAICompatClient, header: str, ex: Dict[str, Any], **gen) -> Dict[str, Any]:
     def_src = PostProcessor.extract_def_from_prompt(ex["prompt"], ex["entry_point"])
     instr = make_instr(header, def_src)
+    t0 = time.time()
     data = client.complete(instr, system=SYSTEM, **gen)
+    latency = time.time() - t0
     text = extract_text(client, data)
     body = PostProcessor.normalize_body(text)
     return {
@@ -35,6 +39,37 @@ def generate_one(client: OpenAICompatClient, header: str, ex: Dict[str, Any], **
         "raw_text": text,
         "completion": body,
         "usage": data.get("usage", {}),
+        "latency_s": round(latency, 3),
+    }
+
+def generate_one_streaming(client: OpenAICompatClient, header: str, ex: Dict[str, Any],
+                           version: str = "v2", **gen) -> Dict[str, Any]:
+    """
+    Like generate_one, but streams the answer and cancels decoding as soon as
+    the post-processed body is decided (same completion as the batch path).
+    """
+    def_src = PostProcessor.extract_def_from_prompt(ex["prompt"], ex["entry_point"])
+    instr = make_instr(header, def_src)
+    spp = StreamingPostProcessor(version)
+    t0 = time.time()
+    chunks = client.stream_complete(instr, system=SYSTEM, **gen)
+    try:
+        for delta in chunks:
+            if spp.feed(delta):
+                break
+    finally:
+        chunks.close()
+    latency = time.time() - t0
+    return {
+        "task_id": ex["task_id"],
+        "prompt": ex["prompt"],
+        "entry_point": ex["entry_point"],
+        "canonical_solution": ex["canonical_solution"],
+        "test": ex["test"],
+        "raw_text": spp.text,
+        "completion": spp.result(),
+        "stopped_early": spp.done,
+        "latency_s": round(latency, 3),
     }
 
 # Async batch (Jupyter-safe helper below)
@@ -48,21 +83,25 @@ async def generate_many_async(client: OpenAICompatClient, header: str, ds, concu
             def_src = PostProcessor.extract_def_from_prompt(ex["prompt"], ex["entry_point"])
             instr = make_instr(header, def_src)
             payload = {"model": client.model, **build_payload(client, instr, stop=stop, **gen)}
-            async with sem, session.post(url, headers=hdr, json=payload, timeout=gen.get("timeout",180)) as r:
-                r.raise_for_status()
-                data = await r.json()
-                text = extract_text(client, data)
-                body = PostProcessor.normalize_body(text)
-                return {
-                    "task_id": ex["task_id"],
-                    "prompt": ex["prompt"],
-                    "entry_point": ex["entry_point"],
-                    "canonical_solution": ex["canonical_solution"],
-                    "test": ex["test"],
-                    "raw_text": text,
-                    "completion": body,
-                    "usage": data.get("usage", {}),
-                }
+            async with sem:
+                t0 = time.time()
+                async with session.post(url, headers=hdr, json=payload, timeout=gen.get("timeout",180)) as r:
+                    r.raise_for_status()
+                    data = await r.json()
+                latency = time.time() - t0
+            text = extract_text(client, data)
+            body = PostProcessor.normalize_body(text)
+            return {
+                "task_id": ex["task_id"],
+                "prompt": ex["prompt"],
+                "entry_point": ex["entry_point"],
+                "canonical_solution": ex["canonical_solution"],
+                "test": ex["test"],
+                "raw_text": text,
+                "completion": body,
+                "usage": data.get("usage", {}),
+                "latency_s": round(latency, 3),
+            }
         tasks = [asyncio.create_task(_one(ex)) for ex in ds]
         return await asyncio.gather(*tasks)
 
@@ -0,0 +1,126 @@
+# src/metrics.py
+# Vectorised pass@k with bootstrap confidence intervals and paired significance tests.
+#
+# Everything works on per-task (n, c) arrays: n = samples, c = correct. Arrays
+# may carry leading axes (configs x tasks), so thousands of configurations are
+# scored and bootstrapped in a few matrix products. Resampling is over tasks;
+# paired comparisons reuse the same resampled tasks for both configurations.
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_BOOT = 10_000
+
+
+def task_counts(rows: Iterable[dict], task_ids: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Per-task (n, c) from per-sample rows with task_id/passed.
+    task_ids fixes the task order (missing tasks get n = c = 0).
+
+    Returns:
+        (task_ids, n, c)
+    """
+    counts = defaultdict(lambda: [0, 0])
+    for row in rows:
+        counts[row["task_id"]][0] += 1
+        counts[row["task_id"]][1] += bool(row["passed"])
+    task_ids = list(task_ids) if task_ids is not None else list(counts)
+    n = np.array([counts[t][0] if t in counts else 0 for t in task_ids], dtype=np.int64)
+    c = np.array([counts[t][1] if t in counts else 0 for t in task_ids], dtype=np.int64)
+    return task_ids, n, c
+
+
+def pass_at_k_per_task(n, c, k: int) -> np.ndarray:
+    """
+    Unbiased estimator 1 - C(n-c, k) / C(n, k), elementwise (same as human_eval).
+    Computed as 1 - prod_{j<k} (n-c-j) / (n-j), so no huge binomials are formed.
+    """
+    n = np.asarray(n, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+    j = np.arange(k, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.prod((n[..., None] - c[..., None] - j) / (n[..., None] - j), axis=-1)
+    return np.where(n - c < k, 1.0, 1.0 - ratio)
+
+
+def pass_at_k(n, c, ks: Sequence[int] = (1,)) -> Dict[str, np.ndarray]:
+    """
+    {"pass@k": mean over tasks (last axis)}; k is reported only if every task has >= k samples.
+    Scalars for 1-D input, arrays for (configs x tasks).
+    """
+    n = np.asarray(n)
+    out = {}
+    for k in ks:
+        if n.size and (n >= k).all():
+            out[f"pass@{k}"] = pass_at_k_per_task(n, c, k).mean(axis=-1)
+    return out
+
+
+def _resample_weights(n_tasks: int, n_boot: int, seed: int) -> np.ndarray:
+    """(n_boot, n_tasks) multiplicities of a task-level bootstrap, normalised to sum to 1 per row."""
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n_tasks, size=(n_boot, n_tasks))
+    idx += np.arange(n_boot)[:, None] * n_tasks
+    w = np.bincount(idx.ravel(), minlength=n_boot * n_tasks).reshape(n_boot, n_tasks)
+    return w / n_tasks
+
+
+def bootstrap(n, c, k: int = 1, n_boot: int = DEFAULT_BOOT, seed: int = 0) -> np.ndarray:
+    """Bootstrap distribution of pass@k, shape (..., n_boot)."""
+    per_task = pass_at_k_per_task(n, c, k)
+    return per_task @ _resample_weights(per_task.shape[-1], n_boot, seed).T
+
+
+def bootstrap_ci(n, c, k: int = 1, n_boot: int = DEFAULT_BOOT, alpha: float = 0.05, seed: int = 0):
+    """Percentile (1 - alpha) confidence interval of pass@k; returns (lo, hi), arrays for batched input."""
+    dist = bootstrap(n, c, k, n_boot, seed)
+    lo, hi = np.quantile(dist, [alpha / 2, 1 - alpha / 2], axis=-1)
+    return lo, hi
+
+
+def paired_bootstrap(n_a, c_a, n_b, c_b, k: int = 1, n_boot: int = DEFAULT_BOOT,
+                     alpha: float = 0.05, seed: int = 0) -> dict:
+    """
+    Paired test of pass@k(B) - pass@k(A) over the same tasks (last axis aligned).
+    Both configurations are resampled with the same tasks, so per-task difficulty cancels.
+
+    Returns:
+        {"diff", "ci": (lo, hi), "p_value"}; p_value is two-sided (share of
+        resampled differences on the far side of zero, doubled, capped at 1)
+    """
+    delta = pass_at_k_per_task(n_b, c_b, k) - pass_at_k_per_task(n_a, c_a, k)
+    dist = delta @ _resample_weights(delta.shape[-1], n_boot, seed).T
+    lo, hi = np.quantile(dist, [alpha / 2, 1 - alpha / 2], axis=-1)
+    p = 2 * np.minimum((dist <= 0).mean(axis=-1), (dist >= 0).mean(axis=-1))
+    return {"diff": delta.mean(axis=-1), "ci": (lo, hi), "p_value": np.minimum(p, 1.0)}
+
+
+# ------------------------------------------------------------
+# Row-level helpers for the scripts
+# ------------------------------------------------------------
+def summarize(rows: Sequence[dict], ks: Sequence[int] = (1,), n_boot: int = DEFAULT_BOOT,
+              alpha: float = 0.05, seed: int = 0) -> dict:
+    """{"pass@k": float, "pass@k_ci": [lo, hi]} for each reportable k."""
+    _, n, c = task_counts(rows)
+    out = {}
+    for key, val in pass_at_k(n, c, ks).items():
+        k = int(key.split("@")[1])
+        lo, hi = bootstrap_ci(n, c, k, n_boot, alpha, seed)
+        out[key] = float(val)
+        out[f"{key}_ci"] = [round(float(lo), 4), round(float(hi), 4)]
+    return out
+
+
+def compare(rows_a: Sequence[dict], rows_b: Sequence[dict], k: int = 1, n_boot: int = DEFAULT_BOOT,
+            alpha: float = 0.05, seed: int = 0) -> dict:
+    """Paired bootstrap of B vs A on the tasks both runs evaluated; floats for printing."""
+    tasks_b = {row["task_id"] for row in rows_b}
+    shared = [t for t in dict.fromkeys(row["task_id"] for row in rows_a) if t in tasks_b]
+    _, n_a, c_a = task_counts(rows_a, shared)
+    _, n_b, c_b = task_counts(rows_b, shared)
+    res = paired_bootstrap(n_a, c_a, n_b, c_b, k, n_boot, alpha, seed)
+    lo, hi = res["ci"]
+    return {"tasks": len(shared), "diff": float(res["diff"]),
+            "ci": [round(float(lo), 4), round(float(hi), 4)], "p_value": float(res["p_value"])}
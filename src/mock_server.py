@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Minimal OpenAI-compatible mock of the vLLM server (no GPU / model needed).
+
+Serves /v1/models, /v1/chat/completions and /v1/completions, optionally
+streamed (`"stream": true`, SSE chunks like vLLM). Unconstrained requests get a
+"chatty" answer (prose + markdown fence, no <sol> tags), the way small models
+often ignore the format, or with --style sol a <sol> block followed by a
+rambling explanation. Requests carrying `guided_regex` / `guided_grammar` get
+exactly `<sol>\n{body}\n</sol>`. The regex is checked with `re.fullmatch`, so
+a pattern Python cannot compile or match fails loudly.
+
+    python src/mock_server.py --port 8001
+    # or, in-process:
+    server, api_base = start_mock_server()
+"""
+import argparse, json, re, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+DEFAULT_BODY = "    return None"
+
+
+def _render(payload: dict, body: str, style: str = "chatty") -> str:
+    """Text the fake model 'generates' for one request."""
+    if payload.get("guided_regex") or payload.get("guided_grammar"):
+        return f"<sol>\n{body}\n</sol>"
+    if style == "sol":
+        return (
+            f"<sol>\n{body}\n</sol>\n\n"
+            "Explanation: the body above follows the docstring step by step, "
+            "checking each edge case before returning the final value."
+        )
+    return (
+        "Sure! Here is the implementation of the function body:\n\n"
+        f"```python\n{body}\n```\n\n"
+        "This handles the edge cases described in the docstring."
+    )
+
+
+def _apply_stop(text: str, payload: dict) -> str:
+    for s in payload.get("stop") or []:
+        i = text.find(s)
+        if i >= 0:
+            keep = s if payload.get("include_stop_str_in_output") else ""
+            text = text[:i] + keep
+    return text
+
+
+def _apply_max_tokens(text: str, payload: dict) -> str:
+    # whitespace "tokens" are good enough for a mock
+    max_tokens = payload.get("max_tokens")
+    parts = re.split(r"(\s+)", text)
+    if max_tokens is None or len(parts[::2]) <= max_tokens:
+        return text
+    return "".join(parts[: 2 * max_tokens - 1])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockVLLM/0.1"
+
+    def log_message(self, fmt, *args):  # keep test output quiet
+        pass
+
+    def _send(self, code: int, obj: dict):
+        data = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send(200, {"object": "list", "data": [{"id": self.server.model, "object": "model"}]})
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(n) or b"{}")
+        self.server.payloads.append(payload)
+        chat = self.path.rstrip("/").endswith("/chat/completions")
+        if not chat and not self.path.rstrip("/").endswith("/completions"):
+            return self._send(404, {"error": f"unknown path {self.path}"})
+
+        text = _render(payload, self.server.body, self.server.style)
+        if payload.get("guided_regex") and not re.fullmatch(payload["guided_regex"], text):
+            return self._send(400, {"error": "mock output does not satisfy guided_regex"})
+        text = _apply_max_tokens(_apply_stop(text, payload), payload)
+
+        prompt = (payload.get("messages") or [{}])[-1].get("content", "") if chat else payload.get("prompt", "")
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(text.split()),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if payload.get("stream"):
+            return self._stream(text, chat, payload)
+        # decode time proportional to output length, like a real server
+        time.sleep(self.server.token_delay * usage["completion_tokens"])
+
+        choice = {"index": 0, "finish_reason": "stop"}
+        if chat:
+            choice["message"] = {"role": "assistant", "content": text}
+        else:
+            choice["text"] = text
+        self._send(200, {
+            "object": "chat.completion" if chat else "text_completion",
+            "model": payload.get("model", self.server.model),
+            "choices": [choice],
+            "usage": usage,
+        })
+
+    def _stream(self, text: str, chat: bool, payload: dict):
+        """Send one SSE event per whitespace token; stops quietly if the client hangs up."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        sent = 0
+        try:
+            for tok in re.findall(r"\s*\S+|\s+", text):
+                time.sleep(self.server.token_delay)
+                choice = {"index": 0, "finish_reason": None}
+                if chat:
+                    choice["delta"] = {"content": tok}
+                else:
+                    choice["text"] = tok
+                event = {"object": "chat.completion.chunk" if chat else "text_completion",
+                         "model": payload.get("model", self.server.model), "choices": [choice]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+                sent += 1
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.server.streamed_tokens += sent
+
+
+def _make_server(host, port, model, body, token_delay, style) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.model, server.body, server.token_delay, server.style = model, body, token_delay, style
+    server.streamed_tokens = 0  # SSE events actually delivered (shows early cancellation)
+    server.payloads = []        # request bodies received, in order (for tests)
+    return server
+
+
+def start_mock_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    model: str = "mock-model",
+    body: str = DEFAULT_BODY,
+    token_delay: float = 0.0,
+    style: str = "chatty",
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock in a daemon thread; returns (server, api_base). Call server.shutdown() to stop."""
+    server = _make_server(host, port, model, body, token_delay, style)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--model", default="qwen-coder-0_5b-instruct")
+    ap.add_argument("--body", default=DEFAULT_BODY, help="function body every answer contains")
+    ap.add_argument("--token-delay", type=float, default=0.0, help="seconds per generated token")
+    ap.add_argument("--style", choices=["chatty", "sol"], default="chatty",
+                    help="shape of unconstrained answers")
+    args = ap.parse_args()
+
+    server = _make_server(args.host, args.port, args.model, args.body, args.token_delay, args.style)
+    print(f"[mock] serving {args.model} on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,218 @@
 #!/usr/bin/env python3
 import re, ast
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
+# ------------------------------------------------------------
+# Core normalization helpers
+# ------------------------------------------------------------
+FENCE_BLOCK_RE = re.compile(r"```[a-zA-Z0-9_+-]*\s*\n(.*?)```", flags=re.DOTALL)
+EMPTY_BODY = "    return None\n"  # ensure at least one return statement to avoid empty bodies
+
+
+def strip_fences(text: str) -> str:
+    """Remove markdown-style code fences if present."""
+    if text.strip().startswith("```"):
+        text = re.sub(r"^```[a-zA-Z0-9_+-]*\s*", "", text.strip())
+        text = text.strip("`")
+    return text.strip()
+
+
+def between_tags(text: str, start_tag="<sol>", end_tag="</sol>") -> str:
+    """Extract text between <sol> and </sol> tags if present."""
+    m = re.search(rf"{re.escape(start_tag)}(.*?){re.escape(end_tag)}", text, flags=re.DOTALL)
+    return m.group(1).strip("\n") if m else ""
+
+
+class Doc:
+    """
+    Text flowing through a pipeline. Memoizes the <sol> and fenced-block
+    extractions, so stages that look at the same text share one regex pass.
+    Created per call, never shared between threads.
+    """
+    __slots__ = ("text", "_tags", "_blocks")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._tags = None
+        self._blocks = None
+
+    @property
+    def tags(self) -> str:
+        if self._tags is None:
+            self._tags = between_tags(self.text)
+        return self._tags
+
+    @property
+    def blocks(self) -> List[str]:
+        if self._blocks is None:
+            self._blocks = FENCE_BLOCK_RE.findall(self.text)
+        return self._blocks
+
+    def derive(self, text: str) -> "Doc":
+        """Doc for a stage result; keeps the memo when the text is unchanged."""
+        return self if text == self.text else Doc(text)
+
+
+# ------------------------------------------------------------
+# Stages: Doc -> Doc, pure module-level functions (picklable)
+# ------------------------------------------------------------
+Stage = Callable[[Doc], Doc]
+
+
+def stage_strip_fences(doc: Doc) -> Doc:
+    return doc.derive(strip_fences(doc.text))
+
+
+def stage_prefer_tags_or_block(doc: Doc) -> Doc:
+    """<sol> body, else last code block, else the text unchanged."""
+    candidate = doc.tags
+    if not candidate:
+        if not doc.blocks:
+            return doc
+        candidate = doc.blocks[-1]
+    return doc.derive(candidate)
+
+
+def stage_select_body(doc: Doc) -> Doc:
+    """<sol> body, else last code block, else the fence-stripped text."""
+    candidate = doc.tags
+    if not candidate:
+        candidate = doc.blocks[-1] if doc.blocks else strip_fences(doc.text)
+    return doc.derive(candidate)
+
+
+def stage_nonempty(doc: Doc) -> Doc:
+    return doc if doc.text.strip() else doc.derive(EMPTY_BODY)
+
+
+@dataclass(frozen=True)
 class PostProcessor:
     """
     Handles model output cleanup (post-processing).
-    Supports multiple versions (v1, v2, v3) for ablation experiments.
+    An immutable pipeline of stages: safe to share across threads and to send
+    to worker processes. Versions v1, v2, v3 (see PIPELINES) for ablation experiments.
     """
-    _version = "v2"  # default version
+    name: str
+    stages: Tuple[Stage, ...]
+
     DEFAULT_VERSIONS = ["v1", "v2", "v3"]
 
-    @classmethod
-    def set_version(cls, version: str):
-        if version not in cls.DEFAULT_VERSIONS:
-            raise ValueError(f"Unsupported PostProcessor version: {version}")
-        cls._version = version
-
-    @classmethod
-    def normalize_with_version(cls, text: str) -> str:
-        """Dispatch normalize_body depending on version setting."""
-        if cls._version == "v1":
-            return cls._normalize_v1(text)
-        elif cls._version == "v2":
-            return cls._normalize_v2(text)
-        elif cls._version == "v3":
-            return cls._normalize_v3(text)
-        else:
-            return cls._normalize_v2(text)
+    def __call__(self, text: str) -> str:
+        doc = Doc(text)
+        for stage in self.stages:
+            doc = stage(doc)
+        return doc.text
+
+    def then(self, *stages: Stage, name: Optional[str] = None) -> "PostProcessor":
+        """New pipeline with extra stages appended (self is left untouched)."""
+        return PostProcessor(name or self.name + "+", self.stages + stages)
 
     # ------------------------------------------------------------
-    # Core normalization helpers
+    # Stateless helpers kept for existing call sites
     # ------------------------------------------------------------
-    @staticmethod
-    def strip_fences(text: str) -> str:
-        """Remove markdown-style code fences if present."""
-        if text.strip().startswith("```"):
-            text = re.sub(r"^```[a-zA-Z0-9_+-]*\s*", "", text.strip())
-            text = text.strip("`")
-        return text.strip()
-
-    @staticmethod
-    def between_tags(text: str, start_tag="<sol>", end_tag="</sol>") -> str:
-        """Extract text between <sol> and </sol> tags if present."""
-        m = re.search(rf"{re.escape(start_tag)}(.*?){re.escape(end_tag)}", text, flags=re.DOTALL)
-        return m.group(1).strip("\n") if m else ""
+    strip_fences = staticmethod(strip_fences)
+    between_tags = staticmethod(between_tags)
 
     @staticmethod
     def normalize_body(text: str) -> str:
         """
-        Default body normalization:
+        Default body normalization (v2):
           - prefer <sol> ... </sol>
           - else last code block
           - else strip fences
         """
-        candidate = PostProcessor.between_tags(text)
-        if not candidate:
-            blocks = re.findall(r"```[a-zA-Z0-9_+-]*\s*\n(.*?)```", text, flags=re.DOTALL)
-            candidate = blocks[-1] if blocks else PostProcessor.strip_fences(text)
-        # ensure at least one return statement to avoid empty bodies
-        return candidate if candidate.strip() else "    return None\n"
+        return PIPELINES["v2"](text)
 
-    # ------------------------------------------------------------
-    # Version-specific normalization
-    # ------------------------------------------------------------
     @staticmethod
-    def _normalize_v1(text: str) -> str:
-        # Minimal: just strip code fences
-        body = PostProcessor.strip_fences(text)
-        return body if body.strip() else "    return None\n"
+    def extract_def_from_prompt(prompt: str, entry_point: str = None) -> str:
+        return extract_def_from_prompt(prompt, entry_point)
 
-    @staticmethod
-    def _normalize_v2(text: str) -> str:
-        # Standard: current default normalize_body
-        return PostProcessor.normalize_body(text)
 
-    @staticmethod
-    def _normalize_v3(text: str) -> str:
-        # Aggressive: prefer <sol> tags, fallback to last code block
-        candidate = PostProcessor.between_tags(text)
-        if not candidate:
-            blocks = re.findall(r"```[a-zA-Z0-9_+-]*\s*\n(.*?)```", text, flags=re.DOTALL)
-            candidate = blocks[-1] if blocks else text
-        return PostProcessor._normalize_v2(candidate)
+PIPELINES: Dict[str, PostProcessor] = {
+    # Minimal: just strip code fences
+    "v1": PostProcessor("v1", (stage_strip_fences, stage_nonempty)),
+    # Standard: prefer <sol> tags, else last code block, else strip fences
+    "v2": PostProcessor("v2", (stage_select_body, stage_nonempty)),
+    # Aggressive: unwrap <sol>/last code block first, then apply v2 to the result
+    "v3": PostProcessor("v3", (stage_prefer_tags_or_block, stage_select_body, stage_nonempty)),
+}
+
+
+def get_postprocessor(version: str) -> PostProcessor:
+    if version not in PIPELINES:
+        raise ValueError(f"Unsupported PostProcessor version: {version}")
+    return PIPELINES[version]
+
+
+# Pipelines whose first stage returns the <sol> body whenever it is non-empty:
+# once that body is known, later text cannot change their output.
+_TAG_FIRST_STAGES = (stage_select_body, stage_prefer_tags_or_block)
+
+
+class StreamingPostProcessor:
+    """
+    Incremental front-end to a PostProcessor for streamed (token-by-token) output.
+
+    feed() appends each chunk once to a growing string (amortised O(1) per
+    character) and scans only the new text, plus the last few characters a tag
+    could straddle, for <sol>/</sol> and ``` fences. It returns
+    True once the final body is decided (a non-empty first <sol>...</sol> for
+    v2/v3). result() is always pp(text) on the text fed so far, which equals
+    the batch result on the full output once done is True: the first
+    <sol>...</sol> match cannot move when more text is appended.
+    """
+
+    def __init__(self, pp: Union[PostProcessor, str] = "v2", start_tag="<sol>", end_tag="</sol>"):
+        self.pp = get_postprocessor(pp) if isinstance(pp, str) else pp
+        self.start_tag, self.end_tag = start_tag, end_tag
+        self._tag_first = bool(self.pp.stages) and self.pp.stages[0] in _TAG_FIRST_STAGES
+        self._text = ""
+        self._open = -1        # index of the first start_tag
+        self._close = -1       # index of the first end_tag after it
+        self._fences = 0       # non-overlapping ``` seen so far
+        self._fence_pos = 0
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def in_fence(self) -> bool:
+        return self._fences % 2 == 1
+
+    @property
+    def tags_closed(self) -> bool:
+        return self._close >= 0
+
+    def feed(self, chunk: str) -> bool:
+        """Append a chunk; returns True once the body can no longer change."""
+        if self.done or not chunk:
+            return self.done
+        text, prev = self._text, len(self._text)
+        self._text = ""        # sole reference left is `text`: CPython resizes it in place
+        text += chunk
+        self._text = text
+
+        i = text.find("```", max(self._fence_pos, prev - 2))
+        while i >= 0:
+            self._fences += 1
+            self._fence_pos = i + 3
+            i = text.find("```", self._fence_pos)
+
+        if self._close < 0:
+            if self._open < 0:
+                self._open = text.find(self.start_tag, max(0, prev - len(self.start_tag) + 1))
+            if self._open >= 0:
+                body_start = self._open + len(self.start_tag)
+                self._close = text.find(self.end_tag, max(body_start, prev - len(self.end_tag) + 1))
+                if self._close >= 0 and self._tag_first:
+                    self.done = bool(text[body_start:self._close].strip("\n"))
+        return self.done
+
+    def result(self) -> str:
+        return self.pp(self.text)
 
 
 
@@ -130,5 +262,4 @@ def extract_def_from_prompt(prompt: str, entry_point: str = None) -> str:
 
 # Convenience: quick access from other scripts
 def normalize_output(text: str, version: str = "v2") -> str:
-    PostProcessor.set_version(version)
-    return PostProcessor.normalize_with_version(text)
+    return get_postprocessor(version)(text)
@@ -0,0 +1,234 @@
+# src/result_cache.py
+# Persistent, content-addressed cache of execution results.
+#
+# Key: sha256 of the exact program executed (prompt + completion + test + check
+# call), so identical (prompt, completion, test) triples from different sweeps,
+# post-processing versions or scripts share one entry. Stored: pass/fail, the
+# human_eval result string, failure type, runtime, CPU time and per-unit times
+# (test_units.py; NULL for whole-check runs). CPU-time-budget verdicts
+# and verdicts under per-sample Limits live in their own key namespaces
+# (key_namespace), so e.g. a pass without limits is never reused under
+# SAFE_LIMITS. Per-task run/timeout counts
+# (task_history) feed the slow-lane prediction. SQLite (stdlib) keeps it
+# safe to share between processes; entries are evicted least-recently-used
+# once the stored size exceeds max_bytes. Infra failures, limit terminations
+# and crashes the program did not cause itself are never stored.
+
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+from executor import LIMIT_FAILURES, NO_LIMITS, ExecResult, Limits, lasting_verdict
+
+DEFAULT_CACHE_PATH = Path(os.getenv("HE_EXEC_CACHE", Path.home() / ".cache" / "qwen_humaneval" / "exec_results.sqlite"))
+DEFAULT_MAX_BYTES = 256 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key       TEXT PRIMARY KEY,
+    passed    INTEGER NOT NULL,
+    result    TEXT NOT NULL,
+    failure   TEXT NOT NULL,
+    runtime_s REAL NOT NULL,
+    timeout   REAL NOT NULL,
+    cpu_s     REAL NOT NULL DEFAULT 0,
+    cases     TEXT,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_lru ON results (last_used);
+CREATE TABLE IF NOT EXISTS task_history (
+    task      TEXT PRIMARY KEY,
+    runs      INTEGER NOT NULL,
+    timeouts  INTEGER NOT NULL,
+    runtime_s REAL NOT NULL
+);
+"""
+_ROW_OVERHEAD = 128   # rough per-row bytes on top of key + result text
+
+
+def program_key(program: str, namespace: str = "") -> str:
+    """sha256 of the program; a namespace (e.g. "cpu_time") keeps other timeout modes apart."""
+    if namespace:
+        program = namespace + "\0" + program
+    return hashlib.sha256(program.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def key_namespace(cpu_time: bool = False, limits: Optional[Limits] = None) -> str:
+    """Namespace for verdicts of a timeout mode and Limits ("" for wall-clock without limits)."""
+    parts = ["cpu_time"] if cpu_time else []
+    if limits is not None and limits != NO_LIMITS:
+        parts.append("limits:" + ",".join(f"{k}={v}" for k, v in sorted(dataclasses.asdict(limits).items())))
+    return "+".join(parts)
+
+
+def _still_valid(res: ExecResult, stored_timeout: float, timeout: float, cpu_time: bool = False) -> bool:
+    """A cached verdict holds for a new timeout unless the timeout could change it."""
+    if res.failure == "timeout":
+        return timeout <= stored_timeout
+    return (res.cpu_s if cpu_time else res.runtime_s) <= timeout
+
+
+class ResultCache:
+    """
+    Disk-backed execution result cache.
+
+        cache = ResultCache()
+        hits = cache.get_many(keys, timeouts)     # {key: ExecResult}
+        cache.put_many([(key, timeout, result), ...])
+    """
+
+    key = staticmethod(program_key)
+    namespace = staticmethod(key_namespace)
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path or DEFAULT_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()       # one connection, shared by evaluation threads
+        self._db = sqlite3.connect(str(self.path), timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(results)")}
+        if "cpu_s" not in columns:     # caches written before CPU-time verdicts existed
+            self._db.execute("ALTER TABLE results ADD COLUMN cpu_s REAL NOT NULL DEFAULT 0")
+        if "cases" not in columns:     # ... or before per-unit timings
+            self._db.execute("ALTER TABLE results ADD COLUMN cases TEXT")
+        # running upper bound of the stored size (replaced rows count twice);
+        # re-synced with the table only when it passes max_bytes
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get_many(self, keys: Sequence[str], timeouts: Sequence[float], cpu_time: bool = False) -> Dict[str, ExecResult]:
+        with self._lock:
+            return self._get_many(keys, timeouts, cpu_time)
+
+    def _get_many(self, keys: Sequence[str], timeouts: Sequence[float], cpu_time: bool) -> Dict[str, ExecResult]:
+        found: Dict[str, ExecResult] = {}
+        want = dict(zip(keys, timeouts))
+        uniq = list(want)
+        for i in range(0, len(uniq), 500):              # SQLite bound-parameter limit
+            chunk = uniq[i:i + 500]
+            rows = self._db.execute(
+                f"SELECT key, passed, result, failure, runtime_s, timeout, cpu_s, cases FROM results "
+                f"WHERE key IN ({','.join('?' * len(chunk))})", chunk,
+            ).fetchall()
+            for key, passed, result, failure, runtime_s, stored_timeout, cpu_s, cases in rows:
+                res = ExecResult(bool(passed), result, runtime_s, failure, cpu_s,
+                                 cases=json.loads(cases) if cases else None)
+                if _still_valid(res, stored_timeout, want[key], cpu_time):
+                    found[key] = res
+        if found:
+            now = time.time()
+            self._db.executemany("UPDATE results SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+        hits = sum(k in found for k in keys)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items: Sequence[Tuple[str, float, ExecResult]]):
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, timeout, r in items:
+            if not lasting_verdict(r):           # verdicts about the host, not the program
+                continue
+            cases = json.dumps(r.cases) if r.cases is not None else None
+            rows.append((key, int(r.passed), r.result, r.failure, r.runtime_s, timeout, r.cpu_s, cases,
+                         len(key) + len(r.result) + len(cases or "") + _ROW_OVERHEAD, now))
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results (key, passed, result, failure, runtime_s, timeout, cpu_s, cases, size, "
+                "last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("COMMIT")
+            self._total += sum(row[8] for row in rows)
+            self._evict()
+
+    def record_tasks(self, items: Sequence[Tuple[str, ExecResult]]):
+        """Add executed (task_key, result) pairs to the per-task run/timeout counts."""
+        agg: Dict[str, list] = {}
+        for task, r in items:
+            if r.failure == "infra" or r.failure in LIMIT_FAILURES:
+                continue
+            a = agg.setdefault(task, [0, 0, 0.0])
+            a[0] += 1
+            a[1] += r.failure == "timeout"
+            a[2] += r.runtime_s
+        if not agg:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO task_history (task, runs, timeouts, runtime_s) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(task) DO UPDATE SET runs = runs + excluded.runs, "
+                "timeouts = timeouts + excluded.timeouts, runtime_s = runtime_s + excluded.runtime_s",
+                [(task, *a) for task, a in agg.items()])
+            self._db.execute("COMMIT")
+
+    def task_history(self, tasks: Sequence[str]) -> Dict[str, Tuple[int, int, float]]:
+        """{task_key: (runs, timeouts, total runtime_s)} for tasks seen before."""
+        uniq, out = list(dict.fromkeys(tasks)), {}
+        with self._lock:
+            for i in range(0, len(uniq), 500):
+                chunk = uniq[i:i + 500]
+                for task, runs, timeouts, runtime_s in self._db.execute(
+                        f"SELECT task, runs, timeouts, runtime_s FROM task_history "
+                        f"WHERE task IN ({','.join('?' * len(chunk))})", chunk):
+                    out[task] = (runs, timeouts, runtime_s)
+        return out
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        self._total = total
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)   # evict a bit extra so we don't evict on every put
+        freed, doomed = 0, []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        self._db.execute("BEGIN")
+        self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self._db.execute("COMMIT")
+        self._total = total - freed
+
+    def stats(self) -> dict:
+        with self._lock:
+            n, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": n, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._db.execute("DELETE FROM task_history")
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_DEFAULT: Optional[ResultCache] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_cache() -> ResultCache:
+    """Process-wide cache at DEFAULT_CACHE_PATH (env HE_EXEC_CACHE)."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = ResultCache()
+    return _DEFAULT
@@ -0,0 +1,198 @@
+# src/shm_transport.py
+# Shared-memory transport between ExecutionPool and its workers (transport="shm").
+#
+# Task table: the pool appends each task harness (prompt prefix + test tail) once
+# to an append-only shared-memory arena; a job then names its task by a small
+# reference (segment, offset, lengths) and carries only the completions, as
+# UTF-8 bytes. Workers map each arena segment once and decode harnesses on
+# first use (LRU), instead of unpickling prompt and test with every batch.
+#
+# Results: every worker owns a results segment. It packs a batch's results
+# there (fixed header + result/failure text + per-unit times) and only sends
+# the packed size over its pipe; a batch that doesn't fit goes back pickled.
+#
+# Segments are multiprocessing.shared_memory blocks created and unlinked by
+# the pool; workers attach without registering them with the resource tracker.
+#
+# The table is capped at max_bytes: when a new segment would pass the cap, the
+# table starts a new generation (a long-lived shared pool or eval daemon sees
+# many sweeps' harnesses). Old segments are unlinked once no batch sent with a
+# reference into them is in flight, and a worker unmaps them when it gets its
+# first reference of the new generation.
+
+import struct
+import sys
+from collections import Counter, OrderedDict
+from contextlib import suppress
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from executor import TAIL_CACHE_SIZE, ExecResult
+
+SEGMENT_BYTES = 8 << 20    # task table arena segment (a larger harness gets its own)
+TABLE_MAX_BYTES = 256 << 20  # segments per table generation
+RESULT_BYTES = 1 << 20     # per-worker results segment
+_HEAD = struct.Struct("<BddIII")   # status, runtime_s, cpu_s, len(result), len(failure), n_cases + 1 (0 = None)
+_FAILED, _PASSED, _NONE = 0, 1, 2
+
+
+def _encode(s: str) -> bytes:
+    return s.encode("utf-8", "surrogatepass")
+
+
+def _decode(b) -> str:
+    return bytes(b).decode("utf-8", "surrogatepass")
+
+
+def attach(name: str) -> SharedMemory:
+    """Map an existing segment without handing it to this process's resource tracker."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+def _free(seg: SharedMemory):
+    seg.close()
+    with suppress(FileNotFoundError):
+        seg.unlink()
+
+
+class TaskTable:
+    """
+    Parent side: append-only arena of task harnesses, one generation at a time
+    (used by the dispatcher thread only). Every ref() must be matched by a
+    release() once the batch it was sent with is done.
+    """
+
+    def __init__(self, segment_bytes: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.segment_bytes = segment_bytes or SEGMENT_BYTES
+        self.max_bytes = max_bytes or TABLE_MAX_BYTES
+        self.generation = 0
+        self.segments: List[SharedMemory] = []        # current generation
+        self._used = 0
+        self._refs: Dict[Tuple[str, str], tuple] = {}
+        self._retired: Dict[str, SharedMemory] = {}   # older generations with batches in flight
+        self._in_flight: Counter = Counter()          # segment name -> refs handed out, not released
+
+    def ref(self, prefix: str, tail: str) -> tuple:
+        """(segment name, offset, prefix bytes, tail bytes, generation) of a harness, appending it if new."""
+        key = (prefix, tail)
+        ref = self._refs.get(key)
+        if ref is None:
+            p, t = _encode(prefix), _encode(tail)
+            size = len(p) + len(t)
+            if not self.segments or self._used + size > self.segments[-1].size:
+                new = max(self.segment_bytes, size, 1)
+                if self.segments and sum(s.size for s in self.segments) + new > self.max_bytes:
+                    self._rotate()
+                self.segments.append(SharedMemory(create=True, size=new))
+                self._used = 0
+            seg = self.segments[-1]
+            seg.buf[self._used:self._used + size] = p + t
+            ref = self._refs[key] = (seg.name, self._used, len(p), len(t), self.generation)
+            self._used += size
+        self._in_flight[ref[0]] += 1
+        return ref
+
+    def release(self, ref: tuple):
+        """The batch sent with ref is done (or was never sent)."""
+        name = ref[0]
+        self._in_flight[name] -= 1
+        if self._in_flight[name] <= 0:
+            del self._in_flight[name]
+            if name in self._retired:
+                _free(self._retired.pop(name))
+
+    def _rotate(self):
+        """Start a new generation; free the old segments now or when their batches are done."""
+        for seg in self.segments:
+            if self._in_flight[seg.name] > 0:
+                self._retired[seg.name] = seg
+            else:
+                _free(seg)
+        self.segments, self._refs, self._used = [], {}, 0
+        self.generation += 1
+
+    def close(self):
+        for seg in self.segments + list(self._retired.values()):
+            _free(seg)
+        self.segments, self._refs, self._retired = [], {}, {}
+        self._in_flight.clear()
+
+
+class TaskReader:
+    """Worker side: resolves task references to (prefix, tail)."""
+
+    def __init__(self):
+        self._segments: Dict[str, SharedMemory] = {}
+        self._cache: OrderedDict = OrderedDict()
+        self._generation = 0
+
+    def get(self, ref: tuple) -> Tuple[str, str]:
+        if ref in self._cache:
+            self._cache.move_to_end(ref)
+            return self._cache[ref]
+        name, off, n_prefix, n_tail, generation = ref
+        if generation != self._generation:           # the table rotated: unmap the old segments
+            for seg in self._segments.values():
+                with suppress(BufferError):
+                    seg.close()
+            self._segments, self._generation = {}, generation
+            self._cache.clear()
+        seg = self._segments.get(name)
+        if seg is None:
+            seg = self._segments[name] = attach(name)
+        buf = seg.buf
+        out = self._cache[ref] = (_decode(buf[off:off + n_prefix]),
+                                  _decode(buf[off + n_prefix:off + n_prefix + n_tail]))
+        if len(self._cache) > TAIL_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return out
+
+
+def pack_results(buf, results: Sequence[Optional[ExecResult]]) -> Optional[int]:
+    """Write results into buf; returns the bytes used, or None if they don't fit."""
+    pos, cap = 0, len(buf)
+    for r in results:
+        if r is None:
+            parts = [_HEAD.pack(_NONE, 0.0, 0.0, 0, 0, 0)]
+        else:
+            res, fail = _encode(r.result), _encode(r.failure)
+            cases = r.cases
+            parts = [_HEAD.pack(_PASSED if r.passed else _FAILED, r.runtime_s, r.cpu_s, len(res), len(fail),
+                                0 if cases is None else len(cases) + 1), res, fail]
+            if cases:
+                parts.append(struct.pack(f"<{len(cases)}d", *cases))
+        size = sum(len(p) for p in parts)
+        if pos + size > cap:
+            return None
+        for p in parts:
+            buf[pos:pos + len(p)] = p
+            pos += len(p)
+    return pos
+
+
+def unpack_results(buf, n_bytes: int) -> List[Optional[ExecResult]]:
+    out, pos = [], 0
+    while pos < n_bytes:
+        status, runtime_s, cpu_s, n_res, n_fail, n_cases = _HEAD.unpack_from(buf, pos)
+        pos += _HEAD.size
+        if status == _NONE:
+            out.append(None)
+            continue
+        result = _decode(buf[pos:pos + n_res])
+        pos += n_res
+        failure = _decode(buf[pos:pos + n_fail])
+        pos += n_fail
+        cases = None
+        if n_cases:
+            cases = list(struct.unpack_from(f"<{n_cases - 1}d", buf, pos))
+            pos += 8 * (n_cases - 1)
+        out.append(ExecResult(status == _PASSED, result, runtime_s, failure, cpu_s, cases=cases))
+    return out
@@ -0,0 +1,130 @@
+# src/slow_lane.py
+# Which samples are likely to run long, so the pool can isolate them.
+#
+# A sample is predicted slow if its code has one of these features:
+#   - infinite_loop: `while <constant true>` with no break/return/raise inside;
+#   - sleep:         calls time.sleep / sleep;
+#   - tree_recursion: a function calling itself more than once per call (exponential
+#                     without memoisation; functools.cache/lru_cache exempts it);
+#   - combinatorial: itertools.permutations / product / combinations(_with_replacement);
+#   - nested_loops:  loops nested NESTED_LOOP_DEPTH deep.
+# It is also predicted slow if its task has a history in the result cache of
+# samples timing out: at least MIN_HISTORY runs with a timeout rate of
+# SLOW_TASK_TIMEOUT_RATE or more.
+#
+# A wrong guess only changes which lane a sample runs in, never its verdict.
+
+import ast
+import hashlib
+import warnings
+from typing import Dict, List, Optional, Sequence
+
+from executor import build_tail
+
+NESTED_LOOP_DEPTH = 3
+MIN_HISTORY = 4
+SLOW_TASK_TIMEOUT_RATE = 0.3
+_COMBINATORIAL = frozenset({"permutations", "product", "combinations", "combinations_with_replacement"})
+_MEMO_DECORATORS = frozenset({"cache", "lru_cache"})
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+
+
+def task_key(problem: dict) -> str:
+    """Identity of a task's harness (prompt + test + check call) for history lookups."""
+    blob = problem["prompt"] + build_tail(problem)
+    return hashlib.sha256(blob.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _call_name(node: ast.Call) -> str:
+    f = node.func
+    return f.id if isinstance(f, ast.Name) else f.attr if isinstance(f, ast.Attribute) else ""
+
+
+def _walk_scope(node: ast.AST):
+    """Nodes of node's body, not descending into nested functions/classes."""
+    todo = list(ast.iter_child_nodes(node))
+    while todo:
+        n = todo.pop()
+        yield n
+        if not isinstance(n, _SCOPES):
+            todo.extend(ast.iter_child_nodes(n))
+
+
+def _infinite_loop(node: ast.While) -> bool:
+    try:
+        if not ast.literal_eval(node.test):
+            return False
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False
+    return not any(isinstance(n, (ast.Break, ast.Return, ast.Raise)) for n in _walk_scope(node))
+
+
+def _loop_depth(node: ast.AST, depth: int = 0) -> int:
+    best = depth
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, _SCOPES):
+            best = max(best, _loop_depth(child, 0))
+        elif isinstance(child, (ast.For, ast.While, ast.comprehension)):
+            best = max(best, _loop_depth(child, depth + 1))
+        else:
+            best = max(best, _loop_depth(child, depth))
+    return best
+
+
+def _tree_recursive(fn: ast.FunctionDef) -> bool:
+    for d in fn.decorator_list:
+        target = d.func if isinstance(d, ast.Call) else d
+        name = target.id if isinstance(target, ast.Name) else getattr(target, "attr", "")
+        if name in _MEMO_DECORATORS:
+            return False
+    calls = sum(isinstance(n, ast.Call) and _call_name(n) == fn.name for n in _walk_scope(fn))
+    return calls >= 2
+
+
+def code_reason(source: str) -> str:
+    """First slow feature found in source ("" if none, or if it doesn't parse: that fails fast)."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            tree = ast.parse(source)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return ""
+    try:
+        for n in ast.walk(tree):
+            if isinstance(n, ast.While) and _infinite_loop(n):
+                return "infinite_loop"
+            if isinstance(n, ast.Call):
+                name = _call_name(n)
+                if name == "sleep":
+                    return "sleep"
+                if name in _COMBINATORIAL:
+                    return "combinatorial"
+            if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) and _tree_recursive(n):
+                return "tree_recursion"
+        if _loop_depth(tree) >= NESTED_LOOP_DEPTH:
+            return "nested_loops"
+    except RecursionError:
+        return "nested_loops"                    # absurdly deep code: treat as suspect
+    return ""
+
+
+def history_reason(history: Optional[tuple]) -> str:
+    """history = (runs, timeouts, runtime_s) from ResultCache.task_history."""
+    if history is None:
+        return ""
+    runs, timeouts, _ = history
+    return "history" if runs >= MIN_HISTORY and timeouts / runs >= SLOW_TASK_TIMEOUT_RATE else ""
+
+
+def predict(
+    problems: Dict[str, dict],
+    samples: Sequence[dict],
+    history: Optional[Dict[str, tuple]] = None,
+) -> List[str]:
+    """Per sample: the reason it is predicted slow, or "" for the fast lane."""
+    keys = {tid: task_key(problems[tid]) for tid in {s["task_id"] for s in samples}} if history else {}
+    out = []
+    for s in samples:
+        reason = history_reason(history.get(keys[s["task_id"]])) if history else ""
+        out.append(reason or code_reason(problems[s["task_id"]]["prompt"] + s["completion"]))
+    return out
@@ -0,0 +1,341 @@
+# src/static_filter.py
+# Static pre-filter: verdicts that are certain without executing the sample.
+#
+#   - SyntaxError: the program human_eval would exec does not compile.
+#   - static_stub: the entry point only returns None (normalize_body's
+#     "return None" fallback, or `pass`) and the first statement of check()
+#     that involves candidate asserts candidate(...) == <non-None literal>.
+#   - static_undefined: the first thing the entry point evaluates is a global
+#     name that nothing in the program defines and that isn't a builtin, and
+#     check() unconditionally calls candidate -> NameError. Programs that could
+#     create globals or builtins at run time (imports of builtins/sys/importlib/
+#     inspect under any alias, __globals__, __dict__, modules, ...) are executed.
+#   - canonical: prompt + completion parses to the same AST as prompt +
+#     canonical_solution -> passes.
+#
+# The stub and undefined rules also require the completion's module-level
+# code to be inert (plain defs, docstrings), so nothing runs before check().
+# The task's prompt and test are trusted as far as the canonical solution
+# passes them. Anything the analysis cannot prove falls through to execution
+# (analyze() returns None); a static verdict's `result` is exactly what
+# executing the sample reports, and only `failure` says it was static.
+
+import ast
+import builtins
+import sys
+import warnings
+from functools import lru_cache
+from typing import Iterator, Optional, Set, Tuple
+
+from executor import ExecResult, build_program
+
+# Names, modules and attributes that let a program create globals or builtins
+# behind the analysis' back (attributes also as strings, e.g. getattr(f, "__globals__")).
+_DYNAMIC_NAMES = frozenset({
+    "globals", "vars", "locals", "exec", "eval", "compile", "setattr", "__import__",
+    "__builtins__", "builtins", "sys", "inspect", "importlib",
+})
+_DYNAMIC_MODULES = frozenset({"builtins", "sys", "importlib", "inspect"})
+_DYNAMIC_ATTRS = frozenset({"__globals__", "__dict__", "__builtins__", "modules"})
+_NON_EAGER = (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp,
+              ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+_PARSE_ERRORS = (SyntaxError, ValueError, RecursionError, MemoryError)
+
+
+def _parse(source: str) -> ast.Module:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")      # SyntaxWarnings are execution's business
+        return ast.parse(source)
+
+
+def _eager_nodes(node: ast.AST) -> Iterator[ast.AST]:
+    """Nodes certainly evaluated when `node` is (skips lazy and conditional parts)."""
+    if isinstance(node, _NON_EAGER):
+        return
+    yield node
+    if isinstance(node, ast.BoolOp):
+        yield from _eager_nodes(node.values[0])      # later operands may short-circuit away
+    elif isinstance(node, ast.IfExp):
+        yield from _eager_nodes(node.test)
+    else:
+        for child in ast.iter_child_nodes(node):
+            yield from _eager_nodes(child)
+
+
+def _first_evaluated(node: Optional[ast.AST]) -> Optional[ast.AST]:
+    """The leaf evaluated first when node is: nothing can raise before it."""
+    while node is not None and not isinstance(node, ast.Name):
+        if isinstance(node, ast.Call):
+            node = node.func
+        elif isinstance(node, (ast.Attribute, ast.Subscript, ast.Starred)):
+            node = node.value
+        elif isinstance(node, (ast.BinOp, ast.Compare)):
+            node = node.left
+        elif isinstance(node, ast.BoolOp):
+            node = node.values[0]
+        elif isinstance(node, ast.UnaryOp):
+            node = node.operand
+        elif isinstance(node, ast.IfExp):
+            node = node.test
+        else:
+            return None
+    return node
+
+
+def _stmt_first_name(stmt: ast.stmt) -> Optional[str]:
+    """The name a statement loads before anything else, if it starts with one."""
+    if isinstance(stmt, (ast.Expr, ast.Return, ast.Assign, ast.AnnAssign)):
+        node = _first_evaluated(stmt.value)
+    elif isinstance(stmt, (ast.If, ast.While)):
+        node = _first_evaluated(stmt.test)
+    elif isinstance(stmt, ast.For):
+        node = _first_evaluated(stmt.iter)
+    else:
+        return None
+    return node.id if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) else None
+
+
+def _dynamic(tree: ast.Module) -> bool:
+    """Whether the program could bind globals or builtins the analysis doesn't see."""
+    for n in ast.walk(tree):
+        if isinstance(n, ast.Name) and n.id in _DYNAMIC_NAMES:
+            return True
+        if isinstance(n, ast.Import) and any(a.name.split(".")[0] in _DYNAMIC_MODULES for a in n.names):
+            return True
+        if isinstance(n, ast.ImportFrom) and (
+                (n.module or "").split(".")[0] in _DYNAMIC_MODULES or any(a.name == "*" for a in n.names)):
+            return True
+        if isinstance(n, ast.Attribute) and n.attr in _DYNAMIC_ATTRS:
+            return True
+        if isinstance(n, ast.Constant) and isinstance(n.value, str) and n.value in _DYNAMIC_ATTRS:
+            return True
+    return False
+
+
+def _inert(node: Optional[ast.AST]) -> bool:
+    return node is None or isinstance(node, ast.Constant)
+
+
+def _inert_completion(tree: ast.Module, problem: dict, completion: str) -> bool:
+    """Whether the module-level statements the completion adds run nothing but plain defs."""
+    start = problem["prompt"].count("\n")
+    end = (problem["prompt"] + completion).count("\n") + 1
+    for stmt in tree.body:
+        if not start < stmt.lineno <= end:
+            continue                         # the prompt's or the test's
+        if isinstance(stmt, ast.Pass) or (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant)):
+            continue
+        if not isinstance(stmt, ast.FunctionDef) or stmt.decorator_list or not _inert(stmt.returns):
+            return False
+        args = stmt.args
+        every = args.posonlyargs + args.args + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+        if not all(_inert(a.annotation) for a in every) or not all(map(_inert, args.defaults + args.kw_defaults)):
+            return False                     # evaluated at def time
+    return True
+
+
+def _module_bindings(tree: ast.Module) -> Set[str]:
+    """Every name the module could bind globally (any depth of module-level code + `global` decls)."""
+    names: Set[str] = set()
+    for n in ast.walk(tree):
+        if isinstance(n, ast.Global):
+            names.update(n.names)
+    todo = list(tree.body)
+    while todo:
+        n = todo.pop()
+        if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(n.name)
+            continue                          # their bodies are a different scope
+        if isinstance(n, (ast.Import, ast.ImportFrom)):
+            for alias in n.names:
+                names.add((alias.asname or alias.name).split(".")[0])
+        elif isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del)):
+            names.add(n.id)
+        elif isinstance(n, ast.ExceptHandler) and n.name:
+            names.add(n.name)
+        elif isinstance(n, (ast.MatchAs, ast.MatchStar)) and n.name:
+            names.add(n.name)
+        elif isinstance(n, ast.MatchMapping) and n.rest:
+            names.add(n.rest)
+        todo.extend(ast.iter_child_nodes(n))
+    return names
+
+
+def _entry_function(tree: ast.Module, entry_point: str) -> Optional[ast.FunctionDef]:
+    """The entry point's plain `def`, if it is the only module-level binding of that name."""
+    defs = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == entry_point]
+    if len(defs) != 1 or defs[0].decorator_list:
+        return None
+    if any(isinstance(n, ast.Global) and entry_point in n.names for n in ast.walk(tree)):
+        return None
+    others = _module_bindings(ast.Module(body=[n for n in tree.body if n is not defs[0]], type_ignores=[]))
+    return None if entry_point in others else defs[0]
+
+
+def _body_without_docstring(fn: ast.FunctionDef):
+    body = fn.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        body = body[1:]
+    return body
+
+
+def _is_none_stub(fn: ast.FunctionDef) -> bool:
+    body = _body_without_docstring(fn)
+    if len(body) == 1 and isinstance(body[0], ast.Pass):
+        return True
+    return (len(body) == 1 and isinstance(body[0], ast.Return)
+            and (body[0].value is None
+                 or (isinstance(body[0].value, ast.Constant) and body[0].value.value is None)))
+
+
+def _is_generator(fn: ast.FunctionDef) -> bool:
+    todo = list(fn.body)
+    while todo:
+        n = todo.pop()
+        if isinstance(n, (ast.Yield, ast.YieldFrom, ast.Await)):
+            return True
+        if not isinstance(n, _NON_EAGER):
+            todo.extend(ast.iter_child_nodes(n))
+    return False
+
+
+def _is_candidate_call(n: ast.AST) -> bool:
+    return isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id == "candidate"
+
+
+def _non_none_literal(n: ast.AST) -> bool:
+    try:
+        return ast.literal_eval(n) is not None
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False
+
+
+@lru_cache(maxsize=1024)
+def _test_facts(test: str) -> Tuple[bool, Optional[str]]:
+    """
+    (calls_candidate, stub_result) for a task's test source, from the first
+    statement of check() that mentions candidate (the ones before it behave as
+    they do for the canonical solution):
+    calls_candidate - that statement certainly calls candidate, outside any try/with;
+    stub_result     - it asserts `candidate(...) == <non-None literal>` with a constant
+                      message: what executing a return-None stub reports, else None.
+    """
+    try:
+        tree = _parse(test)
+    except _PARSE_ERRORS:
+        return False, None
+    checks = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "check"]
+    if not checks or checks[-1].decorator_list:
+        return False, None
+    fn = checks[-1]
+    if [a.arg for a in fn.args.args] != ["candidate"]:
+        return False, None
+    if any(isinstance(n, ast.Name) and n.id == "candidate" and not isinstance(n.ctx, ast.Load) for n in ast.walk(fn)):
+        return False, None
+    for stmt in fn.body:
+        if any(isinstance(n, ast.Return) for n in ast.walk(stmt)):
+            break                            # what follows may be skipped
+        if not any(isinstance(n, ast.Name) and n.id == "candidate" for n in ast.walk(stmt)):
+            continue
+        if isinstance(stmt, ast.Assert):
+            expr = stmt.test
+        elif isinstance(stmt, (ast.Expr, ast.Assign)):
+            expr = stmt.value
+        else:
+            break
+        if not any(_is_candidate_call(n) for n in _eager_nodes(expr)):
+            break
+        stub = None
+        if (isinstance(stmt, ast.Assert) and isinstance(expr, ast.Compare)
+                and len(expr.ops) == 1 and isinstance(expr.ops[0], ast.Eq) and _inert(stmt.msg)):
+            a, b = expr.left, expr.comparators[0]
+            if (_is_candidate_call(a) and _non_none_literal(b)) or (_is_candidate_call(b) and _non_none_literal(a)):
+                stub = "failed: " + ("" if stmt.msg is None else str(stmt.msg.value))
+        return True, stub
+    return False, None
+
+
+@lru_cache(maxsize=1024)
+def _canonical_dump(prompt: str, canonical: str) -> Optional[str]:
+    try:
+        return ast.dump(_parse(prompt + canonical))
+    except _PARSE_ERRORS:
+        return None
+
+
+def _undefined_name(tree: ast.Module, fn: ast.FunctionDef) -> Optional[str]:
+    """A global name fn loads before anything else it does, that nothing defines."""
+    if _is_generator(fn) or _dynamic(tree):
+        return None
+    args = fn.args
+    local = {a.arg for a in args.posonlyargs + args.args + args.kwonlyargs}
+    local.update(a.arg for a in (args.vararg, args.kwarg) if a is not None)
+    for n in ast.walk(fn):                   # anything bound anywhere in fn is local (or declared global)
+        if isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del)):
+            local.add(n.id)
+        elif isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and n is not fn:
+            local.add(n.name)
+        elif isinstance(n, (ast.Import, ast.ImportFrom)):
+            local.update((a.asname or a.name).split(".")[0] for a in n.names)
+        elif isinstance(n, (ast.Global, ast.Nonlocal)):
+            local.update(n.names)
+        elif isinstance(n, ast.ExceptHandler) and n.name:
+            local.add(n.name)
+    body = _body_without_docstring(fn)
+    name = _stmt_first_name(body[0]) if body else None
+    if name is None or name in local or name in _module_bindings(tree) or hasattr(builtins, name):
+        return None
+    return name
+
+
+def analyze(problem: dict, completion: str) -> Optional[ExecResult]:
+    """Static verdict for one sample, or None if it has to be executed."""
+    program = build_program(problem, completion)
+    try:
+        tree = _parse(program)
+    except (RecursionError, MemoryError):
+        return None
+    except (SyntaxError, ValueError):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                compile(program, "<string>", "exec")     # the exact error exec() would raise
+        except (SyntaxError, ValueError) as e:
+            if _compiles(problem["prompt"] + completion):
+                return None                  # the pool may run prompt + completion and the test apart
+            return ExecResult(False, f"failed: {e}", 0.0, type(e).__name__)
+        return None                          # ast and compile disagree: let execution decide
+
+    canonical = _canonical_dump(problem["prompt"], problem.get("canonical_solution", ""))
+    if canonical is not None:
+        try:
+            if ast.dump(_parse(problem["prompt"] + completion)) == canonical:
+                return ExecResult(True, "passed", 0.0, "")
+        except _PARSE_ERRORS:
+            pass
+
+    fn = _entry_function(tree, problem["entry_point"])
+    if fn is None or sys.flags.optimize:     # -O strips the asserts the rules below rely on
+        return None
+    calls_candidate, stub_result = _test_facts(problem["test"])
+    if not calls_candidate or not _inert_completion(tree, problem, completion):
+        return None
+    if stub_result is not None and _is_none_stub(fn):
+        return ExecResult(False, stub_result, 0.0, "static_stub")
+    name = _undefined_name(tree, fn)
+    if name is not None:
+        return ExecResult(False, f"failed: name '{name}' is not defined", 0.0, "static_undefined")
+    return None
+
+
+def _compiles(source: str) -> bool:
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            compile(source, "<string>", "exec")
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return False
+    return True
@@ -0,0 +1,242 @@
+# src/subinterp.py
+# Subinterpreter execution backend (Python 3.12+), opt-in:
+#
+#     ExecutionPool(backend="subinterp")      # or HE_EXEC_BACKEND=subinterp
+#
+# Each pool worker runs every sample in a fresh isolated subinterpreter (own
+# GIL, own modules) on a helper thread, instead of in a forked child. The same
+# reliability guard, stdout/stderr capture and result wording as the fork
+# backend apply inside it.
+#
+# A subinterpreter can't be killed, so anything that does not finish cleanly
+# goes back to the fork backend: on a timeout the worker answers None for the
+# sample and exits (the runaway thread dies with it), and the pool re-runs the
+# sample in a forked child on a fresh worker; a sample that crashes the worker
+# is retried the same way. Samples importing an extension module that refuses
+# to load in subinterpreters (e.g. ctypes on 3.12) are re-run forked in place.
+# Verdicts therefore always come from a clean run.
+#
+# Rlimits and CPU-time budgets are per process, so pools with Limits and
+# cpu_time batches always use forked children.
+#
+# CPython 3.12/3.13 keep ~1.7 MB of every destroyed isolated interpreter, so
+# these workers are recycled after RECYCLE_AFTER samples unless the pool sets
+# max_tasks_per_worker itself.
+
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+from executor import (GUARDED_OS_NAMES, NO_LIMITS, TAIL_CACHE_SIZE, ExecResult, Limits, _compile_tail,
+                      _read_until_eof, _recv_job, execute_sample, warm_up)
+
+RECYCLE_AFTER = 64   # samples per worker (max_tasks_per_worker default)
+
+# Runs inside the subinterpreter: the fork child's _child_run, minus signals and rlimits.
+_HARNESS = """
+import builtins as _b, contextlib as _cl, io as _io, json as _json, os as _os
+_write = _os.write
+
+class _WriteOnlyStringIO(_io.StringIO):
+    def read(self, *args, **kwargs):
+        raise IOError
+    def readline(self, *args, **kwargs):
+        raise IOError
+    def readlines(self, *args, **kwargs):
+        raise IOError
+    def readable(self, *args, **kwargs):
+        return False
+
+class _redirect_stdin(_cl._RedirectStream):
+    _stream = "stdin"
+
+def _guard():
+    import shutil, subprocess, sys
+    _b.exit = None
+    _b.quit = None
+    _os.environ["OMP_NUM_THREADS"] = "1"
+    for name in %(guarded)r:
+        setattr(_os, name, None)
+    shutil.rmtree = None
+    shutil.move = None
+    shutil.chown = None
+    subprocess.Popen = None
+    _b.help = None
+    for mod in ("ipdb", "joblib", "resource", "psutil", "tkinter"):
+        sys.modules[mod] = None
+
+def _run(head, tail, fd):
+    _guard()
+    stream = _WriteOnlyStringIO()
+    globs = {}
+    try:
+        with _cl.redirect_stdout(stream), _cl.redirect_stderr(stream), _redirect_stdin(stream):
+            try:
+                head_code = compile(head, "<string>", "exec")
+                tail_code = compile(tail, "<string>", "exec") if tail else None
+            except (SyntaxError, ValueError):
+                head_code = None
+            if head_code is not None:
+                exec(head_code, globs)
+                if tail_code is not None:
+                    exec(tail_code, globs)
+            else:
+                exec(head + tail, globs)
+        result, failure = "passed", ""
+    except BaseException as e:
+        result, failure = "failed: %%s" %% (e,), type(e).__name__
+        if isinstance(e, ImportError) and "subinterp" in str(e):
+            failure = "unsupported"      # an extension module that only loads in the main interpreter
+    try:
+        cases = globs.get("__he_case_s__")
+        cases = [round(float(x), 6) for x in cases] if type(cases) is list else None
+    except BaseException:
+        cases = None
+    data = _json.dumps([result, failure, cases]).encode()
+    while data:
+        data = data[_write(fd, data):]
+""" % {"guarded": GUARDED_OS_NAMES}
+
+
+def _interp_api():
+    """(create, run, destroy) for this Python's subinterpreter API, or None before 3.12."""
+    if sys.version_info < (3, 12):
+        return None
+    try:
+        from concurrent import interpreters                    # 3.14+
+        return interpreters.create, lambda interp, code: interp.exec(code), lambda interp: interp.close()
+    except ImportError:
+        pass
+    try:
+        import _interpreters                                   # 3.13
+
+        def run(interp, code):
+            err = _interpreters.exec(interp, code)
+            if err is not None:
+                raise RuntimeError(err.formatted)
+        return lambda: _interpreters.create("isolated"), run, _interpreters.destroy
+    except ImportError:
+        pass
+    try:
+        import _xxsubinterpreters                              # 3.12
+        return (lambda: _xxsubinterpreters.create(isolated=True), _xxsubinterpreters.run_string,
+                _xxsubinterpreters.destroy)
+    except ImportError:
+        return None
+
+
+def available() -> bool:
+    return _interp_api() is not None
+
+
+def execute_in_subinterp(api, head: str, tail: str, timeout: float) -> Tuple[Optional[ExecResult], bool]:
+    """
+    Run head + tail in a fresh subinterpreter. Returns (result, stuck): result is
+    None when the sample did not finish cleanly (timeout, harness failure,
+    an import subinterpreters don't support) and must be re-run in a forked
+    child; stuck means its thread is still running.
+    """
+    create, run, destroy = api
+    rfd, wfd = os.pipe()
+    cpu = [0.0]
+    script = _HARNESS + f"\n_run({head!r}, {tail!r}, {wfd})\n"
+
+    def _target():
+        c0 = time.thread_time()
+        try:
+            interp = create()
+            try:
+                run(interp, script)
+            finally:
+                destroy(interp)
+        except Exception:
+            pass
+        finally:
+            cpu[0] = time.thread_time() - c0
+            try:
+                os.close(wfd)
+            except OSError:
+                pass
+
+    t0 = time.monotonic()
+    thread = threading.Thread(target=_target, daemon=True)
+    thread.start()
+    try:
+        out, timed_out = _read_until_eof(rfd, t0 + timeout)
+    finally:
+        os.close(rfd)
+    runtime = time.monotonic() - t0
+    if timed_out:
+        return None, True
+    thread.join(timeout=1.0)
+    try:
+        result, failure, cases = json.loads(out)
+    except ValueError:
+        return None, thread.is_alive()
+    if failure == "unsupported":
+        return None, thread.is_alive()
+    return (ExecResult(result == "passed", result, round(runtime, 6), failure, round(cpu[0], 6), cases=cases),
+            thread.is_alive())
+
+
+def _worker_main(conn, preload: Sequence[str] = (), limits: Limits = NO_LIMITS):
+    """
+    Pool worker of the subinterp backend; same protocol as executor._worker_main.
+    Samples that need it are re-run in a forked child right here; once one is
+    stuck, the worker replies None for it and the rest of the batch and exits.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parent = os.getppid()                          # the pool process
+    if preload:
+        warm_up(preload)                           # for forked (fallback / cpu_time) samples
+    api = _interp_api()
+    workdir = tempfile.mkdtemp(prefix="he_subinterp_")
+    os.chdir(workdir)                              # shared by the subinterpreters; emptied between samples
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):                           # raw fd writes must not reach the terminal
+        os.dup2(devnull, fd)
+    tails = OrderedDict()
+
+    def forked(head: str, tail: str, timeout: float, cpu_time: bool = False) -> ExecResult:
+        if tail in tails:
+            tails.move_to_end(tail)
+        else:
+            tails[tail] = _compile_tail(tail)
+            if len(tails) > TAIL_CACHE_SIZE:
+                tails.popitem(last=False)
+        return execute_sample(head, tail, tails[tail], timeout, limits, cpu_time)
+
+    while True:
+        try:
+            msg = _recv_job(conn, parent)
+        except EOFError:
+            break
+        if msg is None:
+            break
+        prefix, tail, items, cpu_time, isolated = msg
+        if isolated or cpu_time or limits != NO_LIMITS:
+            conn.send([forked(prefix + completion, tail, timeout, cpu_time) for completion, timeout in items])
+            continue
+        out, stuck = [], False
+        for completion, timeout in items:
+            res = None
+            if not stuck:
+                res, stuck = execute_in_subinterp(api, prefix + completion, tail, timeout)
+                if res is None and not stuck:        # no thread left behind: safe to fork here
+                    res = forked(prefix + completion, tail, timeout)
+                if os.listdir(workdir):
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    os.makedirs(workdir, exist_ok=True)
+            out.append(res)
+        conn.send(out)
+        if stuck:
+            shutil.rmtree(workdir, ignore_errors=True)
+            os._exit(0)
+    shutil.rmtree(workdir, ignore_errors=True)
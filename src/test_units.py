@@ -0,0 +1,256 @@
+# src/test_units.py
+# Run a task's check() as a sequence of assertion units.
+#
+# HumanEval tests are one check(candidate) with every assert inline. unit_test()
+# rewrites it into a generator that pauses before each unit, so a driver can
+# time every unit and run only some of them. A unit is:
+#   - a top-level `assert` in check(), or a call statement that calls candidate
+#     (e.g. HumanEval+'s `assertion(candidate(*inp), exp, 0)`);
+#   - each iteration of a top-level `for` loop whose body is made of units only.
+# Everything else (setup, loops with their own state) runs unchanged between them.
+#
+# One shard runs every unit in order and stops at the first failure, so its
+# verdict is the original harness's. With n_shards > 1, shard s runs only units
+# i with i % n_shards == s (setup always runs); merge() folds the shard results
+# back into one verdict. Only checks where that is provably the same verdict
+# are split (shardable()): units bind no names and read none that check() binds
+# (other than their own loop variables), and no name handed to candidate is read
+# anywhere else in check(), so a unit can't see what a skipped one did.
+
+import ast
+import math
+import warnings
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from executor import ExecResult
+
+CASES_VAR = "__he_case_s__"   # per-unit seconds, read back from the sample's globals
+SPREAD_MIN_S = 0.5            # spread only tasks whose past samples ran this long on average
+
+_DRIVER = """
+
+{cases} = []
+
+def __he_drive(units, candidate, shard, n_shards):
+    from time import perf_counter
+    gen = units(candidate)
+    try:
+        next(gen)
+    except StopIteration:
+        return
+    i = 0
+    while True:
+        mine = i % n_shards == shard
+        t = perf_counter()
+        try:
+            gen.send(mine)
+        except StopIteration:
+            return
+        finally:
+            if mine:
+                {cases}.append(perf_counter() - t)
+        i += 1
+
+def check(candidate):
+    __he_drive(__he_units, candidate, {shard}, {n_shards})
+"""
+
+
+def _is_unit(stmt: ast.stmt, candidate: str) -> bool:
+    if isinstance(stmt, ast.Assert):
+        return True
+    return (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)
+            and any(isinstance(n, ast.Name) and n.id == candidate for n in ast.walk(stmt.value)))
+
+
+def _gate(body: List[ast.stmt]) -> ast.If:
+    """`if (yield): <body>` - the driver decides whether this unit runs."""
+    return ast.If(test=ast.Yield(value=None), body=body, orelse=[])
+
+
+def _check_fn(test: str) -> Optional[ast.FunctionDef]:
+    """The check(candidate) that unit_test() can rewrite, or None."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            tree = ast.parse(test)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    checks = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "check"]
+    if not checks or checks[-1].decorator_list or len(checks[-1].args.args) != 1:
+        return None
+    fn = checks[-1]
+    if any(isinstance(n, (ast.Yield, ast.YieldFrom, ast.Await)) for n in ast.walk(fn)):
+        return None
+    return fn
+
+
+def _names(nodes, ctx) -> set:
+    return {n.id for node in nodes for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ctx)}
+
+
+@lru_cache(maxsize=1024)
+def shardable(test: str) -> bool:
+    """Whether test's units can run in separate executions without changing the verdict."""
+    try:
+        fn = _check_fn(test)
+        if fn is None:
+            return False
+        candidate = fn.args.args[0].arg
+        units, loop_vars, other = [], {}, []       # unit statements; loop vars per unit; everything else
+        for stmt in fn.body:
+            if _is_unit(stmt, candidate):
+                units.append(stmt)
+            elif (isinstance(stmt, ast.For) and not stmt.orelse
+                  and all(_is_unit(s, candidate) for s in stmt.body)):
+                units.extend(stmt.body)
+                loop_vars.update((id(s), _names([stmt.target], ast.Store)) for s in stmt.body)
+                other.extend([stmt.target, stmt.iter])
+            else:
+                other.append(stmt)
+        if any(isinstance(n, ast.NamedExpr) for u in units for n in ast.walk(u)):
+            return False
+        bound = _names(other, (ast.Store, ast.Del)) | {
+            n.name for st in other for n in ast.walk(st)
+            if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))} | {
+            (a.asname or a.name).split(".")[0] for st in other for n in ast.walk(st)
+            if isinstance(n, (ast.Import, ast.ImportFrom)) for a in n.names} | {
+            n.name for st in other for n in ast.walk(st) if isinstance(n, ast.ExceptHandler) and n.name}
+        for u in units:
+            own = loop_vars.get(id(u), set())
+            if (_names([u], ast.Load) - own) & bound:
+                return False                       # reads something check() itself set up
+            handed = _names([a for n in ast.walk(u) if isinstance(n, ast.Call) and _calls(n, candidate)
+                             for a in [*n.args, *(k.value for k in n.keywords)]], ast.Load) - own - {candidate}
+            if not handed:
+                continue
+            if id(u) in loop_vars:
+                return False                       # every iteration hands candidate the same objects
+            elsewhere = _names(other, ast.Load).union(*(_names([v], ast.Load) for v in units if v is not u))
+            if handed & elsewhere:
+                return False                       # candidate may mutate what another unit reads
+        return True
+    except RecursionError:
+        return False
+
+
+def _calls(call: ast.Call, candidate: str) -> bool:
+    return isinstance(call.func, ast.Name) and call.func.id == candidate
+
+
+@lru_cache(maxsize=1024)
+def _units_source(test: str) -> Optional[str]:
+    """Source of __he_units, the generator form of test's check(), or None if it has no units."""
+    fn = _check_fn(test)
+    if fn is None:
+        return None
+    candidate = fn.args.args[0].arg
+    body, n_units = [], 0
+    for stmt in fn.body:
+        if _is_unit(stmt, candidate):
+            body.append(_gate([stmt]))
+            n_units += 1
+        elif (isinstance(stmt, ast.For) and not stmt.orelse
+              and all(_is_unit(s, candidate) for s in stmt.body)):
+            stmt.body = [_gate(stmt.body)]
+            body.append(stmt)
+            n_units += 1
+        else:
+            body.append(stmt)
+    if not n_units:
+        return None
+    fn.name, fn.body = "__he_units", body
+    try:
+        return ast.unparse(ast.fix_missing_locations(fn))
+    except (ValueError, RecursionError):
+        return None
+
+
+def unit_test(test: str, shard: int = 0, n_shards: int = 1) -> Optional[str]:
+    """
+    test with a check() that runs its units (shard `shard` of `n_shards`), timing
+    each into CASES_VAR. None if check() can't be split; run the test as is then.
+    """
+    units = _units_source(test)
+    if units is None:
+        return None
+    return test + "\n\n" + units + _DRIVER.format(cases=CASES_VAR, shard=shard, n_shards=n_shards)
+
+
+def expand(
+    problems: Dict[str, dict],
+    samples: Sequence[dict],
+    timeouts: Sequence[float],
+    shards: Dict[str, int],
+) -> Tuple[Dict[str, dict], List[dict], List[float], List[int]]:
+    """
+    The executions that run samples as units: (problems, samples, timeouts, owner),
+    owner[j] being the index in samples that execution j belongs to. A task gets
+    shards.get(task_id, 1) executions per sample if shardable(), else one; tasks
+    whose check() can't be split into units run as before.
+    """
+    run_problems, run_samples, run_timeouts, owner = {}, [], [], []
+    for i, (s, t) in enumerate(zip(samples, timeouts)):
+        tid = s["task_id"]
+        problem = problems[tid]
+        k = max(1, shards.get(tid, 1)) if shardable(problem["test"]) else 1
+        if unit_test(problem["test"]) is None:
+            k, variants = 1, [(tid, problem)]
+        else:
+            variants = [(f"{tid}#units{j}/{k}", {**problem, "test": unit_test(problem["test"], j, k)})
+                        for j in range(k)]
+        for vid, variant in variants:
+            run_problems.setdefault(vid, variant)
+            run_samples.append({**s, "task_id": vid})
+            run_timeouts.append(t)
+            owner.append(i)
+    return run_problems, run_samples, run_timeouts, owner
+
+
+def _first_failing_unit(r: ExecResult, shard: int, n_shards: int) -> float:
+    """
+    Global index of the unit a failed shard stopped at: its last timed one. A
+    shard killed mid-run reports no cases; it failed after all it was seen to
+    run, so it only decides the verdict if no other shard failed (inf).
+    """
+    if r.cases is None:
+        return math.inf
+    return shard + max(len(r.cases) - 1, 0) * n_shards
+
+
+def merge(results: Sequence[ExecResult], owner: Sequence[int], n: int, timeouts: Sequence[float],
+          cpu_time: bool = False) -> List[ExecResult]:
+    """
+    One ExecResult per sample from its shards' results: the failure of the
+    earliest failing unit (what a sequential run reports; cases stop there), else passed, or
+    timed out if the units together overran the sample's (wall-clock) timeout.
+    Runtimes and CPU times add up; cases interleave back into unit order.
+    """
+    parts: List[List[ExecResult]] = [[] for _ in range(n)]
+    for j, r in zip(owner, results):
+        parts[j].append(r)
+    out = []
+    for rs, timeout in zip(parts, timeouts):
+        if len(rs) == 1:
+            out.append(rs[0])
+            continue
+        k = len(rs)
+        cases: List[float] = []
+        for u in range(max(len(r.cases or []) for r in rs)):
+            for r in rs:
+                if u < len(r.cases or []):
+                    cases.append(r.cases[u])
+        failed = [(_first_failing_unit(r, s, k), r) for s, r in enumerate(rs) if not r.passed]
+        runtime, cpu_s = sum(r.runtime_s for r in rs), sum(r.cpu_s for r in rs)
+        latency = max(r.latency_s for r in rs)
+        if failed:
+            unit, first = min(failed, key=lambda x: x[0])
+            out.append(ExecResult(False, first.result, round(runtime, 6), first.failure, round(cpu_s, 6),
+                                  latency, cases[:unit + 1] if unit < math.inf else cases))
+        elif not cpu_time and sum(cases) > timeout:
+            out.append(ExecResult(False, "timed out", round(runtime, 6), "timeout", round(cpu_s, 6),
+                                  latency, cases))
+        else:
+            out.append(ExecResult(True, "passed", round(runtime, 6), "", round(cpu_s, 6), latency, cases))
+    return out
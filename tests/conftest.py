@@ -0,0 +1,7 @@
+# Shared pytest setup: the repo's modules live flat in src/, as the scripts import them.
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,68 @@
+# Incremental re-evaluation (evaluate_records(..., baseline=)): which verdicts may be reused.
+
+import json
+
+import pytest
+
+from eval_utils import evaluate_records, write_results
+from executor import NO_LIMITS, SAFE_LIMITS, ExecutionPool
+
+PROBLEM = {"task_id": "Base/0", "prompt": "def f(x):\n", "entry_point": "f",
+           "test": "def check(candidate):\n    assert candidate(2) == 4\n"}
+COMPLETIONS = {
+    "passed": "    return x * 2\n",
+    "failed": "    return x + 3\n",
+    "memory_limit": "    raise MemoryError\n",              # what running out of RLIMIT_AS raises
+    "timeout": "    while True:\n        pass\n",
+}
+
+
+@pytest.fixture(autouse=True)
+def _local(monkeypatch):
+    monkeypatch.delenv("HE_EVAL_DAEMON", raising=False)
+    monkeypatch.delenv("HE_EXEC_COORDINATOR", raising=False)
+
+
+def _evaluate(records, limits, **kwargs):
+    with ExecutionPool(n_workers=2, timeout=1.0, limits=limits) as pool:
+        return evaluate_records(records, timeout=1.0, pool=pool, use_cache=False, limits=limits, **kwargs)
+
+
+@pytest.fixture
+def safe_baseline(tmp_path):
+    records = [{**PROBLEM, "completion": c} for c in COMPLETIONS.values()]
+    ev = _evaluate(records, SAFE_LIMITS)
+    assert [r["failure"] or "passed" for r in ev["rows"]] == ["passed", "AssertionError", "memory_limit", "timeout"]
+    return records, write_results(ev["rows"], records, tmp_path / "results.jsonl")
+
+
+def _reused(ev):
+    return [r["failure"] or "passed" for r in ev["rows"] if r["baseline"]]
+
+
+def test_same_limits_reuse_lasting_verdicts_only(safe_baseline):
+    records, path = safe_baseline
+    ev = _evaluate(records, SAFE_LIMITS, baseline=path)
+    assert _reused(ev) == ["passed", "AssertionError", "timeout"]
+    assert ev["rows"][2]["failure"] == "memory_limit"             # executed again
+
+
+def test_other_limits_reuse_nothing(safe_baseline):
+    records, path = safe_baseline
+    ev = _evaluate(records, NO_LIMITS, baseline=path)
+    assert _reused(ev) == []
+    assert ev["rows"][2]["failure"] == "MemoryError"              # not a limit kill without limits
+
+
+def test_mismatched_limits_signature_is_not_reused(safe_baseline, tmp_path):
+    records, path = safe_baseline
+    rows = [json.loads(line) for line in open(path)]
+    for row in rows:
+        row["limits"] = {**row["limits"], "memory_bytes": 1 << 40}
+    edited = tmp_path / "edited.jsonl"
+    edited.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    assert _reused(_evaluate(records, SAFE_LIMITS, baseline=edited)) == []
+    for row in rows:
+        del row["limits"]                                         # results files from before limits were recorded
+    edited.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    assert _reused(_evaluate(records, SAFE_LIMITS, baseline=edited)) == []
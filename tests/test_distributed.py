@@ -0,0 +1,48 @@
+# Coordinator with local workers on localhost (src/distributed.py).
+
+import threading
+import time
+
+from distributed import Coordinator
+from executor import ExecutionPool
+
+PROMPT = "def f(x):\n"
+TEST = "def check(candidate):\n    assert candidate(2) == 4\n"
+
+
+def _problems_and_samples(n_tasks=6, per_task=4):
+    problems, samples = {}, []
+    for t in range(n_tasks):
+        tid = f"Dist/{t}"
+        problems[tid] = {"task_id": tid, "prompt": PROMPT, "test": TEST, "entry_point": "f"}
+        samples += [
+            {"task_id": tid, "completion": "    import time; time.sleep(0.3)\n    return x * 2\n"},
+            {"task_id": tid, "completion": "    return x + 3\n"},
+            {"task_id": tid, "completion": "    raise ValueError('no')\n"},
+            {"task_id": tid, "completion": "    return x *\n"},
+        ][:per_task]
+    return problems, samples
+
+
+def test_worker_killed_mid_run_matches_local_pool():
+    problems, samples = _problems_and_samples()
+    with ExecutionPool(n_workers=2, timeout=5.0) as pool:
+        expected = pool.run_tasks(problems, samples)
+
+    with Coordinator("127.0.0.1:0", timeout=5.0, batch_size=2) as coord:
+        procs = coord.start_local_workers(2, n_workers=1)
+        assert coord.wait_for_workers(2, timeout=60)
+        out = {}
+        runner = threading.Thread(target=lambda: out.setdefault("results", coord.run_tasks(problems, samples)))
+        runner.start()
+        deadline = time.monotonic() + 30
+        while coord.stats["sent"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        procs[0].kill()                                # with batches in flight
+        runner.join(timeout=120)
+        assert not runner.is_alive()
+        procs[0].wait()
+
+    got = out["results"]
+    assert [(r.passed, r.result) for r in got] == [(r.passed, r.result) for r in expected]
+    assert coord.stats["retried"] >= 1
@@ -0,0 +1,61 @@
+# Guided decoding against the local mock server (src/mock_server.py).
+
+import re
+
+import pytest
+
+from api_client import OpenAICompatClient
+from guided_decoding import SOL_GRAMMAR, SOL_REGEX, guided_fields
+from mock_server import start_mock_server
+from postprocessing import between_tags, get_postprocessor
+
+BODY = "    if not xs:\n        return 0\n    return max(xs) - min(xs)"
+
+
+@pytest.fixture(scope="module")
+def api_base():
+    server, base = start_mock_server(body=BODY)
+    yield server, base
+    server.shutdown()
+
+
+def _text(resp: dict, chat: bool) -> str:
+    choice = resp["choices"][0]
+    return choice["message"]["content"] if chat else choice["text"]
+
+
+def test_guided_fields():
+    assert guided_fields(None, ["</sol>"]) == {}
+    assert guided_fields("regex") == {"guided_regex": SOL_REGEX}
+    assert guided_fields("grammar", ["</sol>"]) == {"guided_grammar": SOL_GRAMMAR, "include_stop_str_in_output": True}
+    assert "include_stop_str_in_output" not in guided_fields("regex", ["\n\n\n"])
+    with pytest.raises(ValueError):
+        guided_fields("json")
+
+
+@pytest.mark.parametrize("chat", [True, False])
+@pytest.mark.parametrize("mode", ["regex", "grammar"])
+def test_guided_matches_unguided(api_base, mode, chat):
+    server, base = api_base
+    gen = {"stop": ["</sol>"], "max_tokens": 256, "temperature": 0.0}
+    guided = OpenAICompatClient(base, "EMPTY", use_chat=chat, model="mock-model", guided=mode)
+    plain = OpenAICompatClient(base, "EMPTY", use_chat=chat, model="mock-model")
+
+    text = _text(guided.complete("Write the body.", **gen), chat)
+    payload = server.payloads[-1]
+    assert payload[f"guided_{mode}"] == (SOL_REGEX if mode == "regex" else SOL_GRAMMAR)
+    assert payload["include_stop_str_in_output"] is True
+    assert re.fullmatch(SOL_REGEX, text)          # the closing tag survives the </sol> stop
+    assert between_tags(text) == BODY
+
+    unguided = _text(plain.complete("Write the body.", **gen), chat)
+    assert not any(k.startswith("guided_") for k in server.payloads[-1])
+    pp = get_postprocessor("v3")
+    assert pp(text) == pp(unguided)
+
+
+def test_guided_stream(api_base):
+    _, base = api_base
+    client = OpenAICompatClient(base, "EMPTY", model="mock-model", guided="regex")
+    text = "".join(client.stream_complete("Write the body.", stop=["</sol>"]))
+    assert between_tags(text) == BODY
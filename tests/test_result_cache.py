@@ -0,0 +1,68 @@
+# ResultCache (src/result_cache.py): storage, key namespaces, eviction.
+
+from executor import NO_LIMITS, SAFE_LIMITS, ExecResult, ExecutionPool, check_samples
+from result_cache import ResultCache, key_namespace
+
+
+def _cache(tmp_path, **kwargs):
+    return ResultCache(tmp_path / "cache.sqlite", **kwargs)
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = _cache(tmp_path)
+    key = cache.key("print(1)")
+    res = ExecResult(False, "failed: boom", 0.25, "ValueError", 0.2, cases=[0.1, 0.15])
+    cache.put_many([(key, 5.0, res)])
+    hit = cache.get_many([key], [5.0])[key]
+    assert (hit.passed, hit.result, hit.failure, hit.runtime_s, hit.cpu_s, hit.cases) == \
+        (False, "failed: boom", "ValueError", 0.25, 0.2, [0.1, 0.15])
+    assert cache.get_many([cache.key("print(2)")], [5.0]) == {}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_timeouts_and_host_failures(tmp_path):
+    cache = _cache(tmp_path)
+    slow, timed_out, infra, limit = (cache.key(f"p{i}") for i in range(4))
+    cache.put_many([
+        (slow, 5.0, ExecResult(True, "passed", 3.0)),
+        (timed_out, 5.0, ExecResult(False, "timed out", 5.0, "timeout")),
+        (infra, 5.0, ExecResult(False, "failed: worker died", 0.0, "infra")),
+        (limit, 5.0, ExecResult(False, "failed: ", 1.0, "memory_limit")),
+    ])
+    assert set(cache.get_many([slow, timed_out, infra, limit], [5.0] * 4)) == {slow, timed_out}
+    assert set(cache.get_many([slow, timed_out], [2.0, 10.0])) == set()   # either could change
+    assert set(cache.get_many([slow, timed_out], [10.0, 2.0])) == {slow, timed_out}
+
+
+def test_namespaces_are_separate(tmp_path):
+    cache = _cache(tmp_path)
+    spaces = {key_namespace(), key_namespace(cpu_time=True), key_namespace(limits=SAFE_LIMITS),
+              key_namespace(True, SAFE_LIMITS)}
+    assert len(spaces) == 4 and key_namespace(limits=NO_LIMITS) == ""
+    cache.put_many([(cache.key("x = 1", ""), 5.0, ExecResult(True, "passed", 0.1))])
+    keys = [cache.key("x = 1", ns) for ns in sorted(spaces)]
+    assert set(cache.get_many(keys, [5.0] * len(keys))) == {cache.key("x = 1", "")}
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_bytes=20_000)
+    keys = [cache.key(f"p{i}") for i in range(100)]
+    for key in keys:
+        cache.put_many([(key, 5.0, ExecResult(False, "failed: " + "x" * 200, 0.1, "AssertionError"))])
+        cache.get_many([keys[0]], [5.0])                 # keep the first one in use
+    assert cache.stats()["bytes"] <= 20_000
+    left = cache.get_many(keys, [5.0] * len(keys))
+    assert keys[0] in left and keys[1] not in left and keys[-1] in left
+
+
+def test_verdicts_under_limits_are_not_shared(tmp_path):
+    cache = _cache(tmp_path)
+    problems = {"Big/0": {"task_id": "Big/0", "prompt": "def f():\n", "entry_point": "f",
+                          "test": "def check(candidate):\n    assert candidate() == 1\n"}}
+    samples = [{"task_id": "Big/0", "completion": "    print('x' * (20 << 20))\n    return 1\n"}]
+    with ExecutionPool(n_workers=1, timeout=10.0) as pool:
+        free = check_samples(problems, samples, pool=pool, timeout=10.0, cache=cache)
+    with ExecutionPool(n_workers=1, timeout=10.0, limits=SAFE_LIMITS) as pool:
+        capped = check_samples(problems, samples, pool=pool, timeout=10.0, cache=cache)
+    assert free[0]["passed"] and not capped[0]["cached"]
+    assert (capped[0]["passed"], capped[0]["failure"]) == (False, "output_limit")
@@ -0,0 +1,50 @@
+# Shared-memory transport (src/shm_transport.py): task table generations.
+
+import os
+
+import shm_transport
+from executor import ExecutionPool
+from shm_transport import TaskReader, TaskTable
+
+
+def _exists(name):
+    return os.path.exists(f"/dev/shm/{name.lstrip('/')}")
+
+
+def test_table_rotates_and_frees_segments_when_released():
+    table, reader = TaskTable(segment_bytes=1024, max_bytes=2048), TaskReader()
+    try:
+        a = table.ref("p" * 600, "a" * 100)
+        table.release(a)
+        b = table.ref("p" * 600, "b" * 100)                  # second segment
+        assert reader.get(b) == ("p" * 600, "b" * 100)
+        c = table.ref("p" * 600, "c" * 100)                  # a third would pass max_bytes: new generation
+        assert (a[4], b[4], c[4]) == (0, 0, 1)
+        assert not _exists(a[0]) and _exists(b[0])           # b is still in flight
+        assert reader.get(c) == ("p" * 600, "c" * 100)
+        table.release(b)
+        assert not _exists(b[0]) and _exists(c[0])
+        assert table.ref("p" * 600, "a" * 100) != a          # re-appended in the new generation
+    finally:
+        table.close()
+    assert not _exists(c[0])
+
+
+def test_pool_with_a_small_table_matches_pipes(monkeypatch):
+    monkeypatch.setattr(shm_transport, "SEGMENT_BYTES", 4096)
+    monkeypatch.setattr(shm_transport, "TABLE_MAX_BYTES", 8192)
+    problems, samples = {}, []
+    for t in range(12):
+        tid = f"Shm/{t}"
+        test = f"# {'x' * 1500}\ndef check(candidate):\n    assert candidate({t}) == {2 * t}\n"
+        problems[tid] = {"task_id": tid, "prompt": "def f(x):\n", "test": test, "entry_point": "f"}
+        samples += [{"task_id": tid, "completion": "    return 2 * x\n"},
+                    {"task_id": tid, "completion": "    return x + 1\n"}]
+    with ExecutionPool(n_workers=2, timeout=5.0, transport="pipe") as pool:
+        expected = [(r.passed, r.result) for r in pool.run_tasks(problems, samples)]
+    with ExecutionPool(n_workers=2, timeout=5.0, transport="shm", batch_size=1) as pool:
+        for _ in range(2):
+            assert [(r.passed, r.result) for r in pool.run_tasks(problems, samples)] == expected
+        table = pool._table
+        assert table.generation > 0 and not table._retired and not table._in_flight
+        assert sum(s.size for s in table.segments) <= 8192
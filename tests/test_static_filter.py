@@ -0,0 +1,75 @@
+# Static verdicts (src/static_filter.py) against executing the same samples.
+
+import pytest
+
+from executor import build_tail, execute_sample
+from static_filter import analyze
+
+PROMPT = 'def f(x):\n    """Twice x."""\n'
+PROBLEM = {
+    "task_id": "Static/0", "prompt": PROMPT, "entry_point": "f",
+    "canonical_solution": "    return x * 2\n",
+    "test": "\n\ndef check(candidate):\n    assert candidate(2) == 4\n    assert candidate(0) == 0, 'zero'\n",
+}
+
+
+def _execute(problem, completion):
+    tail = build_tail(problem)
+    return execute_sample(problem["prompt"] + completion, tail, compile(tail, "<string>", "exec"), 5.0)
+
+
+def _parity(problem, completion):
+    static, run = analyze(problem, completion), _execute(problem, completion)
+    assert static is not None
+    assert (static.passed, static.result) == (run.passed, run.result)
+    return static
+
+
+def test_canonical_passes():
+    assert _parity(PROBLEM, "    return x  *  2\n").passed
+
+
+def test_syntax_error():
+    static = _parity(PROBLEM, "    return x *\n")
+    assert static.failure == "SyntaxError"
+
+
+def test_stub_reports_the_first_assert():
+    static = _parity(PROBLEM, "    return None\n")
+    assert static.failure == "static_stub" and static.result == "failed: "
+    problem = {**PROBLEM, "test": "\n\ndef check(candidate):\n    assert candidate(2) == 4, 'two'\n"}
+    assert _parity(problem, "    pass\n").result == "failed: two"
+
+
+def test_undefined_name():
+    static = _parity(PROBLEM, "    return foo(x)\n")
+    assert static.failure == "static_undefined" and static.result == "failed: name 'foo' is not defined"
+
+
+@pytest.mark.parametrize("completion", [
+    "    return foo\nimport builtins as b\nb.foo = 8\n",
+    "    return foo\nf.__globals__['foo'] = 4\n",
+    "    return foo\nimport sys as s\ns.modules[__name__].foo = 4\n",
+    "    return foo\nfrom importlib import import_module\nimport_module('builtins').foo = 4\n",
+    "    return foo\nsetattr(__import__('builtins'), 'foo', 4)\n",
+    "    return foo\nfoo = 4\n",
+])
+def test_names_bound_at_run_time_are_executed(completion):
+    assert analyze(PROBLEM, completion) is None
+
+
+@pytest.mark.parametrize("completion", [
+    "    return foo\nfor _ in iter(int, 1):\n    pass\n",          # module code runs first (forever)
+    "    return foo\ndef g(y=bar):\n    pass\n",                     # def-time NameError on another name
+    "    return [1][5] + foo\n",                                    # IndexError before the name
+    "    return None\nraise ValueError('first')\n",
+])
+def test_other_failures_first_are_executed(completion):
+    assert analyze(PROBLEM, completion) is None
+
+
+def test_dynamic_samples_pass_when_executed():
+    problem = {**PROBLEM, "test": "\n\ndef check(candidate):\n    assert candidate(2) == 4\n"}
+    assert _execute(problem, "    return foo\nimport builtins as b\nb.foo = 4\n").passed
+    assert _execute(problem, "    return foo\nf.__globals__['foo'] = 4\n").passed
+    assert _execute(problem, "    return foo\nimport sys as s\ns.modules[__name__].foo = 4\n").passed
@@ -0,0 +1,104 @@
+# Assertion units (src/test_units.py): when a check may be split, and merging shard results.
+
+import math
+
+import pytest
+
+from executor import ExecResult, ExecutionPool, check_samples
+from result_cache import ResultCache
+from slow_lane import task_key
+from test_units import expand, merge, shardable
+
+INDEPENDENT = """
+inputs = [[1], [2], [3]]
+results = [2, 4, 6]
+
+def assertion(out, exp, atol):
+    assert out == exp
+
+def check(candidate):
+    for i, (inp, exp) in enumerate(zip(inputs, results)):
+        assertion(candidate(*inp), exp, 0)
+    assert candidate(5) == 10
+    assert abs(candidate(0.5) - 1.0) < 1e-6
+"""
+
+
+def _check(*lines, head=""):
+    return head + "def check(candidate):\n" + "".join(f"    {line}\n" for line in lines)
+
+
+def test_independent_units_are_shardable():
+    assert shardable(INDEPENDENT)
+    assert shardable(_check("assert candidate([1, 2]) == 3", "assert candidate([]) == 0"))
+
+
+@pytest.mark.parametrize("test", [
+    _check("xs = []", "assert candidate(xs) == 1", "assert xs == [1]"),                 # shared setup name
+    _check("n = 3", "assert candidate(n) == 3"),
+    _check("assert candidate(DATA) == 1", "assert DATA == [1]", head="DATA = []\n"),   # handed and read again
+    _check("assert candidate(DATA) == 1", "print(DATA)", head="DATA = []\n"),
+    _check("for i in range(3):", "    assert candidate(DATA) == i", head="DATA = []\n"),  # loop-carried state
+    _check("for x in range(3):", "    assert candidate(x)", "assert candidate(x) == 2"),
+    _check("assert (y := candidate(1))", "assert y == 2"),                                # walrus
+    "def check(candidate, extra):\n    assert candidate(1)\n",
+    "def check(candidate):\n    yield candidate(1)\n",
+    "x = (\n",
+])
+def test_dependent_units_are_not_shardable(test):
+    assert not shardable(test)
+
+
+def test_expand_splits_only_shardable_tasks():
+    dependent = _check("xs = []", "assert candidate(xs) == 1", "assert xs == [1]")
+    problems = {t: {"task_id": t, "prompt": "def f(x):\n", "entry_point": "f", "test": test}
+                for t, test in (("A", INDEPENDENT), ("B", dependent))}
+    samples = [{"task_id": "A", "completion": "    return 2 * x\n"}, {"task_id": "B", "completion": "    return 1\n"}]
+    _, runs, _, owner = expand(problems, samples, [5.0, 5.0], {"A": 3, "B": 3})
+    assert owner == [0, 0, 0, 1]
+    assert [r["task_id"] for r in runs] == ["A#units0/3", "A#units1/3", "A#units2/3", "B#units0/1"]
+
+
+def test_dependent_check_keeps_its_verdict_with_spread(tmp_path):
+    dependent = _check("xs = []", "assert candidate(xs) == 1", "assert xs == [1]", "assert candidate([]) == 1")
+    problems = {"B": {"task_id": "B", "prompt": "def f(xs):\n", "entry_point": "f", "test": dependent}}
+    samples = [{"task_id": "B", "completion": "    xs.append(1)\n    return 1\n"}]
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    cache.record_tasks([(task_key(problems["B"]), ExecResult(True, "passed", 2.0))] * 3)   # a slow task
+    with ExecutionPool(n_workers=2, timeout=5.0) as pool:
+        rows = check_samples(problems, samples, pool=pool, timeout=5.0, cache=cache, units=True, spread=2)
+    assert rows[0]["passed"]
+
+
+def _ok(cases):
+    return ExecResult(True, "passed", sum(cases), "", sum(cases), cases=cases)
+
+
+def _failed(cases, result="failed: ", failure="AssertionError"):
+    return ExecResult(False, result, sum(cases or []), failure, 0.0, cases=cases)
+
+
+def test_merge_reports_the_earliest_failing_unit():
+    # 2 shards: shard 0 runs units 0, 2, 4; shard 1 runs units 1, 3, 5
+    shards = [_failed([0.1, 0.1, 0.1], "failed: unit 4"), _failed([0.1, 0.1], "failed: unit 3")]
+    (r,) = merge(shards, [0, 0], 1, [10.0])
+    assert (r.passed, r.result) == (False, "failed: unit 3")
+    assert len(r.cases) == 4                                        # units 0..3, as a sequential run stops
+
+
+def test_merge_ranks_a_killed_shard_last():
+    killed = ExecResult(False, "timed out", 5.0, "timeout", 5.0, cases=None)
+    (r,) = merge([killed, _failed([0.1, 0.1, 0.1], "failed: unit 5")], [0, 0], 1, [10.0])
+    assert r.result == "failed: unit 5"
+    (r,) = merge([_ok([0.1, 0.1]), killed], [0, 0], 1, [10.0])
+    assert (r.result, r.failure) == ("timed out", "timeout")
+
+
+def test_merge_applies_the_summed_timeout():
+    (r,) = merge([_ok([2.0, 2.0]), _ok([2.0, 2.0])], [0, 0], 1, [7.0])
+    assert (r.passed, r.failure) == (False, "timeout")
+    assert math.isclose(sum(r.cases), 8.0)
+    (r,) = merge([_ok([2.0, 2.0]), _ok([2.0, 2.0])], [0, 0], 1, [7.0], cpu_time=True)
+    assert r.passed                                                 # CPU budgets are per execution
+    (r,) = merge([_ok([1.0]), _ok([1.0])], [0, 0], 1, [7.0])
+    assert r.passed and r.cases == [1.0, 1.0]